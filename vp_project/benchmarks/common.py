@@ -0,0 +1,68 @@
+"""
+Helpers shared by the benchmark scripts. Each benchmark runs against a
+throwaway test database, created from the project's migrations, so it
+never touches 'db.sqlite3'.
+"""
+import os
+import statistics
+import time
+
+import django
+
+
+def setup_django():
+    # Benchmarks run in one process, like the tests.
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE',
+                          'vp_project.test_settings')
+    os.environ.setdefault('SECRET', 'benchmark')
+    django.setup()
+    # Benchmarks should time the middleware and caches that run in
+    # production, which the test settings change.
+    from django.conf import settings
+    settings.N_PLUS_ONE_DETECTION = dict(
+        settings.N_PLUS_ONE_DETECTION, ENABLED=False
+    )
+    settings.CATALOG_CACHE = dict(settings.CATALOG_CACHE, ENABLED=True)
+
+
+def create_database():
+    """
+    Create and migrate a test database, and return a callable that
+    destroys it again.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment(debug=False)
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    def destroy():
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    return destroy
+
+
+def time_calls(function, samples):
+    """
+    Call 'function' 'samples' times, and return each call's duration in
+    seconds.
+    """
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def percentiles(durations):
+    """
+    Summarize durations in seconds as p50/p95/p99 milliseconds.
+    """
+    if len(durations) == 1:
+        durations = durations * 2
+    cuts = statistics.quantiles(durations, n=100, method='inclusive')
+    return {
+        'p50': round(cuts[49] * 1000, 3),
+        'p95': round(cuts[94] * 1000, 3),
+        'p99': round(cuts[98] * 1000, 3),
+    }
@@ -0,0 +1,317 @@
+"""
+Benchmark every API route against generated datasets of increasing
+size, recording latency percentiles, query counts and peak memory per
+endpoint. From the 'vp_project' directory:
+
+    $ python -m benchmarks.endpoints --output results.json
+
+Results are compared with 'benchmarks/baseline.json' (or '--baseline'),
+and any endpoint that got slower or issues more queries is reported.
+Pass '--save-baseline' to replace the baseline with the new results.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import (
+    create_database,
+    percentiles,
+    setup_django,
+    time_calls
+)
+
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+QUESTIONS = 20
+PASSWORD = 'benchmark-password'
+
+
+def build_dataset(replies, seed):
+    """
+    Flush the database and generate 'replies' Replies over QUESTIONS
+    Questions, half of which have concluded. Return the objects the
+    endpoint cases need.
+    """
+    from io import StringIO
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.utils import timezone
+    from rest_framework.authtoken.models import Token
+    from vp_app.models import Question
+
+    call_command('flush', interactive=False, verbosity=0)
+    users = max(-(-replies // QUESTIONS), 2)
+    call_command(
+        'generate_dataset',
+        users=users,
+        questions=QUESTIONS,
+        replies=replies,
+        seed=seed,
+        stdout=StringIO()
+    )
+    user = User.objects.order_by('id').first()
+    user.set_password(PASSWORD)
+    user.save()
+    staff = User.objects.create_user(
+        username='benchmark_staff', password=PASSWORD, is_staff=True
+    )
+    now = timezone.now()
+    concluded = Question.objects.filter(date_concluded__lte=now) \
+        .order_by('id').first()
+    open_question = Question.objects.filter(date_concluded__gt=now) \
+        .order_by('id').first()
+    return {
+        'user': user,
+        'token': Token.objects.create(user=user),
+        'staff': staff,
+        'concluded': concluded,
+        'open': open_question,
+        'answer': open_question.answers.order_by('id').first(),
+    }
+
+
+def get_cases(data):
+    """
+    Map each route name to a list of '(case name, user, request)'
+    tuples, where 'request' takes an APIClient and returns a response.
+    Routes without a name are keyed by their path.
+    """
+    from django.urls import reverse
+    concluded = data['concluded'].id
+    open_question = data['open'].id
+    user = data['user']
+    staff = data['staff']
+    counter = iter(range(10 ** 9))
+
+    def get(name, *args, **params):
+        url = reverse(name, args=args)
+        return lambda client: client.get(url, params)
+
+    def get_with_token(name, *args):
+        # Authenticate with the User's Token, rather than forcing
+        # authentication, to include the cost of token lookups.
+        url = reverse(name, args=args)
+        header = f'Token {data["token"].key}'
+        return lambda client: client.get(url, HTTP_AUTHORIZATION=header)
+
+    def create_user(client):
+        number = next(counter)
+        return client.post(reverse('create-user'), {
+            'username': f'benchmark_{number}',
+            'email': f'benchmark_{number}@example.com',
+            'password': PASSWORD,
+        })
+
+    return {
+        'root-index': [('root-index', None, get('root-index'))],
+        'question-list': [
+            ('question-list', None, get('question-list')),
+            ('question-list?expand=answers', None,
+             get('question-list', expand='answers')),
+        ],
+        'question-detail': [
+            ('question-detail', None, get('question-detail', concluded)),
+        ],
+        'question-answers': [
+            ('question-answers', None,
+             get('question-answers', open_question)),
+        ],
+        'answer-list': [('answer-list', None, get('answer-list'))],
+        'answer-detail': [
+            ('answer-detail', None, get('answer-detail', data['answer'].id)),
+        ],
+        'question-reply': [
+            ('question-reply', user, get('question-reply', open_question)),
+        ],
+        'reply-list': [
+            ('reply-list', user, get('reply-list')),
+            ('reply-list (token)', None, get_with_token('reply-list')),
+        ],
+        'question-results': [
+            ('question-results', None,
+             get('question-results', concluded)),
+            ('question-results (staff, live)', staff,
+             get('question-results', open_question)),
+        ],
+        'record': [
+            ('record', user, get('record')),
+            ('record (token)', None, get_with_token('record')),
+        ],
+        'leaderboard': [('leaderboard', user, get('leaderboard'))],
+        'location-leaderboard': [
+            ('location-leaderboard', user,
+             get('location-leaderboard', user.profile.location)),
+        ],
+        'metrics': [('metrics', staff, get('metrics'))],
+        'profiler': [('profiler', staff, get('profiler', seconds=0))],
+        'api-token-auth/': [
+            ('api-token-auth', None, lambda client: client.post(
+                '/api-token-auth/',
+                {'username': user.username, 'password': PASSWORD}
+            )),
+        ],
+        'api-token-refresh': [
+            ('api-token-refresh', None, lambda client: client.post(
+                reverse('api-token-refresh'),
+                HTTP_AUTHORIZATION=f'Token {data["token"].key}'
+            )),
+        ],
+        'create-user': [('create-user', None, create_user)],
+        'profile': [('profile', user, get('profile'))],
+    }
+
+
+def get_route_names():
+    """
+    Get the name of every route in 'vp_app' and 'users'.
+    """
+    from users.urls import urlpatterns as users_urls
+    from vp_app.urls import urlpatterns as vp_app_urls
+    return [
+        pattern.name or str(pattern.pattern)
+        for pattern in vp_app_urls + users_urls
+    ]
+
+
+def measure(client, request, samples):
+    """
+    Time 'samples' requests, then make one more to count queries and
+    one more to measure peak memory.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def call():
+        response = request(client)
+        assert response.status_code < 400, \
+            f'{response.status_code}: {response.content[:200]}'
+
+    call()
+    durations = time_calls(call, samples)
+    with CaptureQueriesContext(connection) as queries:
+        call()
+    # Captured queries are read from the connection's log, which the
+    # next request clears.
+    query_count = len(queries)
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    result = percentiles(durations)
+    result['queries'] = query_count
+    result['peak_kib'] = round(peak / 1024, 1)
+    return result
+
+
+def run(sizes, samples, seed):
+    from rest_framework.test import APIClient
+    results = {}
+    for size in sizes:
+        start = time.perf_counter()
+        data = build_dataset(size, seed)
+        print(f'\n{size} replies (generated in '
+              f'{time.perf_counter() - start:.1f}s)')
+        print(f'{"endpoint":<34}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+              f'{"queries":>9}{"peak KiB":>10}')
+        cases = get_cases(data)
+        missing = set(get_route_names()) - set(cases)
+        if missing:
+            sys.exit(f'No benchmark case for routes: {sorted(missing)}')
+        results[str(size)] = {}
+        for route_cases in cases.values():
+            for name, user, request in route_cases:
+                client = APIClient()
+                if user is not None:
+                    client.force_authenticate(user)
+                result = measure(client, request, samples)
+                results[str(size)][name] = result
+                print(f'{name:<34}{result["p50"]:>9}{result["p95"]:>9}'
+                      f'{result["p99"]:>9}{result["queries"]:>9}'
+                      f'{result["peak_kib"]:>10}')
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a baseline. Return a list of regression
+    messages: any endpoint whose p95 latency grew by more than
+    'tolerance' (a fraction), or which issues more queries.
+    """
+    regressions = []
+    for size, endpoints in results.items():
+        for name, result in endpoints.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            if result['queries'] > previous['queries']:
+                regressions.append(
+                    f'{name} @ {size} replies: {result["queries"]} queries '
+                    f'(baseline {previous["queries"]})'
+                )
+            if result['p95'] > previous['p95'] * (1 + tolerance):
+                regressions.append(
+                    f'{name} @ {size} replies: p95 {result["p95"]} ms '
+                    f'(baseline {previous["p95"]} ms, '
+                    f'+{result["p95"] / previous["p95"] - 1:.0%})'
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        '--sizes', default='1000,100000,1000000',
+        help='Comma-separated numbers of Replies to generate.'
+    )
+    parser.add_argument('--samples', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the results to this file.')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help='Allowed p95 slowdown before reporting a regression, as a '
+             'fraction of the baseline.'
+    )
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    setup_django()
+    destroy = create_database()
+    try:
+        results = run(
+            [int(size) for size in args.sizes.split(',')],
+            args.samples,
+            args.seed
+        )
+    finally:
+        destroy()
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+        print(f'\nSaved baseline to {args.baseline}.')
+        return
+    if not os.path.exists(args.baseline):
+        print(f'\nNo baseline at {args.baseline}; nothing to compare.')
+        return
+    with open(args.baseline) as baseline:
+        regressions = compare(results, json.load(baseline), args.tolerance)
+    if regressions:
+        print('\nRegressions against the baseline:')
+        for regression in regressions:
+            print(f'  {regression}')
+        sys.exit(1)
+    print('\nNo regressions against the baseline.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure the overhead of the performance metrics middleware by timing
+requests with and without it, alternating between the two so that
+both see the same machine load. From the 'vp_project' directory:
+
+    $ python -m benchmarks.instrumentation --replies 100000
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.common import create_database, setup_django
+
+
+MIDDLEWARE = 'vp_app.middleware.PerformanceMetricsMiddleware'
+
+
+def make_client(middleware, user):
+    """
+    Create a client whose handler runs the given middleware. Clients
+    load their middleware on the first request, so the settings only
+    need to be overridden for that one.
+    """
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    client = APIClient()
+    client.force_authenticate(user)
+    with override_settings(
+            MIDDLEWARE=middleware,
+            PERFORMANCE_METRICS={'SERVER_TIMING': True}):
+        client.get(reverse('root-index'))
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--replies', type=int, default=100000)
+    parser.add_argument('--samples', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    destroy = create_database()
+    try:
+        from django.conf import settings
+        from benchmarks.endpoints import build_dataset, get_cases
+        assert MIDDLEWARE in settings.MIDDLEWARE
+        data = build_dataset(args.replies, args.seed)
+        with_metrics = make_client(settings.MIDDLEWARE, data['staff'])
+        without_metrics = make_client(
+            [name for name in settings.MIDDLEWARE if name != MIDDLEWARE],
+            data['staff']
+        )
+        cases = get_cases(data)
+        names = ['root-index', 'question-list', 'question-results',
+                 'record', 'leaderboard']
+
+        print(f'{"endpoint":<20}{"off µs":>10}{"on µs":>10}'
+              f'{"overhead µs":>13}{"overhead":>10}')
+        for name in names:
+            _, _, request = cases[name][0]
+            durations = {with_metrics: [], without_metrics: []}
+            for _ in range(args.samples):
+                for client in durations:
+                    start = time.perf_counter()
+                    request(client)
+                    durations[client].append(time.perf_counter() - start)
+            off = statistics.median(durations[without_metrics]) * 1e6
+            on = statistics.median(durations[with_metrics]) * 1e6
+            print(f'{name:<20}{off:>10.0f}{on:>10.0f}{on - off:>13.0f}'
+                  f'{(on - off) / off:>10.1%}')
+    finally:
+        destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark leaderboard lookups against a large number of synthetic
+Users. From the 'vp_project' directory:
+
+    $ python -m benchmarks.leaderboard --users 1000000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import (
+    create_database,
+    percentiles,
+    setup_django,
+    time_calls
+)
+
+
+def populate(users, questions, seed, batch_size=10000):
+    from django.contrib.auth.models import User
+    from users.models import states
+    from vp_app.leaderboard import rebuild_buckets
+    from vp_app.models import Score
+
+    rng = random.Random(seed)
+    locations = [location for location, _ in states]
+    for start in range(0, users, batch_size):
+        stop = min(start + batch_size, users)
+        User.objects.bulk_create([
+            User(id=number, username=f'user_{number}', password='!')
+            for number in range(start + 1, stop + 1)
+        ])
+        scores = []
+        for number in range(start + 1, stop + 1):
+            replies = rng.randint(1, questions)
+            scores.append(Score(
+                user_id=number,
+                location=rng.choice(locations),
+                total_replies=replies,
+                correct_predictions=rng.randint(0, replies)
+            ))
+        Score.objects.bulk_create(scores)
+    rebuild_buckets()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--questions', type=int, default=50)
+    parser.add_argument('--samples', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    destroy = create_database()
+    try:
+        from vp_app.leaderboard import get_leaders, get_rank
+        from vp_app.models import Score
+
+        start = time.perf_counter()
+        populate(args.users, args.questions, args.seed)
+        print(f'Created {args.users} users in '
+              f'{time.perf_counter() - start:.1f}s.')
+
+        rng = random.Random(args.seed)
+
+        def my_rank(location=None):
+            score = Score.objects.get(user=rng.randint(1, args.users))
+            return get_rank(score, location and score.location)
+
+        cases = [
+            ('top 100', lambda: get_leaders(None, 100)),
+            ('top 100 in florida', lambda: get_leaders('florida', 100)),
+            ('my rank', my_rank),
+            ('my rank in my location', lambda: my_rank(True)),
+        ]
+        print(f'{"lookup":<24}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+        for name, function in cases:
+            summary = percentiles(time_calls(function, args.samples))
+            print(f'{name:<24}{summary["p50"]:>10}{summary["p95"]:>10}'
+                  f'{summary["p99"]:>10}')
+    finally:
+        destroy()
+
+
+if __name__ == '__main__':
+    main()
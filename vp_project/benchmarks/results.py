@@ -0,0 +1,144 @@
+"""
+Load test for 'questions/<id>/results/' as a Question concludes: many
+clients request its results at the same moment, before they have been
+frozen. Counts the SQL queries run by all of the requests together,
+with and without single-flight freezing. From the 'vp_project'
+directory:
+
+    $ python -m benchmarks.results --concurrency 1 4 16 64
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.common import create_database, setup_django
+
+
+def populate(users, seed):
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from users.models import Profile, states
+    from vp_app.models import Answer, Question, Reply
+    from vp_app.tallies import rebuild_tallies
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    question = Question.objects.create(
+        content='question',
+        date_published=now - timezone.timedelta(days=2),
+        date_concluded=now - timezone.timedelta(days=1)
+    )
+    answers = [
+        Answer.objects.create(content=f'answer {number}', question=question)
+        for number in range(4)
+    ]
+    User.objects.bulk_create([
+        User(id=number, username=f'user_{number}', password='!')
+        for number in range(1, users + 1)
+    ])
+    locations = [location for location, _ in states]
+    Profile.objects.bulk_create([
+        Profile(user_id=number, location=rng.choice(locations))
+        for number in range(1, users + 1)
+    ])
+    Reply.objects.bulk_create([
+        Reply(
+            user_id=number,
+            question=question,
+            vote=rng.choice(answers),
+            prediction=rng.choice(answers)
+        ) for number in range(1, users + 1)
+    ])
+    rebuild_tallies()
+    return question
+
+
+def herd(url, concurrency):
+    """
+    Request 'url' from 'concurrency' threads at once. Return the number
+    of queries they ran, and the slowest request's duration in seconds.
+    """
+    from django.db import connection
+    from django.test import Client
+
+    barrier = threading.Barrier(concurrency)
+    lock = threading.Lock()
+    totals = {'queries': 0, 'slowest': 0}
+
+    def count(execute, sql, params, many, context):
+        with lock:
+            totals['queries'] += 1
+        return execute(sql, params, many, context)
+
+    def request():
+        client = Client()
+        try:
+            with connection.execute_wrapper(count):
+                barrier.wait()
+                start = time.perf_counter()
+                response = client.get(url)
+                duration = time.perf_counter() - start
+            assert response.status_code == 200, response.status_code
+            with lock:
+                totals['slowest'] = max(totals['slowest'], duration)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=request) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return totals['queries'], totals['slowest']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 4, 16, 64])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+
+    # Threads need their own connections to one database, which an
+    # in-memory SQLite database cannot give them.
+    directory = tempfile.TemporaryDirectory()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory.name, 'results.sqlite3'
+    )
+    connection.settings_dict['OPTIONS'] = {'timeout': 60}
+    destroy = create_database()
+    try:
+        from django.urls import reverse
+        from vp_app.models import ResultsSnapshot
+        from vp_app.questioncache import get_question_metadata
+
+        question = populate(args.users, args.seed)
+        url = reverse('question-results', args=[question.id])
+        get_question_metadata(question.id)
+
+        print(f'{"clients":>8}{"single-flight":>24}{"unprotected":>24}')
+        print(f'{"":>8}{"queries":>12}{"slowest ms":>12}'
+              f'{"queries":>12}{"slowest ms":>12}')
+        for concurrency in args.concurrency:
+            row = f'{concurrency:>8}'
+            for enabled in (True, False):
+                settings.RESULTS_SINGLE_FLIGHT = {'ENABLED': enabled}
+                ResultsSnapshot.objects.all().delete()
+                queries, slowest = herd(url, concurrency)
+                row += f'{queries:>12}{slowest * 1000:>12.1f}'
+            print(row)
+    finally:
+        destroy()
+        directory.cleanup()
+
+
+if __name__ == '__main__':
+    main()
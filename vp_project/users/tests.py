@@ -27,6 +27,8 @@ class UserCreateTests(APITestCase):
             'testemail@example.com'
         )
         self.assertEqual(len(response.data), 3)
+        user = User.objects.get(username='testusername')
+        self.assertTrue(user.check_password('testpassword123'))
 
     def test_create_user_no_username(self):
         """
@@ -1,9 +1,13 @@
 from django.urls import path
-from rest_framework.authtoken import views as authtoken_views
 from . import views as users_views
 
 urlpatterns = [
-    path('api-token-auth/', authtoken_views.obtain_auth_token),
+    path('api-token-auth/', users_views.ObtainTokens.as_view()),
+    path(
+        'api-token-refresh/',
+        users_views.RefreshAccessToken.as_view(),
+        name='api-token-refresh'
+    ),
     path('users/', users_views.UserCreate.as_view(), name='create-user'),
     path(
         'profile/',
@@ -1,26 +1,43 @@
-from rest_framework import generics, permissions, authentication
+from django.contrib.auth.hashers import make_password
+from django.http import Http404
+from rest_framework import generics, permissions, authentication, views
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
+from vp_app.authentication import (
+    CachingTokenAuthentication,
+    SignedTokenAuthentication,
+    get_access_options,
+    issue_access_token
+)
 from .serializers import UserSerializer, ProfileSerializer
 from .models import Profile
 
 
 class UserCreate(generics.CreateAPIView):
+    query_budget = 5
     serializer_class = UserSerializer
 
     def perform_create(self, serializer):
         """
-        Hash password and create user.
+        Hash password and create user. The password is hashed before
+        the User is first saved, so that creating them is a single
+        INSERT rather than a create and an update (which would also
+        invalidate their tokens, see 'vp_app/signals.py').
         """
-        new_user = serializer.save()
-        new_user.set_password(new_user.password)
-        new_user.save()
+        new_user = serializer.save(
+            password=make_password(serializer.validated_data['password'])
+        )
         Profile.objects.create(user=new_user)
 
 
 class ProfileDetail(generics.RetrieveUpdateAPIView):
+    query_budget = 8
     serializer_class = ProfileSerializer
     authentication_classes = [
-        authentication.TokenAuthentication,
+        CachingTokenAuthentication,
         authentication.SessionAuthentication,
+        SignedTokenAuthentication,
     ]
     permission_classes = [permissions.IsAuthenticated, ]
 
@@ -29,3 +46,42 @@ class ProfileDetail(generics.RetrieveUpdateAPIView):
         Get Profile based on User.
         """
         return Profile.objects.get(user=self.request.user)
+
+
+class ObtainTokens(ObtainAuthToken):
+    query_budget = 3
+
+    def post(self, request, *args, **kwargs):
+        """
+        Exchange a username and password for the User's API Token, as
+        DRF's 'obtain_auth_token' does. When signed access tokens are
+        enabled, also issue one ('access'), which authenticates requests
+        without a database lookup until it expires ('expires_in').
+        """
+        serializer = self.serializer_class(
+            data=request.data,
+            context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        token, created = Token.objects.get_or_create(user=user)
+        data = {'token': token.key}
+        if get_access_options()['ENABLED']:
+            data.update(issue_access_token(user))
+        return Response(data)
+
+
+class RefreshAccessToken(views.APIView):
+    query_budget = 1
+    authentication_classes = [CachingTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated, ]
+
+    def post(self, request, format=None):
+        """
+        Issue a new signed access token to a User authenticated with
+        their API Token, which acts as the refresh token. Deleting the
+        API Token revokes both.
+        """
+        if not get_access_options()['ENABLED']:
+            raise Http404
+        return Response(issue_access_token(request.user))
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class VpAppConfig(AppConfig):
     name = 'vp_app'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
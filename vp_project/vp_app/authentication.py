@@ -0,0 +1,193 @@
+import time
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import caches
+from django.db import router, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from .caching import LRUCache
+from .models import AccessTokenRevocation
+
+
+class TokenCache(LRUCache):
+    """
+    Cache of Tokens and their Users by key. The rows are cached as
+    values, and fresh instances are built for every request, so that
+    nothing a request attaches to its User outlives it. Deleting a
+    Token, or saving its User (e.g. to deactivate them or change their
+    password), discards it (see 'signals.py').
+    """
+    generation_key = 'vp_app:token-authentication:generation'
+
+    def load(self, key):
+        token = Token.objects.select_related('user').filter(key=key).first()
+        if token is None:
+            return None
+        return (
+            token._state.db,
+            [getattr(token, field.attname)
+             for field in Token._meta.concrete_fields],
+            [getattr(token.user, field.attname)
+             for field in User._meta.concrete_fields]
+        )
+
+    def get_token(self, key):
+        """
+        Get a Token with its User, or None if there is no such Token.
+        """
+        entry = self.get(key)
+        if entry is None:
+            return None
+        db, token_values, user_values = entry
+        token = Token.from_db(db, [
+            field.attname for field in Token._meta.concrete_fields
+        ], token_values)
+        token.user = User.from_db(db, [
+            field.attname for field in User._meta.concrete_fields
+        ], user_values)
+        return token
+
+
+options = getattr(settings, 'TOKEN_AUTHENTICATION_CACHE', {})
+token_cache = TokenCache(
+    max_size=options.get('MAX_SIZE', 10000),
+    ttl=options.get('TTL', 300),
+    cache_alias=options.get('CACHE', 'default')
+)
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that looks Tokens up in 'token_cache' instead
+    of querying for them on every request. Invalid Tokens are not
+    cached, and give the same errors as 'TokenAuthentication'.
+    """
+    def authenticate_credentials(self, key):
+        token = token_cache.get_token(key)
+        if token is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        return (token.user, token)
+
+
+ACCESS_TOKEN_SALT = 'vp_app.authentication.access'
+
+
+def get_access_options():
+    options = {'ENABLED': True, 'MAX_AGE': 900, 'CACHE': 'default'}
+    options.update(getattr(settings, 'SIGNED_ACCESS_TOKENS', {}))
+    return options
+
+
+def issue_access_token(user):
+    """
+    Sign an access token carrying the User's id and staff flag. Return
+    it with its lifetime in seconds, as response data.
+    """
+    token = signing.dumps({
+        'user': user.pk,
+        'staff': user.is_staff,
+        'issued': time.time(),
+    }, salt=ACCESS_TOKEN_SALT)
+    return {'access': token, 'expires_in': get_access_options()['MAX_AGE']}
+
+
+def get_revocation_key(user_id):
+    return f'vp_app:access-revoked:{user_id}'
+
+
+def revoke_access_tokens(user_id):
+    """
+    Refuse the access tokens issued to a User until now. The time is
+    stored as an AccessTokenRevocation, which a cache eviction cannot
+    lose, and the cached read of it is replaced, now and again once the
+    transaction commits.
+    """
+    now = timezone.now()
+    revoked = AccessTokenRevocation.objects.filter(user=user_id) \
+        .update(date_revoked=now)
+    if not revoked:
+        AccessTokenRevocation.objects.create(user_id=user_id,
+                                             date_revoked=now)
+
+    def cache_revocation():
+        options = get_access_options()
+        caches[options['CACHE']].set(
+            get_revocation_key(user_id),
+            now.timestamp(),
+            timeout=options['MAX_AGE']
+        )
+
+    cache_revocation()
+    transaction.on_commit(cache_revocation)
+
+
+def get_revocation_time(user_id):
+    """
+    Return when a User's access tokens were last revoked, as a
+    timestamp, or 0 if they never were. The read is cached for
+    'MAX_AGE' seconds; an evicted entry is read again.
+    """
+    options = get_access_options()
+    cache = caches[options['CACHE']]
+    key = get_revocation_key(user_id)
+    revoked = cache.get(key)
+    if revoked is None:
+        date = AccessTokenRevocation.objects.filter(user=user_id) \
+            .values_list('date_revoked', flat=True).first()
+        revoked = date.timestamp() if date is not None else 0
+        cache.set(key, revoked, timeout=options['MAX_AGE'])
+    return revoked
+
+
+class SignedTokenAuthentication(TokenAuthentication):
+    """
+    Authenticate 'Authorization: Bearer <token>' requests with a signed
+    access token (see 'issue_access_token()') without querying the User
+    or Token tables. The User is built from the token with all fields
+    but its id and staff flag deferred, so views that read more of it
+    load only what they read. Any save of the User revokes the tokens
+    issued before it, so the staff and active flags of a token that is
+    not revoked are current. Configured with the 'SIGNED_ACCESS_TOKENS'
+    setting.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        if not get_access_options()['ENABLED']:
+            return None
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        options = get_access_options()
+        try:
+            payload = signing.loads(
+                key,
+                salt=ACCESS_TOKEN_SALT,
+                max_age=options['MAX_AGE']
+            )
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if payload['issued'] <= get_revocation_time(payload['user']):
+            raise exceptions.AuthenticationFailed(
+                _('Token has been revoked.')
+            )
+
+        user = User.from_db(
+            router.db_for_read(User),
+            ['id', 'is_staff', 'is_active'],
+            [payload['user'], payload['staff'], True]
+        )
+        return (user, payload)
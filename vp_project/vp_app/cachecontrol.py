@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+
+
+def get_options():
+    options = {
+        'ENABLED': True,
+        'OPEN_MAX_AGE': 60,
+        'CONCLUDED_MAX_AGE': 300,
+    }
+    options.update(getattr(settings, 'CACHE_CONTROL', {}))
+    return options
+
+
+def shared_policy():
+    """
+    Data that is the same for everyone but may still change: shared
+    caches keep it for 'OPEN_MAX_AGE' seconds, and browsers revalidate
+    it (see 'conditional.py') on every use.
+    """
+    return {
+        'public': True,
+        'max_age': 0,
+        's_maxage': get_options()['OPEN_MAX_AGE'],
+    }
+
+
+def concluded_policy():
+    """
+    Data that rarely changes once its Question concludes, but still may
+    (e.g. a Reply is deleted): anyone may keep it for
+    'CONCLUDED_MAX_AGE' seconds, then must revalidate it, which costs a
+    304 while it is unchanged.
+    """
+    return {
+        'public': True,
+        'max_age': get_options()['CONCLUDED_MAX_AGE'],
+        'must_revalidate': True,
+    }
+
+
+def pending_policy(boundary):
+    """
+    A response that holds until the Question reaches its next phase at
+    'boundary' (e.g. the 404 for results before it concludes): the
+    browser may keep it for 'OPEN_MAX_AGE' seconds, but never past the
+    boundary.
+    """
+    seconds = int((boundary - timezone.now()).total_seconds())
+    return {
+        'private': True,
+        'max_age': max(0, min(get_options()['OPEN_MAX_AGE'], seconds)),
+    }
+
+
+def private_policy(revalidate=False):
+    """
+    Data for one User only. With 'revalidate', the browser may keep it
+    as long as it revalidates it on every use. Otherwise it is not kept
+    at all.
+    """
+    if revalidate:
+        return {'private': True, 'no_cache': True}
+    return {'private': True, 'no_store': True}
+
+
+def apply_policy(request, response, policy):
+    """
+    Set Cache-Control on a GET response from a policy above, unless the
+    view already set it. Only JSON is public: the browsable API renders
+    forms and the signed-in User, so it is always private.
+    """
+    if not get_options()['ENABLED'] or policy is None \
+            or request.method not in ('GET', 'HEAD') \
+            or response.has_header('Cache-Control'):
+        return response
+    renderer = getattr(request, 'accepted_renderer', None)
+    if policy.get('public') and renderer is not None \
+            and renderer.format != 'json':
+        policy = private_policy(revalidate=True)
+    patch_cache_control(response, **policy)
+    return response
+
+
+class CacheControlMixin:
+    """
+    Set Cache-Control on successful GET responses (including 304s) from
+    the policy returned by 'get_cache_policy()'. Configured with the
+    'CACHE_CONTROL' setting.
+    """
+    def get_cache_policy(self, request, response):
+        raise NotImplementedError
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if response.status_code in (200, 304):
+            apply_policy(
+                request,
+                response,
+                self.get_cache_policy(request, response)
+            )
+        return response
@@ -0,0 +1,106 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.core.cache import caches
+
+
+class LRUCache:
+    """
+    Process-local LRU cache whose entries expire after 'ttl' seconds.
+    Subclasses set 'generation_key' and implement 'load()', which reads
+    the value of a key, or returns None if there is none. Missing values
+    are not cached.
+
+    Invalidating a key discards it here and gives it a new version in
+    the Django cache 'cache_alias'. Other processes see the new version
+    on their next lookup of that key and reload it, as long as that
+    cache is shared between them. Invalidating every key gives a new
+    generation, kept under 'generation_key', instead, which empties the
+    caches of every process. Versions and generations are random, and
+    one that is missing (e.g. evicted) is replaced by a new one, so an
+    eviction causes reloads rather than stale hits.
+    """
+    generation_key = None
+
+    def __init__(self, max_size=1024, ttl=60, cache_alias='default'):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache_alias = cache_alias
+        self.entries = OrderedDict()
+        self.generation = None
+        self.lock = threading.Lock()
+
+    def load(self, key):
+        raise NotImplementedError
+
+    def get_version_key(self, key):
+        return f'{self.generation_key}:{key}'
+
+    def get(self, key):
+        version_key = self.get_version_key(key)
+        shared = caches[self.cache_alias].get_many(
+            [self.generation_key, version_key]
+        )
+        generation = shared.get(self.generation_key) \
+            or self.add_version(self.generation_key, None)
+        version = shared.get(version_key) \
+            or self.add_version(version_key, self.ttl + 1)
+        now = time.monotonic()
+        with self.lock:
+            if generation != self.generation:
+                self.entries.clear()
+                self.generation = generation
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now and entry[2] == version:
+                self.entries.move_to_end(key)
+                return entry[1]
+
+        value = self.load(key)
+        with self.lock:
+            # Skip storing a value read before an invalidation.
+            if value is not None and generation == self.generation:
+                self.entries[key] = (now + self.ttl, value, version)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+        return value
+
+    def add_version(self, version_key, timeout):
+        """
+        Start a new version (or generation) where there is none, unless
+        another process just did, and return the one stored.
+        """
+        version = uuid.uuid4().hex
+        shared = caches[self.cache_alias]
+        if shared.add(version_key, version, timeout=timeout):
+            return version
+        return shared.get(version_key) or version
+
+    def invalidate(self, key=None):
+        """
+        Discard a key, or every key if 'key' is None, in this process
+        and (through its version or the generation) in every other.
+        Versions are kept a little longer than the entries they
+        invalidate.
+        """
+        self.clear(key)
+        shared = caches[self.cache_alias]
+        if key is None:
+            shared.set(self.generation_key, uuid.uuid4().hex, timeout=None)
+        else:
+            shared.set(
+                self.get_version_key(key),
+                uuid.uuid4().hex,
+                timeout=self.ttl + 1
+            )
+
+    def clear(self, key=None):
+        """
+        Discard entries in this process only.
+        """
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
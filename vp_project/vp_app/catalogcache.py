@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.renderers import JSONRenderer
+from .responses import PrerenderedResponse
+
+
+# Replaced whenever a Question or an Answer is saved or deleted (see
+# 'signals.py'). Cached responses are keyed on it, so bumping it makes
+# every cached response unreachable at once; they then expire.
+# Generations are random, and a missing one (e.g. evicted) is replaced
+# by a new one, so no generation is ever used twice.
+GENERATION_KEY = 'vp_app:catalog:generation'
+
+
+def get_options():
+    options = {
+        'ENABLED': True,
+        'CACHE': 'default',
+        'TIMEOUT': 3600,
+    }
+    options.update(getattr(settings, 'CATALOG_CACHE', {}))
+    return options
+
+
+def bump_generation():
+    cache = caches[get_options()['CACHE']]
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def get_generation(cache):
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if not cache.add(GENERATION_KEY, generation, timeout=None):
+            generation = cache.get(GENERATION_KEY) or generation
+    return generation
+
+
+class CatalogCacheMixin:
+    """
+    Serve GET requests from JSON rendered once per catalog generation
+    and kept, along with its gzipped form, in a Django cache. Responses
+    are keyed on the generation and the full request URI, so pages and
+    '?expand=' variants are cached separately. Only compact JSON is
+    cached: other renderers, such as the browsable API, render per user.
+    Configured with the 'CATALOG_CACHE' setting.
+    """
+    def get_cache_key(self, cache, request, kind):
+        return 'vp_app:catalog:{}:{}:{}'.format(
+            get_generation(cache),
+            kind,
+            hashlib.sha256(
+                request.build_absolute_uri().encode('utf-8')
+            ).hexdigest()
+        )
+
+    def get_catalog_version(self, request, compute):
+        """
+        Return the version of the requested resource given by
+        'compute()', computed once per catalog generation, so that
+        conditional GETs (see 'conditional.py') are validated without
+        queries. A version of None is not cached.
+        """
+        options = get_options()
+        if not options['ENABLED']:
+            return compute()
+
+        cache = caches[options['CACHE']]
+        key = self.get_cache_key(cache, request, 'version')
+        version = cache.get(key)
+        if version is None:
+            version = compute()
+            if version is not None:
+                cache.set(key, version, options['TIMEOUT'])
+        return version
+
+    def get(self, request, *args, **kwargs):
+        options = get_options()
+        if not options['ENABLED'] \
+                or request.accepted_renderer.format != 'json' \
+                or 'indent' in request.accepted_media_type:
+            return super().get(request, *args, **kwargs)
+
+        cache = caches[options['CACHE']]
+        key = self.get_cache_key(cache, request, 'response')
+        cached = cache.get(key)
+        if cached is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            content = JSONRenderer().render(response.data)
+            cached = (content, gzip.compress(content, mtime=0))
+            cache.set(key, cached, options['TIMEOUT'])
+        return PrerenderedResponse(*cached)
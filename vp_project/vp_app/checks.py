@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+# Backends whose entries are only seen by the process that wrote them.
+LOCAL_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def get_shared_caches():
+    """
+    List '(setting, alias, check id)' for the caches that hold state
+    every process serving the API must see: cached reads of access token
+    revocations, the versions and generations that invalidate
+    process-local caches, and single-flight locks.
+    """
+    from .authentication import get_access_options
+    from .catalogcache import get_options as get_catalog_options
+    from .conclusion import get_results_options
+
+    caches = []
+    if get_access_options()['ENABLED']:
+        caches.append((
+            'SIGNED_ACCESS_TOKENS',
+            get_access_options()['CACHE'],
+            'vp_app.E001'
+        ))
+    for setting in ['TOKEN_AUTHENTICATION_CACHE', 'QUESTION_METADATA_CACHE']:
+        caches.append((
+            setting,
+            getattr(settings, setting, {}).get('CACHE', 'default'),
+            'vp_app.E002'
+        ))
+    if get_catalog_options()['ENABLED']:
+        caches.append((
+            'CATALOG_CACHE',
+            get_catalog_options()['CACHE'],
+            'vp_app.E002'
+        ))
+    if get_results_options()['ENABLED']:
+        caches.append((
+            'RESULTS_SINGLE_FLIGHT',
+            get_results_options()['CACHE'],
+            'vp_app.E002'
+        ))
+    return caches
+
+
+@register()
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Refuse local-memory caches where state must be shared between
+    processes. With one, a User deactivated in one process would keep
+    a working access token in the others until their cached read of
+    its revocation expired, and edits would not reach the other
+    processes' caches until they expired.
+    """
+    errors = []
+    for setting, alias, id in get_shared_caches():
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend is None:
+            errors.append(Error(
+                f"{setting} uses the cache '{alias}', which is not "
+                f"configured in CACHES.",
+                id=id
+            ))
+        elif backend in LOCAL_BACKENDS:
+            errors.append(Error(
+                f"{setting} uses the cache '{alias}', whose backend "
+                f"({backend}) is not shared between processes.",
+                hint='Use a shared cache backend, such as Memcached, or '
+                     'silence this check when a single process serves '
+                     'the API.',
+                id=id
+            ))
+    return errors
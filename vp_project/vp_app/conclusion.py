@@ -0,0 +1,340 @@
+import gzip
+import hashlib
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from .models import Question, AnswerTally, Reply, ResultsSnapshot, Score
+from .leaderboard import adjust_buckets, rebuild_buckets
+from .serializers import ResultsSerializer
+from .singleflight import SingleFlight
+
+
+def freeze_results(question):
+    """
+    Render the results of a concluded Question and store them as a
+    ResultsSnapshot. If a snapshot already exists, it is returned
+    unchanged.
+    """
+    content = JSONRenderer().render(ResultsSerializer(question).data)
+    snapshot, _ = ResultsSnapshot.objects.get_or_create(
+        question=question,
+        defaults={
+            'content': content,
+            'content_gzip': gzip.compress(content, mtime=0),
+            'etag': '"{}"'.format(hashlib.sha256(content).hexdigest()),
+        }
+    )
+    return snapshot
+
+
+def get_results_options():
+    options = {
+        'ENABLED': True,
+        'CACHE': 'default',
+        'LOCK_TIMEOUT': 30,
+        'WAIT_TIMEOUT': 10,
+        'STALE_WHILE_REVALIDATE': False,
+        'STALE_TTL': 300,
+    }
+    options.update(getattr(settings, 'RESULTS_SINGLE_FLIGHT', {}))
+    return options
+
+
+results_flight = SingleFlight('results')
+
+
+def get_results_flight(options):
+    """
+    Return 'results_flight', which keeps this process's freezes in
+    progress, configured from 'options' (see 'get_results_options()').
+    """
+    results_flight.cache_alias = options['CACHE']
+    results_flight.lock_timeout = options['LOCK_TIMEOUT']
+    results_flight.wait_timeout = options['WAIT_TIMEOUT']
+    return results_flight
+
+
+def get_stale_key(question_id):
+    return f'vp_app:results:stale:{question_id}'
+
+
+def keep_stale_results(question_id):
+    """
+    In stale-while-revalidate mode, copy a Question's ResultsSnapshot,
+    about to be discarded, to the Django cache for 'STALE_TTL' seconds,
+    to be served while the results are frozen again.
+    """
+    options = get_results_options()
+    if not options['STALE_WHILE_REVALIDATE']:
+        return
+    snapshot = ResultsSnapshot.objects.filter(pk=question_id).first()
+    if snapshot is not None:
+        caches[options['CACHE']].set(
+            get_stale_key(question_id),
+            snapshot,
+            options['STALE_TTL']
+        )
+
+
+def get_stale_results(question_id):
+    snapshot = caches[get_results_options()['CACHE']].get(
+        get_stale_key(question_id)
+    )
+    if snapshot is not None:
+        snapshot.stale = True
+    return snapshot
+
+
+def get_results_snapshot(question_id, get_question):
+    """
+    Get the ResultsSnapshot of a concluded Question, freezing it first
+    with the Question 'get_question()' loads if there is none. When
+    many requests miss at once (e.g. as a popular Question concludes),
+    it is frozen once, and the other requests wait for it (see
+    'singleflight.py'). In stale-while-revalidate mode, they are served
+    the previous snapshot, if one was kept, marked 'stale'.
+    """
+    def lookup():
+        return ResultsSnapshot.objects.filter(pk=question_id).first()
+
+    def compute():
+        return freeze_results(get_question())
+
+    options = get_results_options()
+    if not options['ENABLED']:
+        return lookup() or compute()
+    stale = None
+    if options['STALE_WHILE_REVALIDATE']:
+        def stale():
+            return get_stale_results(question_id)
+    return get_results_flight(options) \
+        .run(question_id, lookup, compute, stale)
+
+
+def get_winning_answer(question):
+    """
+    Get the id of the Answer with the most votes, or None if nobody
+    voted. Ties go to the first Answer.
+    """
+    top_tally = AnswerTally.objects \
+        .filter(answer__question=question, votes__gt=0) \
+        .order_by('-votes', 'answer_id') \
+        .first()
+    return top_tally and top_tally.answer_id
+
+
+def add_to_scores(replies, winning_answer, batch_size=1000):
+    """
+    Add a set of Replies to their Users' Scores, in one pass over the
+    Replies. Users are updated in bulk, 'batch_size' at a time, and the
+    leaderboard buckets are moved along with them.
+    """
+    counts = replies \
+        .values_list('user', 'user__profile__location') \
+        .annotate(
+            replies=Count('id'),
+            correct=Count('id', filter=Q(prediction=winning_answer))
+        ) \
+        .order_by('user')
+    counts = list(counts)
+    buckets = Counter()
+    for start in range(0, len(counts), batch_size):
+        batch = counts[start:start + batch_size]
+        scores = {
+            user_id: (location, correct)
+            for user_id, location, correct in Score.objects
+            .select_for_update()
+            .filter(user__in=[user_id for user_id, _, _, _ in batch])
+            .values_list('user', 'location', 'correct_predictions')
+        }
+
+        # Users whose Scores change by the same amount are updated
+        # together. Replies to one Question change each Score by one
+        # reply and zero or one correct prediction, so this is usually
+        # two UPDATE queries per batch.
+        increments = defaultdict(list)
+        missing = []
+        for user_id, location, replies, correct in batch:
+            if user_id in scores:
+                location, previous = scores[user_id]
+                buckets[location, previous] -= 1
+                buckets[location, previous + correct] += 1
+                increments[replies, correct].append(user_id)
+            else:
+                location = location or ''
+                buckets[location, correct] += 1
+                missing.append(Score(
+                    user_id=user_id,
+                    location=location,
+                    total_replies=replies,
+                    correct_predictions=correct
+                ))
+        Score.objects.bulk_create(missing)
+        for (replies, correct), user_ids in increments.items():
+            Score.objects.filter(user__in=user_ids).update(
+                total_replies=F('total_replies') + replies,
+                correct_predictions=F('correct_predictions') + correct
+            )
+    adjust_buckets(buckets)
+
+
+def remove_from_scores(replies, winning_answer, batch_size=1000):
+    """
+    Take a set of Replies back out of their Users' Scores, reversing
+    'add_to_scores()'. Scores left without replies are deleted, as if
+    they had never been created.
+    """
+    counts = replies \
+        .values_list('user') \
+        .annotate(
+            replies=Count('id'),
+            correct=Count('id', filter=Q(prediction=winning_answer))
+        ) \
+        .order_by('user')
+    counts = list(counts)
+    buckets = Counter()
+    for start in range(0, len(counts), batch_size):
+        batch = counts[start:start + batch_size]
+        scores = {
+            user_id: (location, total, previous)
+            for user_id, location, total, previous in Score.objects
+            .select_for_update()
+            .filter(user__in=[user_id for user_id, _, _ in batch])
+            .values_list('user', 'location', 'total_replies',
+                         'correct_predictions')
+        }
+        decrements = defaultdict(list)
+        emptied = []
+        for user_id, replies, correct in batch:
+            if user_id not in scores:
+                continue
+            location, total, previous = scores[user_id]
+            buckets[location, previous] -= 1
+            if total <= replies:
+                emptied.append(user_id)
+            else:
+                buckets[location, previous - correct] += 1
+                decrements[replies, correct].append(user_id)
+        Score.objects.filter(user__in=emptied).delete()
+        for (replies, correct), user_ids in decrements.items():
+            Score.objects.filter(user__in=user_ids).update(
+                total_replies=F('total_replies') - replies,
+                correct_predictions=F('correct_predictions') - correct
+            )
+    adjust_buckets(buckets)
+
+
+def rebuild_scores():
+    """
+    Recompute every Score, and the leaderboard buckets, from the
+    Replies to finalized Questions.
+    """
+    with transaction.atomic():
+        Score.objects.all().delete()
+        replies = Reply.objects.filter(question__date_finalized__isnull=False)
+        counts = replies \
+            .values_list('user', 'user__profile__location') \
+            .annotate(
+                replies=Count('id'),
+                correct=Count(
+                    'id',
+                    filter=Q(prediction=F('question__winning_answer'))
+                )
+            ) \
+            .order_by('user')
+        Score.objects.bulk_create((
+            Score(
+                user_id=user_id,
+                location=location or '',
+                total_replies=replies,
+                correct_predictions=correct
+            ) for user_id, location, replies, correct in counts.iterator()
+        ))
+        rebuild_buckets()
+
+
+def finalize_question(question, now=None, score=True):
+    """
+    Record the winning Answer of a concluded Question, and add its
+    Replies to their Users' Scores. Each Question is finalized exactly
+    once, even if several processes try at the same time or a previous
+    run was interrupted: the Question is claimed and scored in a single
+    transaction. Return True if this call finalized the Question.
+
+    Bulk loaders may pass 'score=False' and call 'rebuild_scores()'
+    once afterwards instead.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        winning_answer = get_winning_answer(question)
+        finalized = Question.objects.filter(
+            pk=question.pk,
+            date_concluded__lte=now,
+            date_finalized__isnull=True
+        ).update(date_finalized=now, winning_answer=winning_answer)
+        if finalized and score:
+            add_to_scores(question.replies.all(), winning_answer)
+    if finalized:
+        question.date_finalized = now
+        question.winning_answer_id = winning_answer
+    return bool(finalized)
+
+
+def reopen_question(question):
+    """
+    Undo the finalization of a Question whose conclusion was moved past
+    the time it was finalized, e.g. by staff reopening it: take its
+    Replies back out of their Users' Scores, and clear its winning
+    Answer, so that 'finalize_questions()' finalizes it again once it
+    concludes. Return True if the Question was finalized.
+    """
+    with transaction.atomic():
+        finalized = Question.objects.select_for_update() \
+            .filter(pk=question.pk, date_finalized__isnull=False) \
+            .values_list('winning_answer') \
+            .first()
+        if finalized is None:
+            return False
+        remove_from_scores(question.replies.all(), finalized[0])
+        Question.objects.filter(pk=question.pk) \
+            .update(date_finalized=None, winning_answer=None)
+    question.date_finalized = None
+    question.winning_answer_id = None
+    return True
+
+
+def finalize_questions(now=None, score=True):
+    """
+    Finalize every Question that has concluded but has not been
+    finalized yet. Return the Questions finalized by this call.
+    """
+    now = now or timezone.now()
+    questions = Question.objects.filter(
+        date_concluded__lte=now,
+        date_finalized__isnull=True
+    ).order_by('date_concluded', 'id')
+    return [
+        question for question in questions
+        if finalize_question(question, now, score)
+    ]
+
+
+def conclude_questions(now=None):
+    """
+    Finalize every concluded Question, then freeze the results of any
+    that have no ResultsSnapshot yet. Return the Questions whose
+    results were frozen.
+    """
+    now = now or timezone.now()
+    finalize_questions(now)
+    questions = list(Question.objects.filter(
+        date_concluded__lte=now,
+        results_snapshot__isnull=True
+    ).order_by('date_concluded', 'id'))
+    for question in questions:
+        freeze_results(question)
+    return questions
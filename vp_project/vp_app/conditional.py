@@ -0,0 +1,69 @@
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(request, *version):
+    """
+    Build a weak ETag from the parts of a resource's version, and the
+    path and media type of the request, which select its
+    representation. ETags are weak because the same representation is
+    also sent gzipped.
+    """
+    parts = [request.get_full_path(), request.accepted_media_type]
+    digest = hashlib.sha256(
+        '|'.join(str(part) for part in parts + list(version))
+        .encode('utf-8')
+    ).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def conditional_response(request, etag=None, last_modified=None,
+                         response=None):
+    """
+    Answer a request with a 304 (or 412) if its conditional headers
+    match 'etag' and 'last_modified' (a datetime). Otherwise return
+    'response', which may be None to have the caller build it. Either
+    way, the validators are set on the response returned.
+    """
+    timestamp = last_modified and int(last_modified.timestamp())
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=timestamp,
+        response=response
+    )
+    if response is not None and response.status_code in (200, 304):
+        if etag:
+            response['ETag'] = etag
+        if timestamp:
+            response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Give GET responses ETag and Last-Modified headers computed from the
+    version of their data, and answer requests for a version the client
+    already has with a 304 before anything is serialized. Views
+    implement 'get_validators()' with a query much cheaper than the
+    response.
+    """
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Return '(etag, last_modified)' for the requested resource;
+        either may be None.
+        """
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, *args, **kwargs)
+        response = conditional_response(request, etag, last_modified)
+        if response is None:
+            response = conditional_response(
+                request,
+                etag,
+                last_modified,
+                super().get(request, *args, **kwargs)
+            )
+        return response
@@ -0,0 +1,86 @@
+from django.db.models import Case, Count, F, Sum, Value, When
+from .models import Score, ScoreBucket
+
+
+def adjust_buckets(deltas, batch_size=300):
+    """
+    Apply a mapping of '(location, correct_predictions)' to a change in
+    the number of Users with that score. Buckets are updated in place
+    with F() expressions, so concurrent adjustments are not lost, and
+    up to 'batch_size' buckets are adjusted per UPDATE.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    ScoreBucket.objects.bulk_create([
+        ScoreBucket(location=location, correct_predictions=correct)
+        for location, correct in deltas
+    ], ignore_conflicts=True)
+    bucket_ids = ScoreBucket.objects.filter(
+        location__in={location for location, _ in deltas},
+        correct_predictions__in={correct for _, correct in deltas}
+    ).values_list('location', 'correct_predictions', 'id')
+    bucket_deltas = [
+        (bucket_id, deltas[location, correct])
+        for location, correct, bucket_id in bucket_ids
+        if (location, correct) in deltas
+    ]
+    for start in range(0, len(bucket_deltas), batch_size):
+        batch = bucket_deltas[start:start + batch_size]
+        ScoreBucket.objects.filter(
+            id__in=[bucket_id for bucket_id, _ in batch]
+        ).update(users=F('users') + Case(
+            *[When(id=bucket_id, then=Value(delta))
+              for bucket_id, delta in batch],
+            default=Value(0)
+        ))
+
+
+def rebuild_buckets():
+    """
+    Recount every ScoreBucket from the Scores.
+    """
+    ScoreBucket.objects.all().delete()
+    counts = Score.objects \
+        .values_list('location', 'correct_predictions') \
+        .annotate(users=Count('user')) \
+        .order_by()
+    ScoreBucket.objects.bulk_create([
+        ScoreBucket(location=location, correct_predictions=correct,
+                    users=users)
+        for location, correct, users in counts
+    ])
+
+
+def get_leaders(location=None, limit=10):
+    """
+    Get the 'limit' Scores with the most correct predictions, either
+    nationally or in one location. Each Score is given a 'rank'; tied
+    Scores share a rank, and the next rank is skipped.
+    """
+    scores = Score.objects \
+        .select_related('user') \
+        .order_by('-correct_predictions', 'user')
+    if location is not None:
+        scores = scores.filter(location=location)
+    scores = list(scores[:limit])
+    rank = previous = None
+    for position, score in enumerate(scores, 1):
+        if score.correct_predictions != previous:
+            rank = position
+            previous = score.correct_predictions
+        score.rank = rank
+    return scores
+
+
+def get_rank(score, location=None):
+    """
+    Get the rank of a Score, either nationally or in one location, by
+    adding up the Users in the buckets above it.
+    """
+    above = ScoreBucket.objects.filter(
+        correct_predictions__gt=score.correct_predictions
+    )
+    if location is not None:
+        above = above.filter(location=location)
+    return (above.aggregate(users=Sum('users'))['users'] or 0) + 1
@@ -0,0 +1,219 @@
+import copy
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from users.urls import urlpatterns as users_urls
+from vp_app.models import Question, Reply
+from vp_app.querylog import is_transaction_statement, normalize_sql
+from vp_app.queryplans import explain
+from vp_app.questioncache import question_cache
+from vp_app.urls import urlpatterns as vp_app_urls
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every API endpoint against the current database (for '
+        'example, one filled by generate_dataset), and audit the query '
+        'plan of each distinct statement it runs. Full scans of '
+        'vp_app_reply, temporary B-trees and indexes that do not cover '
+        'their query are flagged. Requests are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Exit with an error if any problem is found.'
+        )
+        parser.add_argument(
+            '--endpoint',
+            nargs='+',
+            dest='endpoints',
+            help='Only audit these endpoints (URL names).'
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the plan of every statement, not only of those '
+                 'with problems.'
+        )
+
+    def get_requests(self):
+        """
+        Map each route to the requests made of it, as '(method, path,
+        user, data)' tuples. The objects requested are taken from the
+        database: a concluded and an open Question, and a User who
+        replied to the open one.
+        """
+        now = timezone.now()
+        concluded = Question.objects.filter(date_concluded__lte=now) \
+            .order_by('id').first()
+        open_question = Question.objects.filter(date_concluded__gt=now) \
+            .order_by('id').first()
+        reply = open_question and Reply.objects \
+            .filter(question=open_question).order_by('id').first()
+        if concluded is None or reply is None:
+            raise CommandError(
+                'The database needs a concluded Question and an open one '
+                'with Replies. Run "manage.py generate_dataset" first.'
+            )
+        user = User.objects.select_related('profile').get(id=reply.user_id)
+        staff = copy.copy(user)
+        staff.is_staff = True
+        answer = open_question.answers.order_by('id').first()
+        vote = {'vote': answer.id, 'prediction': answer.id}
+
+        return {
+            'root-index': [('GET', reverse('root-index'), None, None)],
+            'question-list': [
+                ('GET', reverse('question-list'), None, None),
+                ('GET', reverse('question-list'), None,
+                 {'expand': 'answers'}),
+            ],
+            'question-detail': [
+                ('GET', reverse('question-detail', args=[concluded.id]),
+                 None, None),
+            ],
+            'question-answers': [
+                ('GET', reverse('question-answers', args=[concluded.id]),
+                 None, None),
+            ],
+            'answer-list': [('GET', reverse('answer-list'), None, None)],
+            'answer-detail': [
+                ('GET', reverse('answer-detail', args=[answer.id]),
+                 None, None),
+            ],
+            'question-reply': [
+                ('GET', reverse('question-reply', args=[open_question.id]),
+                 user, None),
+                ('PUT', reverse('question-reply', args=[open_question.id]),
+                 user, vote),
+                ('DELETE',
+                 reverse('question-reply', args=[open_question.id]),
+                 user, None),
+            ],
+            'reply-list': [('GET', reverse('reply-list'), user, None)],
+            'question-results': [
+                ('GET', reverse('question-results', args=[concluded.id]),
+                 None, None),
+                ('GET',
+                 reverse('question-results', args=[open_question.id]),
+                 staff, None),
+            ],
+            'record': [('GET', reverse('record'), user, None)],
+            'leaderboard': [('GET', reverse('leaderboard'), user, None)],
+            'location-leaderboard': [
+                ('GET',
+                 reverse('location-leaderboard',
+                         args=[user.profile.location]),
+                 user, None),
+            ],
+            'metrics': [('GET', reverse('metrics'), staff, None)],
+            'profiler': [
+                ('GET', reverse('profiler'), staff, {'seconds': 0}),
+            ],
+            'api-token-auth/': [
+                ('POST', '/api-token-auth/', None,
+                 {'username': user.username, 'password': 'audit'}),
+            ],
+            'api-token-refresh': [
+                ('POST', reverse('api-token-refresh'), user, None),
+            ],
+            'create-user': [
+                ('POST', reverse('create-user'), None, {
+                    'username': 'query_plan_audit',
+                    'email': 'query_plan_audit@example.com',
+                    'password': 'query-plan-audit',
+                }),
+            ],
+            'profile': [('GET', reverse('profile'), user, None)],
+        }
+
+    def capture(self, method, path, user, data):
+        """
+        Make a request, roll back anything it wrote, and return the
+        first run of each distinct statement shape as '(sql, params)'.
+        """
+        statements = {}
+
+        def record(execute, sql, params, many, context):
+            if not many and not is_transaction_statement(sql):
+                statements.setdefault(normalize_sql(sql), (sql, params))
+            return execute(sql, params, many, context)
+
+        factory = APIRequestFactory()
+        if method == 'GET':
+            request = factory.get(path, data)
+        else:
+            request = getattr(factory, method.lower())(
+                path, data, format='json'
+            )
+        if user is not None:
+            force_authenticate(request, user)
+        match = resolve(path)
+        # Audit the queries a cold cache would make, too.
+        question_cache.clear()
+        # Requests come from the factory's 'testserver' host. Cached
+        # responses are bypassed so that their queries are audited.
+        allowed_hosts = settings.ALLOWED_HOSTS + ['testserver']
+        with override_settings(ALLOWED_HOSTS=allowed_hosts,
+                               CATALOG_CACHE={'ENABLED': False}), \
+                transaction.atomic():
+            with connection.execute_wrapper(record):
+                response = match.func(request, *match.args, **match.kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+            transaction.set_rollback(True)
+        return list(statements.values())
+
+    def handle(self, *args, **options):
+        requests = self.get_requests()
+        routes = [pattern.name or str(pattern.pattern)
+                  for pattern in vp_app_urls + users_urls]
+        missing = set(routes) - set(requests)
+        if missing:
+            raise CommandError(
+                f'No requests are defined for: {", ".join(sorted(missing))}'
+            )
+        if options['endpoints']:
+            routes = [route for route in routes
+                      if route in options['endpoints']]
+
+        problem_count = 0
+        for route in routes:
+            for method, path, user, data in requests[route]:
+                statements = self.capture(method, path, user, data)
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f'\n{route}: {method} {path} '
+                    f'({len(statements)} statements)'
+                ))
+                for sql, params in statements:
+                    plan, problems = explain(connection, sql, params)
+                    problem_count += len(problems)
+                    if problems:
+                        self.stdout.write(self.style.WARNING(
+                            f'  {"; ".join(problems).upper()}'
+                        ))
+                    elif not options['verbose_plans']:
+                        continue
+                    else:
+                        self.stdout.write('  OK')
+                    self.stdout.write(f'    {normalize_sql(sql)}')
+                    for line in plan:
+                        self.stdout.write(f'      {line}')
+
+        if problem_count and options['check']:
+            raise CommandError(f'Found {problem_count} query plan problems.')
+        if problem_count:
+            self.stdout.write(self.style.WARNING(
+                f'\nFound {problem_count} query plan problems.'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                '\nNo query plan problems found.'
+            ))
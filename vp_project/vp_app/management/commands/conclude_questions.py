@@ -0,0 +1,42 @@
+import time
+from django.core.management.base import BaseCommand
+from vp_app.conclusion import conclude_questions, rebuild_scores
+
+
+class Command(BaseCommand):
+    help = (
+        'Finalize every Question whose conclusion date has passed, '
+        'recording its winning answer, adding its replies to scores and '
+        'freezing its results. Safe to run repeatedly, but run only one '
+        'at a time, e.g. from cron or with --every.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild-scores',
+            action='store_true',
+            help='Afterwards, recompute every User\'s Score from the '
+                 'Replies to finalized Questions.'
+        )
+        parser.add_argument(
+            '--every',
+            type=float,
+            metavar='SECONDS',
+            help='Keep running, concluding questions every SECONDS '
+                 'seconds.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            questions = conclude_questions()
+            for question in questions:
+                self.stdout.write(f'Concluded question {question.id}.')
+            self.stdout.write(self.style.SUCCESS(
+                f'Concluded {len(questions)} questions.'
+            ))
+            if options['rebuild_scores']:
+                rebuild_scores()
+                self.stdout.write(self.style.SUCCESS('Rebuilt all scores.'))
+            if options['every'] is None:
+                return
+            time.sleep(options['every'])
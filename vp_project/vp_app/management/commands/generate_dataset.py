@@ -0,0 +1,242 @@
+import itertools
+import random
+import time
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from users.models import Profile, states
+from vp_app.catalogcache import bump_generation
+from vp_app.conclusion import finalize_questions, rebuild_scores
+from vp_app.models import Question, Answer, Reply
+from vp_app.questioncache import question_cache
+from vp_app.tallies import rebuild_tallies
+
+
+def zipf_weights(count, skew):
+    """
+    Weights for 'count' choices, where choice i is picked with
+    probability proportional to 1 / (i + 1) ** skew. A skew of 0 picks
+    every choice equally often.
+    """
+    return list(itertools.accumulate(
+        1 / (rank + 1) ** skew for rank in range(count)
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a synthetic, reproducible dataset of Users, Profiles, '
+        'Questions, Answers and Replies for scale testing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--questions', type=int, default=10)
+        parser.add_argument('--answers', type=int, default=2,
+                            help='Answers per Question.')
+        parser.add_argument(
+            '--replies', type=int, default=None,
+            help='Total Replies, spread evenly over the Questions. '
+                 'Defaults to every User replying to every Question.'
+        )
+        parser.add_argument(
+            '--concluded', type=float, default=0.5,
+            help='Fraction of Questions that have already concluded.'
+        )
+        parser.add_argument(
+            '--vote-skew', type=float, default=1.0,
+            help='Zipf exponent of the vote distribution over Answers. '
+                 '0 means every Answer is equally popular.'
+        )
+        parser.add_argument(
+            '--prediction-agreement', type=float, default=0.6,
+            help='Probability that a User predicts their own vote. '
+                 'Other predictions follow the vote distribution.'
+        )
+        parser.add_argument(
+            '--location-skew', type=float, default=1.0,
+            help='Zipf exponent of the User distribution over '
+                 'locations, in the order of users.models.states.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='synthetic_',
+                            help='Prefix of the generated usernames.')
+
+    def handle(self, *args, **options):
+        users = options['users']
+        questions = options['questions']
+        replies = options['replies']
+        if replies is None:
+            replies = users * questions
+        if replies > users * questions:
+            raise CommandError(
+                'Users may only reply once per Question, so there can be '
+                'at most --users times --questions Replies.'
+            )
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.options = options
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            user_ids = self.create_users(users)
+            question_answers = self.create_questions(questions)
+            self.create_replies(user_ids, question_answers, replies)
+            self.reset_sequences()
+            self.log(start, 'Counting tallies')
+            rebuild_tallies(question_ids=list(question_answers))
+            self.log(start, 'Finalizing concluded questions')
+            finalize_questions(score=False)
+            rebuild_scores()
+        self.log(start, self.style.SUCCESS(
+            f'Generated {users} users, {questions} questions and '
+            f'{replies} replies'
+        ))
+
+    def log(self, start, message):
+        self.stdout.write(f'[{time.perf_counter() - start:7.1f}s] {message}')
+
+    def create_users(self, count):
+        """
+        Create Users with Profiles spread over the locations. Return
+        the new User ids.
+        """
+        first_id = (User.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        locations = [location for location, _ in states]
+        location_weights = zipf_weights(
+            len(locations), self.options['location_skew']
+        )
+        prefix = self.options['prefix']
+        user_ids = range(first_id, first_id + count)
+        for batch in self.batches(user_ids):
+            User.objects.bulk_create([
+                User(id=user_id, username=f'{prefix}{user_id}', password='!')
+                for user_id in batch
+            ])
+            chosen = self.rng.choices(
+                locations, cum_weights=location_weights, k=len(batch)
+            )
+            Profile.objects.bulk_create([
+                Profile(user_id=user_id, location=location)
+                for user_id, location in zip(batch, chosen)
+            ])
+        return user_ids
+
+    def create_questions(self, count):
+        """
+        Create Questions with their Answers. Return a mapping of each
+        new Question id to its Answer ids.
+        """
+        now = timezone.now()
+        first_id = (Question.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        first_answer_id = \
+            (Answer.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        concluded = round(count * self.options['concluded'])
+        question_answers = {}
+        answer_ids = itertools.count(first_answer_id)
+        new_questions = []
+        new_answers = []
+        for number in range(count):
+            question_id = first_id + number
+            if number < concluded:
+                date_concluded = now - timedelta(days=1)
+            else:
+                date_concluded = now + timedelta(days=30)
+            new_questions.append(Question(
+                id=question_id,
+                content=f'Synthetic question {question_id}',
+                date_published=now - timedelta(days=30),
+                date_concluded=date_concluded
+            ))
+            question_answers[question_id] = []
+            for answer_number in range(self.options['answers']):
+                answer_id = next(answer_ids)
+                question_answers[question_id].append(answer_id)
+                new_answers.append(Answer(
+                    id=answer_id,
+                    question_id=question_id,
+                    content=f'Answer {answer_number + 1}'
+                ))
+        Question.objects.bulk_create(new_questions)
+        Answer.objects.bulk_create(new_answers)
+        # 'bulk_create()' sends no signals, so discard cached metadata
+        # and responses that may describe Questions with the same ids.
+        # As in 'signals.py', do so again once the transaction commits,
+        # in case a request cached the old rows in the meantime.
+        question_cache.invalidate()
+        bump_generation()
+        transaction.on_commit(question_cache.invalidate)
+        transaction.on_commit(bump_generation)
+        return question_answers
+
+    def create_replies(self, user_ids, question_answers, count):
+        """
+        Spread 'count' Replies evenly over the Questions, each from a
+        different random User.
+
+        Replies are by far the largest table, so they skip the model
+        layer and are inserted with 'executemany()', which is several
+        times faster than 'bulk_create()' for millions of rows.
+        """
+        rng = self.rng
+        agreement = self.options['prediction_agreement']
+        per_question, extra = divmod(count, len(question_answers) or 1)
+        quote = connection.ops.quote_name
+        fields = [Reply._meta.get_field(name)
+                  for name in ('user', 'question', 'vote', 'prediction',
+                               'date_modified')]
+        now = fields[-1].get_db_prep_value(timezone.now(), connection)
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(Reply._meta.db_table),
+            ', '.join(quote(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields))
+        )
+        created = 0
+        for number, (question_id, answer_ids) in \
+                enumerate(question_answers.items()):
+            weights = zipf_weights(len(answer_ids), self.options['vote_skew'])
+            repliers = rng.sample(
+                user_ids, per_question + (1 if number < extra else 0)
+            )
+            for batch in self.batches(repliers):
+                votes = rng.choices(
+                    answer_ids, cum_weights=weights, k=len(batch)
+                )
+                others = rng.choices(
+                    answer_ids, cum_weights=weights, k=len(batch)
+                )
+                with connection.cursor() as cursor:
+                    cursor.executemany(sql, [
+                        (
+                            user_id,
+                            question_id,
+                            vote,
+                            vote if rng.random() < agreement else other,
+                            now
+                        ) for user_id, vote, other in zip(batch, votes, others)
+                    ])
+                created += len(batch)
+            self.stdout.write(f'Created {created} of {count} replies.')
+
+    def reset_sequences(self):
+        """
+        Users, Questions and Answers are inserted with explicit ids,
+        which do not advance the sequences that databases such as
+        PostgreSQL assign ids from. Move them past the new rows, so
+        that rows created later do not collide with them.
+        """
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [User, Question, Answer, Reply]
+        )
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def batches(self, items):
+        for start in range(0, len(items), self.batch_size):
+            yield items[start:start + self.batch_size]
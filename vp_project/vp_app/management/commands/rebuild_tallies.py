@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from vp_app.tallies import rebuild_tallies
+
+
+class Command(BaseCommand):
+    help = (
+        'Recount the votes and predictions of every Answer from the raw '
+        'Replies, and correct any tally that has drifted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Report incorrect tallies without changing them, and exit '
+                 'with an error if any are found.'
+        )
+        parser.add_argument(
+            '--question',
+            type=int,
+            nargs='+',
+            dest='questions',
+            help='Only rebuild the tallies of these Question ids.'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            corrections = rebuild_tallies(
+                question_ids=options['questions'],
+                commit=not options['check']
+            )
+        for answer_id, stored, counted in corrections:
+            if stored is None:
+                self.stdout.write(
+                    f'Answer {answer_id}: missing tally, counted '
+                    f'{counted[0]} votes and {counted[1]} predictions.'
+                )
+            else:
+                self.stdout.write(
+                    f'Answer {answer_id}: stored {stored[0]} votes and '
+                    f'{stored[1]} predictions, counted {counted[0]} votes '
+                    f'and {counted[1]} predictions.'
+                )
+        if options['check'] and corrections:
+            raise CommandError(
+                f'{len(corrections)} tallies are incorrect. Run '
+                f'"manage.py rebuild_tallies" to correct them.'
+            )
+        if options['check']:
+            self.stdout.write(self.style.SUCCESS('All tallies are correct.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Corrected {len(corrections)} tallies.'
+            ))
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from vp_app.slowlog import read_entries, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarize the slow query log: the statements that took the '
+        'most time in total, with the views that ran them and the stack '
+        'of their slowest run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log',
+            help='Path of the log to read. Defaults to the '
+                 'SLOW_QUERY_LOG setting\'s PATH, and includes its rotated '
+                 'files.'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Number of statements to show.'
+        )
+        parser.add_argument(
+            '--view',
+            help='Only include statements run by this view (URL name).'
+        )
+
+    def handle(self, *args, **options):
+        path = options['log'] or settings.SLOW_QUERY_LOG['PATH']
+        entries = read_entries(path)
+        if options['view']:
+            entries = (entry for entry in entries
+                       if entry['view'] == options['view'])
+        summaries = summarize(entries)
+        if not summaries:
+            self.stdout.write('No slow queries logged.')
+            return
+
+        total = sum(summary['total_ms'] for summary in summaries)
+        count = sum(summary['count'] for summary in summaries)
+        self.stdout.write(
+            f'{count} slow queries of {len(summaries)} shapes, taking '
+            f'{total:.1f} ms in total.'
+        )
+        for rank, summary in enumerate(summaries[:options['limit']], 1):
+            self.stdout.write(
+                f'\n{rank}. {summary["total_ms"]:.1f} ms total '
+                f'({summary["total_ms"] / total:.0%}), '
+                f'{summary["count"]} runs, mean '
+                f'{summary["mean_ms"]:.1f} ms, max '
+                f'{summary["max_ms"]:.1f} ms'
+            )
+            self.stdout.write(f'   Views: {", ".join(summary["views"])}')
+            self.stdout.write(f'   SQL: {summary["sql"]}')
+            for frame in summary['stack']:
+                self.stdout.write(f'     {frame}')
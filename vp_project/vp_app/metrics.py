@@ -0,0 +1,197 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from rest_framework import serializers
+
+
+DURATION_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+BYTE_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304
+)
+
+
+class Histogram:
+    """
+    A Prometheus-style histogram: a count of observations at or below
+    each bucket's upper bound, kept separately for each set of label
+    values, along with their sum and total count.
+    """
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = \
+                    [[0] * (len(self.buckets) + 1), 0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self, label_names):
+        """
+        Render the histogram in the Prometheus text exposition format.
+        """
+        lines = [
+            f'# HELP {self.name} {self.description}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self.lock:
+            series = {labels: (list(counts), total, count)
+                      for labels, (counts, total, count)
+                      in self.series.items()}
+        for labels in sorted(series):
+            counts, total, count = series[labels]
+            label_text = ','.join(
+                f'{name}="{escape_label(value)}"'
+                for name, value in zip(label_names, labels)
+            )
+            cumulative = 0
+            bounds = [format_value(bound) for bound in self.buckets]
+            for bound, bucket_count in zip(bounds + ['+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{bound}"}} '
+                    f'{cumulative}'
+                )
+            lines.append(
+                f'{self.name}_sum{{{label_text}}} {format_value(total)}'
+            )
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+LABEL_NAMES = ('view', 'method')
+
+request_duration = Histogram(
+    'vp_request_duration_seconds',
+    'Wall time spent handling requests.',
+    DURATION_BUCKETS
+)
+request_db_duration = Histogram(
+    'vp_request_db_duration_seconds',
+    'Time spent running database queries per request.',
+    DURATION_BUCKETS
+)
+request_queries = Histogram(
+    'vp_request_queries',
+    'Database queries run per request.',
+    QUERY_BUCKETS
+)
+request_serializer_duration = Histogram(
+    'vp_request_serializer_duration_seconds',
+    'Time spent validating and representing data in serializers per '
+    'request.',
+    DURATION_BUCKETS
+)
+response_bytes = Histogram(
+    'vp_response_bytes',
+    'Size of response bodies in bytes.',
+    BYTE_BUCKETS
+)
+HISTOGRAMS = [
+    request_duration,
+    request_db_duration,
+    request_queries,
+    request_serializer_duration,
+    response_bytes,
+]
+
+
+class RequestTimings:
+    """
+    Time spent on one request's database queries and serializers. The
+    instance also serves as a database execute wrapper.
+    """
+    def __init__(self):
+        self.db = 0.0
+        self.queries = 0
+        self.serializer = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+            self.queries += 1
+
+
+current_timings = ContextVar('current_timings', default=None)
+
+
+def timed(method):
+    """
+    Wrap a serializer method so that its duration is added to the
+    current request's serializer time. Nested calls are only counted
+    once.
+    """
+    def wrapper(*args, **kwargs):
+        timings = current_timings.get()
+        if timings is None or timings.serializing:
+            return method(*args, **kwargs)
+        timings.serializing = True
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timings.serializer += time.perf_counter() - start
+            timings.serializing = False
+    wrapper.timed = True
+    return wrapper
+
+
+def instrument_serializers():
+    """
+    Time every serializer's 'is_valid()' and 'data'. REST framework has
+    no hook for this, so 'BaseSerializer' is patched, once; 'Serializer'
+    and 'ListSerializer' reach it through 'super()'.
+    """
+    base = serializers.BaseSerializer
+    if getattr(base.is_valid, 'timed', False):
+        return
+    base.is_valid = timed(base.is_valid)
+    base.data = property(timed(base.data.fget))
+
+
+def observe(view, method, duration, timings, size):
+    labels = (view, method)
+    request_duration.observe(labels, duration)
+    request_db_duration.observe(labels, timings.db)
+    request_queries.observe(labels, timings.queries)
+    request_serializer_duration.observe(labels, timings.serializer)
+    if size is not None:
+        response_bytes.observe(labels, size)
+
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render(LABEL_NAMES)
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    for histogram in HISTOGRAMS:
+        with histogram.lock:
+            histogram.series.clear()
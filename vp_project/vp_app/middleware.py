@@ -0,0 +1,260 @@
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import Counter
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils import timezone
+from . import metrics, profiler
+from .querylog import is_transaction_statement, normalize_sql
+from .slowlog import get_handler, write_entry
+
+
+logger = logging.getLogger(__name__)
+
+
+class NPlusOneError(Exception):
+    """
+    Raised, when N+1 detection is set to raise, by a request that runs
+    the same SQL shape more times than allowed.
+    """
+
+
+def get_view_name(request):
+    """
+    Name the view a request resolved to by its URL name, or by its
+    route if the URL is unnamed.
+    """
+    match = request.resolver_match
+    if match is None:
+        return 'unmatched'
+    return match.url_name or match.route
+
+
+def get_project_stack():
+    """
+    Get the current stack, limited to frames in the project's own code
+    and excluding this module.
+    """
+    return [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(settings.BASE_DIR)
+        and frame.filename != __file__
+        and f'{os.sep}site-packages{os.sep}' not in frame.filename
+    ]
+
+
+def get_app_stack():
+    """
+    Get the current stack as 'path:line in function' strings, limited to
+    frames in the 'vp_app' and 'users' apps and excluding this module.
+    Paths are relative to the project directory.
+    """
+    app_dirs = tuple(
+        os.path.join(settings.BASE_DIR, app) + os.sep
+        for app in ['vp_app', 'users']
+    )
+    return [
+        f'{os.path.relpath(frame.filename, settings.BASE_DIR)}:'
+        f'{frame.lineno} in {frame.name}'
+        for frame in get_project_stack()
+        if frame.filename.startswith(app_dirs)
+    ]
+
+
+class QueryShapeRecorder:
+    """
+    A database execute wrapper that counts the shape of every statement
+    run, and remembers the stack that first ran each shape.
+    """
+    def __init__(self):
+        self.shapes = Counter()
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not is_transaction_statement(sql):
+            shape = normalize_sql(sql)
+            self.shapes[shape] += 1
+            if shape not in self.stacks:
+                self.stacks[shape] = get_project_stack()
+        return execute(sql, params, many, context)
+
+    def findings(self, threshold):
+        """
+        Get '(count, shape, stack)' for every shape run more than
+        'threshold' times, most frequent first.
+        """
+        return [
+            (count, shape, self.stacks[shape])
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+
+class NPlusOneMiddleware:
+    """
+    Flag requests that run the same SQL statement, up to its values,
+    more than 'THRESHOLD' times: usually a related object being loaded
+    once per row. Configured with the 'N_PLUS_ONE_DETECTION' setting;
+    detection is on when DEBUG is on, unless 'ENABLED' says otherwise.
+
+    Findings are logged as warnings, with the stack that ran the
+    statement. In DEBUG they are also listed in an 'X-N-Plus-One'
+    response header, and with 'RAISE' on (as in the test settings) they
+    raise NPlusOneError.
+    """
+    def __init__(self, get_response):
+        options = getattr(settings, 'N_PLUS_ONE_DETECTION', {})
+        if not options.get('ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.threshold = options.get('THRESHOLD', 5)
+        self.raise_errors = options.get('RAISE', False)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryShapeRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        findings = recorder.findings(self.threshold)
+        if not findings:
+            return response
+
+        report = [
+            f'{request.method} {request.path} ran {count} queries of '
+            f'the shape: {shape}\n'
+            + ''.join(traceback.format_list(stack))
+            for count, shape, stack in findings
+        ]
+        for message in report:
+            logger.warning(message)
+        if self.raise_errors:
+            raise NPlusOneError('\n'.join(report))
+        if settings.DEBUG:
+            response['X-N-Plus-One'] = '; '.join(
+                f'{count}x {shape[:200]}' for count, shape, _ in findings
+            )
+        return response
+
+
+class PerformanceMetricsMiddleware:
+    """
+    Measure each request's wall time, database time and query count,
+    serializer time and response size, and record them in the
+    histograms of 'metrics.py', labelled by URL name and method. Staff
+    can read them at 'metrics/'. Configured with the
+    'PERFORMANCE_METRICS' setting; with 'SERVER_TIMING' on (the default
+    in DEBUG), the measurements are also sent in a 'Server-Timing'
+    response header.
+
+    Histograms are kept in memory, so each server process reports its
+    own requests.
+    """
+    def __init__(self, get_response):
+        options = getattr(settings, 'PERFORMANCE_METRICS', {})
+        if not options.get('ENABLED', True):
+            raise MiddlewareNotUsed
+        self.server_timing = options.get('SERVER_TIMING', settings.DEBUG)
+        self.get_response = get_response
+        metrics.instrument_serializers()
+
+    def __call__(self, request):
+        timings = metrics.RequestTimings()
+        token = metrics.current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(timings):
+                response = self.get_response(request)
+        finally:
+            metrics.current_timings.reset(token)
+        duration = time.perf_counter() - start
+
+        size = None if response.streaming else len(response.content)
+        metrics.observe(get_view_name(request), request.method, duration,
+                        timings, size)
+
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={timings.db * 1000:.2f};'
+                f'desc="{timings.queries} queries"',
+                f'serializer;dur={timings.serializer * 1000:.2f}',
+                f'total;dur={duration * 1000:.2f}',
+            ])
+        return response
+
+
+class ProfilerMiddleware:
+    """
+    Keep track of the view each request thread is running, so that the
+    sampling profiler ('profiler.py') can attribute its samples.
+    Samples taken before the URL is resolved are labelled 'unmatched'.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        thread_id = threading.get_ident()
+        profiler.request_views[thread_id] = 'unmatched'
+        try:
+            return self.get_response(request)
+        finally:
+            profiler.request_views.pop(thread_id, None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profiler.request_views[threading.get_ident()] = \
+            get_view_name(request)
+
+
+class SlowQueryMiddleware:
+    """
+    Log every SQL statement that takes longer than 'THRESHOLD_MS' to a
+    file of JSON lines, one per statement, with its duration, shape
+    (see 'querylog.py'), number of parameters, the view that ran it and
+    the 'vp_app' and 'users' frames of its stack. Configured with the
+    'SLOW_QUERY_LOG' setting; the file is rotated once it reaches
+    'MAX_BYTES'. Summarize the log with 'manage.py slow_query_report'.
+    """
+    def __init__(self, get_response):
+        options = getattr(settings, 'SLOW_QUERY_LOG', {})
+        if not options.get('ENABLED', True):
+            raise MiddlewareNotUsed
+        self.threshold = options.get('THRESHOLD_MS', 100) / 1000
+        self.handler = get_handler(
+            options.get('PATH',
+                        os.path.join(settings.BASE_DIR, 'slow_queries.log')),
+            options.get('MAX_BYTES', 10 * 1024 * 1024),
+            options.get('BACKUP_COUNT', 5)
+        )
+        self.get_response = get_response
+
+    def __call__(self, request):
+        def log_slow_queries(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duration = time.perf_counter() - start
+                if duration >= self.threshold:
+                    self.log(request, sql, params, many, duration)
+
+        with connection.execute_wrapper(log_slow_queries):
+            return self.get_response(request)
+
+    def log(self, request, sql, params, many, duration):
+        if params is None:
+            param_count = 0
+        elif many:
+            param_count = sum(len(row) for row in params)
+        else:
+            param_count = len(params)
+        write_entry(self.handler, {
+            'time': timezone.now().isoformat(),
+            'duration_ms': round(duration * 1000, 3),
+            'sql': normalize_sql(sql),
+            'params': param_count,
+            'view': get_view_name(request),
+            'method': request.method,
+            'stack': get_app_stack(),
+        })
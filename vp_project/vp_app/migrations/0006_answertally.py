@@ -0,0 +1,51 @@
+# Generated by Django 2.2.13 on 2026-10-18 07:26
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def count_existing_replies(apps, schema_editor):
+    Answer = apps.get_model('vp_app', 'Answer')
+    AnswerTally = apps.get_model('vp_app', 'AnswerTally')
+    Reply = apps.get_model('vp_app', 'Reply')
+    votes = dict(
+        Reply.objects.values_list('vote').annotate(count=Count('id'))
+        .order_by()
+    )
+    predictions = dict(
+        Reply.objects.values_list('prediction').annotate(count=Count('id'))
+        .order_by()
+    )
+    AnswerTally.objects.bulk_create([
+        AnswerTally(
+            answer_id=answer_id,
+            votes=votes.get(answer_id, 0),
+            predictions=predictions.get(answer_id, 0)
+        ) for answer_id in Answer.objects.values_list('id', flat=True)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vp_app', '0005_auto_20191108_0527'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerTally',
+            fields=[
+                ('answer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='tally', serialize=False, to='vp_app.Answer')),
+                ('votes', models.IntegerField(default=0)),
+                ('predictions', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'answer tallies',
+            },
+        ),
+        migrations.RunPython(
+            count_existing_replies,
+            migrations.RunPython.noop
+        ),
+    ]
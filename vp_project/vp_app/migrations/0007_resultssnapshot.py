@@ -0,0 +1,25 @@
+# Generated by Django 2.2.13 on 2026-10-18 07:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vp_app', '0006_answertally'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultsSnapshot',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='results_snapshot', serialize=False, to='vp_app.Question')),
+                ('content', models.BinaryField()),
+                ('content_gzip', models.BinaryField()),
+                ('etag', models.CharField(max_length=66)),
+                ('date_created', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.13 on 2026-10-18 07:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('vp_app', '0008_question_winning_answer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Score',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_replies', models.IntegerField(default=0)),
+                ('correct_predictions', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
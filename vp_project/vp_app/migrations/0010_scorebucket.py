@@ -0,0 +1,62 @@
+# Generated by Django 2.2.13 on 2026-10-18 07:31
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rank_existing_scores(apps, schema_editor):
+    Profile = apps.get_model('users', 'Profile')
+    Score = apps.get_model('vp_app', 'Score')
+    ScoreBucket = apps.get_model('vp_app', 'ScoreBucket')
+    for user_id, location in Profile.objects.values_list('user', 'location'):
+        Score.objects.filter(user=user_id).update(location=location)
+    counts = Score.objects \
+        .values_list('location', 'correct_predictions') \
+        .annotate(users=Count('user')) \
+        .order_by()
+    ScoreBucket.objects.bulk_create([
+        ScoreBucket(location=location, correct_predictions=correct,
+                    users=users)
+        for location, correct, users in counts
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('vp_app', '0009_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('correct_predictions', models.IntegerField()),
+                ('users', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='score',
+            name='location',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['-correct_predictions', 'user'], name='score_leaders_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['location', '-correct_predictions', 'user'], name='score_location_leaders_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scorebucket',
+            unique_together={('location', 'correct_predictions')},
+        ),
+        migrations.RunPython(
+            rank_existing_scores,
+            migrations.RunPython.noop
+        ),
+    ]
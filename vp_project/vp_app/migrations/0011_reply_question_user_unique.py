@@ -0,0 +1,60 @@
+# Generated by Django 2.2.13 on 2026-10-18 08:10
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+import django.db.models.deletion
+
+
+def remove_duplicate_replies(apps, schema_editor):
+    """
+    Keep only the first Reply of each User to each Question, and recount
+    the tallies of the Questions that had duplicates. Scores of
+    finalized Questions are not recounted here; run
+    'manage.py conclude_questions --rebuild-scores' if any were.
+    """
+    AnswerTally = apps.get_model('vp_app', 'AnswerTally')
+    Reply = apps.get_model('vp_app', 'Reply')
+    duplicates = Reply.objects.values('question', 'user') \
+        .annotate(count=Count('id'), first=Min('id')) \
+        .filter(count__gt=1) \
+        .order_by()
+    question_ids = set()
+    for duplicate in duplicates:
+        Reply.objects.filter(
+            question=duplicate['question'],
+            user=duplicate['user']
+        ).exclude(id=duplicate['first']).delete()
+        question_ids.add(duplicate['question'])
+    for tally in AnswerTally.objects.filter(
+            answer__question__in=question_ids):
+        tally.votes = Reply.objects.filter(vote=tally.answer_id).count()
+        tally.predictions = Reply.objects \
+            .filter(prediction=tally.answer_id).count()
+        tally.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vp_app', '0010_scorebucket'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_replies,
+            migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='reply',
+            constraint=models.UniqueConstraint(fields=('question', 'user'), name='reply_question_user_unique'),
+        ),
+        migrations.AlterField(
+            model_name='reply',
+            name='question',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='vp_app.Question'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(date_finalized__isnull=True), fields=['date_concluded'], name='question_unfinalized_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.13 on 2026-10-18 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vp_app', '0011_reply_question_user_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='date_modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='date_modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='reply',
+            name='date_modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
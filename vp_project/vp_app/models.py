@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.contrib.auth.models import User
 
@@ -7,10 +7,37 @@ class Question(models.Model):
     content = models.CharField(max_length=128)
     date_published = models.DateTimeField(default=timezone.now)
     date_concluded = models.DateTimeField(default=timezone.now)
+    # Also advanced when one of the Question's Answers is saved or
+    # deleted (see 'signals.py'), for conditional GETs.
+    date_modified = models.DateTimeField(auto_now=True)
+
+    # Set once the Question has concluded and been finalized, and
+    # cleared if its conclusion is moved past that time. See
+    # 'conclusion.py' and 'signals.py'.
+    date_finalized = models.DateTimeField(null=True, blank=True)
+    winning_answer = models.ForeignKey(
+        'Answer',
+        related_name='+',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL
+    )
 
     def __str__(self):
         return self.content
 
+    class Meta:
+        indexes = [
+            # Finds the concluded Questions that still need to be
+            # finalized, which the 'conclude_questions' job looks up on
+            # every run. Only unfinalized Questions are indexed.
+            models.Index(
+                fields=['date_concluded'],
+                name='question_unfinalized_idx',
+                condition=models.Q(date_finalized__isnull=True)
+            ),
+        ]
+
 
 class Answer(models.Model):
     content = models.CharField(max_length=64)
@@ -19,6 +46,7 @@ class Answer(models.Model):
         related_name='answers',
         on_delete=models.CASCADE
     )
+    date_modified = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.content
@@ -30,10 +58,12 @@ class Reply(models.Model):
         related_name='replies',
         on_delete=models.CASCADE
     )
+    # Indexed by 'reply_question_user_unique', below.
     question = models.ForeignKey(
         Question,
         related_name='replies',
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False
     )
     vote = models.ForeignKey(
         Answer,
@@ -45,10 +75,163 @@ class Reply(models.Model):
         related_name='predictions',
         on_delete=models.CASCADE
     )
+    date_modified = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the vote and prediction as they are stored in the
+        database, so that tallies can be moved when either changes.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance.remember_tallied()
+        return instance
+
+    def remember_tallied(self):
+        self._tallied = (
+            self.__dict__.get('vote_id'),
+            self.__dict__.get('prediction_id')
+        )
+
+    def save(self, *args, **kwargs):
+        # Tallies are updated by a 'post_save' receiver, which must run
+        # in the same transaction as the write itself.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
 
     def __str__(self):
         return self.question.content
 
     class Meta:
         verbose_name_plural = "replies"
+        constraints = [
+            # Users may reply only once per Question. The constraint's
+            # index also serves lookups of a User's Reply to a Question,
+            # and reads of all of a Question's Replies.
+            models.UniqueConstraint(
+                fields=['question', 'user'],
+                name='reply_question_user_unique'
+            ),
+        ]
+
+
+class AnswerTally(models.Model):
+    """
+    Running count of the votes and predictions received by an Answer.
+    Tallies are kept up to date whenever a Reply is saved or deleted,
+    and can be rebuilt from the raw Replies with the 'rebuild_tallies'
+    management command.
+    """
+    answer = models.OneToOneField(
+        Answer,
+        related_name='tally',
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    votes = models.IntegerField(default=0)
+    predictions = models.IntegerField(default=0)
+
+    def __str__(self):
+        return self.answer.content
+
+    class Meta:
+        verbose_name_plural = "answer tallies"
+
+
+
+class ResultsSnapshot(models.Model):
+    """
+    The results of a concluded Question, rendered once to JSON (and
+    gzipped JSON) and served as stored from then on. No Replies are
+    accepted after a Question concludes, so its results only change
+    when a Reply is deleted or staff edit it, which discards the
+    snapshot (see 'signals.py').
+    """
+    question = models.OneToOneField(
+        Question,
+        related_name='results_snapshot',
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    content = models.BinaryField()
+    content_gzip = models.BinaryField()
+    etag = models.CharField(max_length=66)
+    date_created = models.DateTimeField(default=timezone.now)
 
+    def __str__(self):
+        return self.question.content
+
+
+class Score(models.Model):
+    """
+    A User's record over all finalized Questions: how many of them the
+    User replied to, and how many of those replies correctly predicted
+    the winning Answer. Scores are advanced as Questions are finalized
+    (see 'conclusion.py').
+    """
+    user = models.OneToOneField(
+        User,
+        related_name='score',
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    total_replies = models.IntegerField(default=0)
+    correct_predictions = models.IntegerField(default=0)
+
+    # Copied from the User's Profile, so that leaderboards can be read
+    # from this table alone.
+    location = models.CharField(max_length=100, blank=True)
+
+    def __str__(self):
+        return self.user.username
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-correct_predictions', 'user'],
+                name='score_leaders_idx'
+            ),
+            models.Index(
+                fields=['location', '-correct_predictions', 'user'],
+                name='score_location_leaders_idx'
+            ),
+        ]
+
+
+class ScoreBucket(models.Model):
+    """
+    The number of Users in a location with a given number of correct
+    predictions. A User's rank is one more than the number of Users in
+    the buckets above theirs, so ranking costs one row per distinct
+    score instead of one row per User.
+    """
+    location = models.CharField(max_length=100, blank=True)
+    correct_predictions = models.IntegerField()
+    users = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.location}: {self.correct_predictions}'
+
+    class Meta:
+        unique_together = ['location', 'correct_predictions']
+
+
+class AccessTokenRevocation(models.Model):
+    """
+    When a User's signed access tokens were last revoked (see
+    'authentication.py'): tokens issued until then are refused. Rows
+    outlive their User, so that a deleted User's tokens stay refused,
+    and therefore reference it without a database constraint.
+    """
+    user = models.OneToOneField(
+        User,
+        related_name='+',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        primary_key=True
+    )
+    date_revoked = models.DateTimeField()
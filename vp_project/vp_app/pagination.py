@@ -0,0 +1,15 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Paginate in 'id' order using opaque cursors. Each page is read with
+    'WHERE id > <last id> ORDER BY id LIMIT <page size>', which costs
+    the same on the last page as on the first, and no COUNT(*) query is
+    ever made. The default page size is the 'PAGE_SIZE' REST framework
+    setting, and clients may ask for up to 'max_page_size' results with
+    '?page_size='.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
@@ -0,0 +1,72 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+
+# The view each request thread is running, by thread id, kept up to
+# date by 'ProfilerMiddleware'.
+request_views = {}
+
+# Only one profiling session may run per process at a time.
+session_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', code.co_filename)
+    return f'{module}:{code.co_name}'
+
+
+def collapse(frame):
+    """
+    Describe a stack as its frames' labels, outermost first, joined by
+    semicolons.
+    """
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+def sample_requests(duration, interval=0.005):
+    """
+    Sample the stacks of the threads handling requests every 'interval'
+    seconds, for 'duration' seconds, and return a Counter of collapsed
+    stacks, each prefixed with the name of the view being run. The
+    calling thread is not sampled. Raise ProfilerBusy if another
+    session is running.
+    """
+    if not session_lock.acquire(blocking=False):
+        raise ProfilerBusy
+    try:
+        own_thread = threading.get_ident()
+        samples = Counter()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            frames = sys._current_frames()
+            for thread_id, view in list(request_views.items()):
+                frame = frames.get(thread_id)
+                if thread_id != own_thread and frame is not None:
+                    samples[f'{view};{collapse(frame)}'] += 1
+            del frames
+            time.sleep(interval)
+        return samples
+    finally:
+        session_lock.release()
+
+
+def render_collapsed(samples):
+    """
+    Render samples in the collapsed stack format read by flame graph
+    tools such as 'flamegraph.pl' and speedscope: one line per stack,
+    followed by its number of samples.
+    """
+    return ''.join(
+        f'{stack} {count}\n' for stack, count in sorted(samples.items())
+    )
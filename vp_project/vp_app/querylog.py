@@ -0,0 +1,71 @@
+import re
+from collections import Counter
+
+
+# Literals and parameter placeholders ('%s', as seen by execute
+# wrappers) are replaced, in order: quoted strings, numbers, then lists
+# of placeholders, so that 'IN (1, 2, 3)' and 'IN (4)' share a shape.
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?(?![\w"])')
+PLACEHOLDER_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Statements Django issues around transactions, which say nothing about
+# the data a view reads or writes.
+TRANSACTION_PREFIXES = (
+    'SAVEPOINT',
+    'RELEASE SAVEPOINT',
+    'ROLLBACK TO SAVEPOINT',
+    'BEGIN',
+    'COMMIT',
+    'ROLLBACK',
+)
+
+
+def normalize_sql(sql):
+    """
+    Reduce a SQL statement to its shape: the statement with every
+    literal value replaced by '?'. Statements that differ only in the
+    values they use, such as the same lookup run once per row, share a
+    shape.
+    """
+    shape = STRING_RE.sub('?', sql).replace('%s', '?')
+    shape = NUMBER_RE.sub('?', shape)
+    shape = PLACEHOLDER_LIST_RE.sub('(...)', shape)
+    return WHITESPACE_RE.sub(' ', shape).strip()
+
+
+def is_transaction_statement(sql):
+    return sql.lstrip().upper().startswith(TRANSACTION_PREFIXES)
+
+
+def data_queries(queries):
+    """
+    Filter a list of 'connection.queries' entries down to the
+    statements that read or write data.
+    """
+    return [query for query in queries
+            if not is_transaction_statement(query['sql'])]
+
+
+def repeated_shapes(queries, threshold=2):
+    """
+    Count the shapes of a list of 'connection.queries' entries, and
+    return '(count, shape)' pairs for every shape run at least
+    'threshold' times, most frequent first.
+    """
+    shapes = Counter(normalize_sql(query['sql']) for query in queries)
+    return [(count, shape) for shape, count in shapes.most_common()
+            if count >= threshold]
+
+
+def query_budget(budget):
+    """
+    Declare the most queries a function-based view may make per
+    request, like the 'query_budget' attribute of class-based views.
+    Apply it above '@api_view'.
+    """
+    def decorator(view):
+        view.cls.query_budget = budget
+        return view
+    return decorator
@@ -0,0 +1,89 @@
+import json
+import re
+
+
+# Tables large enough that reading all of them, or reading rows one
+# index lookup at a time, is a problem.
+WATCHED_TABLES = ['vp_app_reply']
+
+SQLITE_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+SQLITE_SEARCH_RE = re.compile(r'^SEARCH (?:TABLE )?(\w+) USING (.*)$')
+
+
+def explain(connection, sql, params):
+    """
+    Get the plan of a statement as a list of lines, and a list of
+    problems found in it.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return sqlite_problems([row[-1] for row in cursor.fetchall()])
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return postgresql_problems(plan[0]['Plan'])
+    raise NotImplementedError(
+        f'Query plans cannot be read from {connection.vendor} databases.'
+    )
+
+
+def sqlite_problems(details):
+    """
+    Find problems in the 'detail' column of SQLite's 'EXPLAIN QUERY
+    PLAN': full scans of watched tables, temporary B-trees built to sort
+    or group rows, and index searches on watched tables that must also
+    read the table because the index does not cover the query.
+    """
+    problems = []
+    for detail in details:
+        scan = SQLITE_SCAN_RE.match(detail)
+        search = SQLITE_SEARCH_RE.match(detail)
+        if scan and scan.group(1) in WATCHED_TABLES:
+            problems.append(f'full scan of {scan.group(1)}')
+        elif search and search.group(1) in WATCHED_TABLES \
+                and search.group(2).startswith('INDEX '):
+            index = search.group(2).split()[1]
+            problems.append(
+                f'{index} does not cover the query on {search.group(1)}'
+            )
+        if detail.startswith('USE TEMP B-TREE'):
+            problems.append(detail.lower().replace('use ', '', 1))
+    return details, problems
+
+
+def postgresql_problems(node, depth=0):
+    """
+    Find the same problems in PostgreSQL's JSON 'EXPLAIN' output:
+    sequential scans and non-index-only scans of watched tables, and
+    sorts.
+    """
+    lines = ['  ' * depth + describe_postgresql_node(node)]
+    problems = []
+    table = node.get('Relation Name')
+    if table in WATCHED_TABLES:
+        if node['Node Type'] == 'Seq Scan':
+            problems.append(f'full scan of {table}')
+        elif node['Node Type'] in ('Index Scan', 'Bitmap Heap Scan'):
+            problems.append(
+                f'{node.get("Index Name", "index")} does not cover the '
+                f'query on {table}'
+            )
+    if node['Node Type'] in ('Sort', 'Incremental Sort'):
+        problems.append(f'temp sort on {", ".join(node["Sort Key"])}')
+    for child in node.get('Plans', []):
+        child_lines, child_problems = postgresql_problems(child, depth + 1)
+        lines += child_lines
+        problems += child_problems
+    return lines, problems
+
+
+def describe_postgresql_node(node):
+    description = node['Node Type']
+    if 'Relation Name' in node:
+        description += f' on {node["Relation Name"]}'
+    if 'Index Name' in node:
+        description += f' using {node["Index Name"]}'
+    return description
@@ -0,0 +1,68 @@
+from collections import namedtuple
+from django.conf import settings
+from django.http import Http404
+from .caching import LRUCache
+from .models import Answer, Question
+
+
+# What the reply and results views need to know about a Question:
+# its dates, and its Answers as '(id, content)' pairs in id order.
+QuestionMetadata = namedtuple(
+    'QuestionMetadata',
+    ['id', 'date_published', 'date_concluded', 'answers']
+)
+
+
+def load_metadata(question_id):
+    """
+    Read a Question's metadata with one query (two if it has no
+    Answers). Return None if there is no such Question.
+    """
+    rows = list(Answer.objects
+                .filter(question=question_id)
+                .order_by('id')
+                .values_list('id', 'content', 'question__date_published',
+                             'question__date_concluded'))
+    if rows:
+        dates = rows[0][2:]
+    else:
+        dates = Question.objects.filter(id=question_id) \
+            .values_list('date_published', 'date_concluded').first()
+        if dates is None:
+            return None
+    return QuestionMetadata(
+        question_id,
+        *dates,
+        tuple((answer_id, content) for answer_id, content, _, _ in rows)
+    )
+
+
+class QuestionMetadataCache(LRUCache):
+    """
+    Cache of QuestionMetadata by Question id. Saving or deleting a
+    Question or an Answer discards the Question's entry (see
+    'signals.py').
+    """
+    generation_key = 'vp_app:question-metadata:generation'
+
+    def load(self, question_id):
+        return load_metadata(question_id)
+
+
+options = getattr(settings, 'QUESTION_METADATA_CACHE', {})
+question_cache = QuestionMetadataCache(
+    max_size=options.get('MAX_SIZE', 1024),
+    ttl=options.get('TTL', 60),
+    cache_alias=options.get('CACHE', 'default')
+)
+
+
+def get_question_metadata(question_id):
+    """
+    Get a Question's metadata from the cache, raising Http404 if there
+    is no such Question.
+    """
+    metadata = question_cache.get(question_id)
+    if metadata is None:
+        raise Http404('No Question matches the given query.')
+    return metadata
@@ -0,0 +1,78 @@
+import json
+from django.utils.cache import patch_vary_headers
+from rest_framework.response import Response
+from .conditional import make_etag
+
+
+def get_stored_encoding(request, content_gzip=None):
+    """
+    Return the content-coding of the stored bytes a PrerenderedResponse
+    sends in answer to 'request': 'gzip' or 'identity' for compact JSON,
+    or None when another renderer renders its data.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    media_type = getattr(request, 'accepted_media_type', None) or ''
+    if getattr(renderer, 'format', None) != 'json' \
+            or 'indent' in media_type:
+        return None
+    if content_gzip and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+        return 'gzip'
+    return 'identity'
+
+
+def get_stored_etag(request, etag, content_gzip=None):
+    """
+    Adapt 'etag', the strong ETag of stored JSON, to the representation
+    a PrerenderedResponse sends in answer to 'request'. A strong ETag
+    names exact bytes, so the gzipped bytes get their own ('-gzip' is
+    appended), and other renderers get a weak ETag (see
+    'conditional.py').
+    """
+    encoding = get_stored_encoding(request, content_gzip)
+    if encoding is None:
+        return make_etag(request, etag)
+    if encoding == 'gzip':
+        return f'{etag[:-1]}-gzip"'
+    return etag
+
+
+class PrerenderedResponse(Response):
+    """
+    A Response for data that has already been rendered to compact JSON,
+    such as a ResultsSnapshot. The stored bytes are sent as they are to
+    JSON clients, gzipped if the client accepts it. Any other renderer
+    (e.g. the browsable API) falls back to rendering 'data', which is
+    only decoded from the stored JSON when it is needed.
+    """
+
+    def __init__(self, content, content_gzip=None, etag=None, **kwargs):
+        self.content_json = bytes(content)
+        self.content_gzip = content_gzip and bytes(content_gzip)
+        self._data = None
+        super().__init__(**kwargs)
+        if etag:
+            self['ETag'] = etag
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json.loads(self.content_json.decode('utf-8'))
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        request = self.renderer_context.get('request')
+        encoding = request and get_stored_encoding(request, self.content_gzip)
+        if encoding is None:
+            return super().rendered_content
+
+        self['Content-Type'] = self.accepted_renderer.media_type
+        patch_vary_headers(self, ['Accept-Encoding'])
+        if encoding == 'gzip':
+            self['Content-Encoding'] = 'gzip'
+            return self.content_gzip
+        return self.content_json
@@ -1,10 +1,38 @@
+from django.db import IntegrityError
+from django.db.models import Count, Min
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.permissions import SAFE_METHODS
-from .models import Question, Answer, Reply
+from rest_framework.settings import api_settings
+from .models import Question, Answer, Reply, AnswerTally, Score
+from .questioncache import get_question_metadata
+
+
+class AnswerSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Answer
+        fields = [
+            'id',
+            'content'
+        ]
 
 
 class QuestionSerializer(serializers.ModelSerializer):
+    def get_fields(self):
+        """
+        Embed each Answer's id and content instead of its primary key
+        when the request asks for '?expand=answers'.
+        """
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None and 'answers' in \
+                request.query_params.get('expand', '').split(','):
+            fields['answers'] = AnswerSummarySerializer(
+                many=True,
+                read_only=True
+            )
+        return fields
+
     class Meta:
         model = Question
         fields = [
@@ -26,40 +54,64 @@ class AnswerSerializer(serializers.ModelSerializer):
         ]
 
 
+class ReplyAnswerField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolve a vote or prediction among the Question's Answers, which
+    the serializer takes from the cache (see 'ReplySerializer.
+    get_question()'), querying only for Answers to other Questions,
+    which are invalid.
+    """
+    def to_internal_value(self, data):
+        for answer in self.parent.get_answers():
+            if str(answer.pk) == str(data):
+                return answer
+        return super().to_internal_value(data)
+
+
 class ReplySerializer(serializers.ModelSerializer):
-    user = serializers.ReadOnlyField(source='user.id')
-    question = serializers.ReadOnlyField(source='question.id')
+    user = serializers.ReadOnlyField(source='user_id')
+    question = serializers.ReadOnlyField(source='question_id')
+    vote = ReplyAnswerField(queryset=Answer.objects.all())
+    prediction = ReplyAnswerField(queryset=Answer.objects.all())
 
-    def validate(self, data):
+    duplicate_message = 'Users may submit only one reply per question.'
+
+    def get_question(self):
         """
-        Check that a user has not yet submitted a reply for the given
-        question. Users may only respond once per question. Check that
-        the provided vote and prediction pertain to the question.
+        Get the metadata of the Question being replied to (see
+        'questioncache.py'), and build its Answers from it. Raises
+        Http404 if there is no such Question.
         """
+        if '_question' not in self.__dict__:
+            # The 'QuestionReplies' view queryset contains all Replies
+            # for a single question. This view will have 'question_id'
+            # passed in the URL.
+            question_id = self.context['request'] \
+                .parser_context['kwargs']['question_id']
+            self._question = get_question_metadata(question_id)
+            self._answers = [
+                Answer(id=answer_id, content=content,
+                       question_id=question_id)
+                for answer_id, content in self._question.answers
+            ]
+        return self._question
 
-        # The 'QuestionReplies' view queryset contains all Replies for a
-        # single question. This view will have 'question_id' passed in
-        # the URL.
-        question_id = self.context['request'] \
-            .parser_context['kwargs']['question_id']
+    def get_answers(self):
+        self.get_question()
+        return self._answers
 
-        # Use 'question_id' to find associated Question and Answers.
-        question = Question.objects.get(id=question_id)
-        answers = [answer for answer in question.answers.all()]
+    def validate(self, data):
+        """
+        Check that the provided vote and prediction pertain to the
+        question. Users may only respond once per question; that is
+        enforced by the database when the Reply is created (see
+        'create()').
+        """
+        question = self.get_question()
+        answers = self.get_answers()
         answer_ids = [answer.id for answer in answers]
         request_method = self.context['request'].stream.method
 
-        # Verify that the user has not previously responded to this
-        # question.
-        existing_reply = Reply.objects.filter(
-            user=self.context['request'].user.id,
-            question=question
-        ).first()
-        if existing_reply and request_method == 'POST':
-            raise serializers.ValidationError(
-                'Users may submit only one reply per question.'
-            )
-
         # Verify that the reply contains a valid vote.
         if 'vote' in data.keys():
             if data['vote'].id not in answer_ids:
@@ -86,6 +138,23 @@ class ReplySerializer(serializers.ModelSerializer):
 
         return data
 
+    def create(self, validated_data):
+        """
+        Create the Reply, turning a violation of the one-reply-per-
+        question constraint into a validation error. Checking first
+        would cost a query and still let concurrent requests through.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if not Reply.objects.filter(
+                    user=validated_data['user'],
+                    question=validated_data['question_id']).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [self.duplicate_message]
+            })
+
     class Meta:
         model = Reply
         fields = [
@@ -111,45 +180,74 @@ class ResultsSerializer(serializers.ModelSerializer):
             'locations',
         ]
 
+    def get_tallies(self, question):
+        """
+        Get the (votes, predictions) tally of each of the Question's
+        Answers, in Answer order. Tallies are read once per Question.
+        """
+        cache = self.__dict__.setdefault('_tallies', {})
+        if question.pk not in cache:
+            tallies = []
+            answers = question.answers.select_related('tally').order_by('id')
+            for answer in answers:
+                try:
+                    tally = answer.tally
+                except AnswerTally.DoesNotExist:
+                    tally = AnswerTally(answer=answer)
+                tallies.append((answer.id, tally.votes, tally.predictions))
+            cache[question.pk] = tallies
+        return cache[question.pk]
+
     def get_total_votes(self, question):
-        return question.replies.all().count()
+        return sum(votes for _, votes, _ in self.get_tallies(question))
 
     def get_results(self, question):
-        results = []
-        answers = [answer for answer in question.answers.all()]
-        for answer in answers:
-            results.append({
-                'answer': answer.id,
-                'votes': Reply.objects.filter(
-                    vote=answer.id).count(),
-                'predictions': Reply.objects.filter(
-                    prediction=answer.id).count()
-            })
-        return results
+        return [
+            {
+                'answer': answer_id,
+                'votes': votes,
+                'predictions': predictions
+            } for answer_id, votes, predictions in self.get_tallies(question)
+        ]
 
     def get_locations(self, question):
+        """
+        Break down the Question's votes by User location, using a
+        single GROUP BY query. Locations are listed in the order in
+        which their first Reply was made.
+        """
+        answer_ids = [answer_id for answer_id, _, _ in
+                      self.get_tallies(question)]
+        groups = question.replies \
+            .values_list('user__profile__location', 'vote') \
+            .annotate(count=Count('id'), first_reply=Min('id')) \
+            .order_by()
+
         locations = {}
-        replies = [reply for reply in question.replies.all()]
-        answers = [answer for answer in question.answers.all()]
-        for reply in replies:
-            location = reply.user.profile.location
-            vote = reply.vote.id
+        first_replies = {}
+        for location, vote, count, first_reply in groups:
             if location not in locations:
                 locations[location] = {
                     'votes': [
                         {
-                            'answer': answer.id,
+                            'answer': answer_id,
                             'count': 0
-                        } for answer in answers
+                        } for answer_id in answer_ids
                     ],
                     'total_count': 0
                 }
+                first_replies[location] = first_reply
+            first_replies[location] = min(
+                first_replies[location], first_reply
+            )
             for score in locations[location]['votes']:
                 if score['answer'] == vote:
-                    score['count'] += 1
-            locations[location]['total_count'] += 1
-        return locations
-
+                    score['count'] += count
+            locations[location]['total_count'] += count
+        return {
+            location: locations[location]
+            for location in sorted(locations, key=first_replies.get)
+        }
 
 
 class RecordSerializer(serializers.ModelSerializer):
@@ -164,48 +262,47 @@ class RecordSerializer(serializers.ModelSerializer):
             'correct_predictions'
         ]
 
-    def get_total_replies(self, user):
+    def get_score(self, user):
         """
-        Get the User's total number of Replies, excluding Replies to
-        Questions that have not yet concluded.
+        Get the User's Score, which counts Replies to Questions that
+        have concluded and been finalized (see 'conclusion.py'). Users
+        without a Score have not replied to any such Question.
         """
-        total_replies = Reply.objects.filter(
-            user=user,
-
-            # The keyword below basically means
-            # "question.date_concluded <= timezone.now()", to ensure
-            # that we only consider Questions that have not yet
-            # concluded.
-            question__date_concluded__lte=timezone.now()
+        cache = self.__dict__.setdefault('_scores', {})
+        if user.pk not in cache:
+            cache[user.pk] = Score.objects.filter(user=user).first() \
+                or Score(user=user)
+        return cache[user.pk]
 
-        ).count()
-        return total_replies
+    def get_total_replies(self, user):
+        """
+        Get the User's total number of Replies, counting only Replies
+        to Questions finalized by the 'conclude_questions' job.
+        """
+        return self.get_score(user).total_replies
 
     def get_correct_predictions(self, user):
         """
         Get the User's total number of Replies containing predictions
         that match the Question's Answer receiving the most votes,
-        excluding Replies to Questions that have not yet concluded.
-        """
-        correct_predictions = 0
-        replies = Reply.objects.filter(
-            user=user,
-
-            # The keyword below basically means
-            # "question.date_concluded <= timezone.now()", to ensure
-            # that we only consider Questions that have not yet
-            # concluded.
-            question__date_concluded__lte=timezone.now()
-
-        ).all()
-        for reply in replies:
-            question = reply.question
-            most_votes = 0
-            top_answer = None
-            for answer in question.answers.all():
-                if answer.votes.count() > most_votes:
-                    most_votes = answer.votes.count()
-                    top_answer = answer
-            if reply.prediction == top_answer:
-                correct_predictions += 1
-        return correct_predictions
+        counting only Replies to Questions finalized by the
+        'conclude_questions' job.
+        """
+        return self.get_score(user).correct_predictions
+
+
+class LeaderSerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField(read_only=True)
+    user = serializers.ReadOnlyField(source='user_id')
+    username = serializers.ReadOnlyField(source='user.username')
+
+    class Meta:
+        model = Score
+        fields = [
+            'rank',
+            'user',
+            'username',
+            'location',
+            'total_replies',
+            'correct_predictions'
+        ]
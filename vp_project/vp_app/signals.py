@@ -0,0 +1,239 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from users.models import Profile
+from .authentication import revoke_access_tokens, token_cache
+from .catalogcache import bump_generation
+from .conclusion import keep_stale_results, reopen_question
+from .leaderboard import adjust_buckets
+from .models import (
+    Question,
+    Answer,
+    AnswerTally,
+    Reply,
+    ResultsSnapshot,
+    Score
+)
+from .questioncache import question_cache
+from .tallies import apply_reply_change, rebuild_tallies
+
+
+@receiver(post_save, sender=Answer)
+def create_answer_tally(sender, instance, created, **kwargs):
+    if created:
+        AnswerTally.objects.create(answer=instance)
+
+
+@receiver(pre_save, sender=Question)
+def reopen_finalized_question(sender, instance, **kwargs):
+    """
+    A finalized Question whose conclusion moves past the time it was
+    finalized (e.g. reopened by staff) is unfinalized, and finalized
+    again once it concludes, so that its later Replies are scored.
+    Otherwise, the finalization is kept from being overwritten by an
+    instance loaded before it.
+    """
+    if instance.pk is None:
+        return
+    finalized = Question.objects \
+        .filter(pk=instance.pk, date_finalized__isnull=False) \
+        .values_list('date_finalized', 'winning_answer') \
+        .first()
+    if finalized is None:
+        return
+    date_finalized, winning_answer = finalized
+    if instance.date_concluded > date_finalized:
+        reopen_question(instance)
+    else:
+        instance.date_finalized = date_finalized
+        instance.winning_answer_id = winning_answer
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Answer)
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Reply)
+def discard_results_snapshot(sender, instance, **kwargs):
+    """
+    Staff edits to a Question or its Answers (e.g. moving its
+    conclusion date) invalidate its frozen results. So does deleting a
+    Reply, which is still allowed after the Question concludes.
+    """
+    question_id = instance.pk if sender is Question \
+        else instance.question_id
+    keep_stale_results(question_id)
+    ResultsSnapshot.objects.filter(question=question_id).delete()
+
+
+@receiver(post_delete, sender=Answer)
+@receiver(post_save, sender=Answer)
+def touch_question(sender, instance, **kwargs):
+    """
+    Answers are served as part of their Question, so a change to one
+    advances the Question's modification date, which the conditional
+    GETs of the question list and detail are validated against.
+    """
+    Question.objects.filter(pk=instance.question_id) \
+        .update(date_modified=timezone.now())
+
+
+def invalidate(cache, key=None):
+    """
+    Discard a cache entry now, and again once the transaction commits,
+    in case another request cached the old rows in the meantime.
+    """
+    cache.invalidate(key)
+    transaction.on_commit(lambda: cache.invalidate(key))
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=Answer)
+@receiver(post_save, sender=Answer)
+def invalidate_question_metadata(sender, instance, **kwargs):
+    question_id = instance.pk if sender is Question \
+        else instance.question_id
+    invalidate(question_cache, question_id)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=Answer)
+@receiver(post_save, sender=Answer)
+def bump_catalog_generation(sender, **kwargs):
+    """
+    Make the cached question list and details unreachable (see
+    'catalogcache.py'), now and again once the transaction commits.
+    """
+    bump_generation()
+    transaction.on_commit(bump_generation)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """
+    The Token is also what signed access tokens are refreshed with, so
+    the User's access tokens are revoked with it.
+    """
+    invalidate(token_cache, instance.key)
+    revoke_access_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, update_fields,
+                           **kwargs):
+    """
+    Cached Tokens hold a copy of their User, and signed access tokens
+    their staff flag, so any change to a User (deactivation, a new
+    password, staff status) discards the first and revokes the second.
+    Saves of 'last_login' alone, made on every session login, do not.
+    """
+    if created:
+        return
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    keys = Token.objects.filter(user=instance.pk) \
+        .values_list('key', flat=True)
+    for key in keys:
+        invalidate(token_cache, key)
+    revoke_access_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user(sender, instance, **kwargs):
+    """
+    Signed access tokens are not checked against the User table, so a
+    deleted User's are revoked.
+    """
+    revoke_access_tokens(instance.pk)
+
+
+@receiver(post_save, sender=Reply)
+def tally_saved_reply(sender, instance, created, **kwargs):
+    """
+    Count a new Reply, or move the counts of an updated Reply from its
+    previous vote and prediction to the current ones.
+    """
+    new = (instance.vote_id, instance.prediction_id)
+    old = getattr(instance, '_tallied', None)
+    if created:
+        apply_reply_change(None, new)
+    elif old is not None and None not in old:
+        apply_reply_change(old, new)
+    else:
+        # The Reply was saved without being fully loaded first, so its
+        # previous state is unknown. Recount the whole question.
+        rebuild_tallies(question_ids=[instance.question_id])
+    instance.remember_tallied()
+
+
+@receiver(post_delete, sender=Reply)
+def tally_deleted_reply(sender, instance, **kwargs):
+    old = getattr(instance, '_tallied', None)
+    if old is None or None in old:
+        old = (instance.vote_id, instance.prediction_id)
+    apply_reply_change(old, None)
+
+
+@receiver(post_delete, sender=Reply)
+def unscore_deleted_reply(sender, instance, **kwargs):
+    """
+    Replies may still be deleted after their Question concludes. If the
+    Question was already finalized, take the Reply back out of its
+    User's Score.
+    """
+    finalized = Question.objects \
+        .filter(pk=instance.question_id, date_finalized__isnull=False) \
+        .values_list('winning_answer', flat=True)
+    for winning_answer in finalized:
+        correct = 1 if instance.prediction_id == winning_answer else 0
+        score = Score.objects.filter(user=instance.user_id).first()
+        if score is None:
+            continue
+        Score.objects.filter(user=instance.user_id).update(
+            total_replies=F('total_replies') - 1,
+            correct_predictions=F('correct_predictions') - correct
+        )
+        adjust_buckets({
+            (score.location, score.correct_predictions): -correct,
+            (score.location, score.correct_predictions - 1): correct,
+        })
+
+
+@receiver(post_save, sender=Profile)
+def relocate_score(sender, instance, **kwargs):
+    """
+    Keep the location copied onto a User's Score in step with their
+    Profile, moving the User to the new location's leaderboard.
+    """
+    score = Score.objects \
+        .filter(user=instance.user_id) \
+        .exclude(location=instance.location) \
+        .first()
+    if score is not None:
+        Score.objects.filter(user=instance.user_id) \
+            .update(location=instance.location)
+        adjust_buckets({
+            (score.location, score.correct_predictions): -1,
+            (instance.location, score.correct_predictions): 1,
+        })
+
+
+@receiver(pre_delete, sender=User)
+def unrank_deleted_user(sender, instance, **kwargs):
+    """
+    Take a deleted User's Score out of the leaderboard buckets. The
+    Score itself is deleted along with the User.
+    """
+    score = Score.objects.filter(user=instance.pk).first()
+    if score is not None:
+        adjust_buckets({(score.location, score.correct_predictions): -1})
@@ -0,0 +1,105 @@
+import threading
+import time
+import uuid
+from django.core.cache import caches
+
+
+class Flight:
+    """
+    One computation in progress, which other threads wait on.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Run at most one computation of each key at a time. Within a process,
+    the first thread to miss computes, and the others wait for its
+    result. Across processes, the computing thread first adds a lock to
+    the Django cache 'cache_alias'. Threads in other processes wait for
+    the lock to be released, then look up the stored value instead of
+    computing it again. That cache must be shared between processes
+    (e.g. Memcached or Redis) for the lock to hold across them.
+
+    Threads stop waiting for another process after 'wait_timeout'
+    seconds and compute themselves, in case it died. Its lock expires
+    after 'lock_timeout' seconds.
+    """
+    def __init__(self, name, cache_alias='default', lock_timeout=30,
+                 wait_timeout=10, poll_interval=0.05):
+        self.name = name
+        self.cache_alias = cache_alias
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.flights = {}
+        self.lock = threading.Lock()
+
+    def run(self, key, lookup, compute, stale=None):
+        """
+        Return 'lookup()', or, if that is None, the value of 'compute()',
+        which should store it where 'lookup()' finds it. If 'stale' is
+        given, threads that would wait for another computation return
+        'stale()' instead, unless it is None.
+        """
+        value = lookup()
+        if value is not None:
+            return value
+
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = Flight()
+        if not leader:
+            value = stale and stale()
+            if value is not None:
+                return value
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self.compute_once(key, lookup, compute, stale)
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+        return flight.value
+
+    def compute_once(self, key, lookup, compute, stale):
+        """
+        Compute under the cross-process lock, or return the value
+        another process computed while this one waited for its lock.
+        """
+        cache = caches[self.cache_alias]
+        lock_key = f'vp_app:single-flight:{self.name}:{key}'
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+        waited = False
+        while not cache.add(lock_key, token, self.lock_timeout):
+            if not waited:
+                value = stale and stale()
+                if value is not None:
+                    return value
+                waited = True
+            if time.monotonic() >= deadline:
+                return compute()
+            time.sleep(self.poll_interval)
+
+        try:
+            if waited:
+                value = lookup()
+                if value is not None:
+                    return value
+            return compute()
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from logging.handlers import RotatingFileHandler
+
+
+# One handler per log file, shared by every middleware instance, so that
+# the file is rotated in one place.
+handlers = {}
+handlers_lock = threading.Lock()
+
+
+def get_handler(path, max_bytes, backup_count):
+    """
+    Get a handler that appends lines to 'path', rotating it once it
+    reaches 'max_bytes' and keeping 'backup_count' old files.
+    """
+    with handlers_lock:
+        handler = handlers.get(path)
+        if handler is None:
+            handler = RotatingFileHandler(
+                path,
+                maxBytes=max_bytes,
+                backupCount=backup_count,
+                delay=True
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            handlers[path] = handler
+        return handler
+
+
+def write_entry(handler, entry):
+    """
+    Append an entry to the log as one line of JSON.
+    """
+    handler.handle(logging.makeLogRecord({
+        'msg': json.dumps(entry, sort_keys=True),
+        'levelno': logging.WARNING,
+        'levelname': 'WARNING',
+    }))
+
+
+def read_entries(path):
+    """
+    Read the entries of a log and its rotated backups, oldest first.
+    Lines that are not valid JSON, such as one cut short by a crash,
+    are skipped.
+    """
+    paths = []
+    number = 1
+    while os.path.exists(f'{path}.{number}'):
+        paths.insert(0, f'{path}.{number}')
+        number += 1
+    if os.path.exists(path):
+        paths.append(path)
+    for log_path in paths:
+        with open(log_path) as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def summarize(entries):
+    """
+    Group entries by SQL shape. Return one summary per shape, with its
+    count, total, mean and longest duration, the views that ran it and
+    the stack of its slowest run, ordered by total time.
+    """
+    groups = defaultdict(list)
+    for entry in entries:
+        groups[entry['sql']].append(entry)
+    summaries = []
+    for sql, group in groups.items():
+        slowest = max(group, key=lambda entry: entry['duration_ms'])
+        total = sum(entry['duration_ms'] for entry in group)
+        summaries.append({
+            'sql': sql,
+            'count': len(group),
+            'total_ms': total,
+            'mean_ms': total / len(group),
+            'max_ms': slowest['duration_ms'],
+            'views': sorted({entry['view'] for entry in group}),
+            'stack': slowest['stack'],
+        })
+    summaries.sort(key=lambda summary: summary['total_ms'], reverse=True)
+    return summaries
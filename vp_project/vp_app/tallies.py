@@ -0,0 +1,102 @@
+from collections import defaultdict
+from django.db.models import Case, Count, F, Value, When
+from .models import Answer, AnswerTally, Reply
+
+
+def apply_reply_change(old, new):
+    """
+    Move an Answer's tallies from one stored (vote, prediction) pair to
+    another. Either pair may be None, meaning the Reply was created
+    ('old' is None) or deleted ('new' is None).
+
+    All affected tallies are adjusted with a single UPDATE. If a tally
+    row is missing, it is rebuilt from the raw Replies instead.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    if old is not None:
+        deltas[old[0]][0] -= 1
+        deltas[old[1]][1] -= 1
+    if new is not None:
+        deltas[new[0]][0] += 1
+        deltas[new[1]][1] += 1
+    deltas = {
+        answer_id: delta for answer_id, delta in deltas.items()
+        if answer_id is not None and delta != [0, 0]
+    }
+    if not deltas:
+        return
+    updated = AnswerTally.objects.filter(answer_id__in=deltas).update(
+        votes=F('votes') + _delta_case(deltas, 0),
+        predictions=F('predictions') + _delta_case(deltas, 1)
+    )
+    if updated < len(deltas):
+        rebuild_tallies(answer_ids=deltas.keys())
+
+
+def _delta_case(deltas, index):
+    return Case(
+        *[
+            When(answer_id=answer_id, then=Value(delta[index]))
+            for answer_id, delta in deltas.items()
+        ],
+        default=Value(0)
+    )
+
+
+def rebuild_tallies(question_ids=None, answer_ids=None, commit=True):
+    """
+    Recount votes and predictions from the raw Replies, and correct any
+    AnswerTally that disagrees. Missing tallies are created.
+
+    Return a list of '(answer_id, stored, counted)' tuples, one for
+    each tally that was wrong, where 'stored' and 'counted' are
+    '(votes, predictions)' pairs ('stored' is None for a missing
+    tally). Nothing is written if 'commit' is False.
+    """
+    answers = Answer.objects.all()
+    if question_ids is not None:
+        answers = answers.filter(question__in=list(question_ids))
+    if answer_ids is not None:
+        answers = answers.filter(id__in=list(answer_ids))
+    answer_ids = list(answers.values_list('id', flat=True))
+
+    votes = dict(
+        Reply.objects.filter(vote__in=answer_ids)
+        .values_list('vote')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    predictions = dict(
+        Reply.objects.filter(prediction__in=answer_ids)
+        .values_list('prediction')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    tallies = AnswerTally.objects.in_bulk(answer_ids)
+
+    corrections = []
+    missing = []
+    changed = []
+    for answer_id in answer_ids:
+        counted = (votes.get(answer_id, 0), predictions.get(answer_id, 0))
+        tally = tallies.get(answer_id)
+        if tally is None:
+            corrections.append((answer_id, None, counted))
+            missing.append(AnswerTally(
+                answer_id=answer_id,
+                votes=counted[0],
+                predictions=counted[1]
+            ))
+        elif (tally.votes, tally.predictions) != counted:
+            corrections.append(
+                (answer_id, (tally.votes, tally.predictions), counted)
+            )
+            tally.votes, tally.predictions = counted
+            changed.append(tally)
+
+    if commit:
+        AnswerTally.objects.bulk_create(missing, batch_size=500)
+        AnswerTally.objects.bulk_update(
+            changed, ['votes', 'predictions'], batch_size=500
+        )
+    return corrections
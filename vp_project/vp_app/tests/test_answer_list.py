@@ -25,7 +25,7 @@ class AnswerListTests(APITestCase):
         """
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.data['results'], [])
 
     def test_get_questions(self):
         """
@@ -42,7 +42,7 @@ class AnswerListTests(APITestCase):
         )
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, [
+        self.assertEqual(response.data['results'], [
             {
                 'id': 1,
                 'content': 'answer 1',
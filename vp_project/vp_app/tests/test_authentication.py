@@ -0,0 +1,265 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from vp_app.authentication import issue_access_token, token_cache
+from vp_app.models import Question, Answer
+
+
+class CachingTokenAuthenticationTests(APITestCase):
+    # The view lists session authentication first, so refused
+    # credentials are a 403.
+    url = reverse('reply-list')
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(username='test_user')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        token_cache.clear()
+
+    def test_cached_token(self):
+        """
+        The Token is read on the first request only. Each request gets
+        its own User instance.
+        """
+        with self.assertNumQueries(3):
+            response_1 = self.client.get(self.url)
+        with self.assertNumQueries(2):
+            response_2 = self.client.get(self.url)
+        self.assertEqual(response_1.status_code, 200)
+        self.assertEqual(response_2.status_code, 200)
+        user_1 = response_1.wsgi_request.user
+        user_2 = response_2.wsgi_request.user
+        self.assertEqual(user_1, self.user)
+        self.assertIsNot(user_1, user_2)
+        self.assertEqual(response_2.wsgi_request.auth, self.token)
+
+    def test_invalid_token(self):
+        """
+        Unknown Tokens are refused, and not cached.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['detail'], 'Invalid token.')
+        self.assertNotIn('invalid', token_cache.entries)
+
+    def test_deleted_token(self):
+        """
+        Deleted Tokens stop working at once.
+        """
+        self.client.get(self.url)
+        self.token.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['detail'], 'Invalid token.')
+
+    def test_deactivated_user(self):
+        """
+        Tokens of deactivated Users stop working at once.
+        """
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['detail'],
+                         'User inactive or deleted.')
+
+    def test_password_change(self):
+        """
+        Changing a User's password discards their cached Token, but
+        recording a login does not.
+        """
+        self.client.get(self.url)
+        self.user.last_login = self.user.date_joined
+        self.user.save(update_fields=['last_login'])
+        self.assertIn(self.token.key, token_cache.entries)
+        self.user.set_password('new password')
+        self.user.save()
+        self.assertNotIn(self.token.key, token_cache.entries)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    def test_other_users(self):
+        """
+        Saving a User, or signing one up, discards only that User's
+        Tokens, in every process.
+        """
+        other = User.objects.create_user(username='other_user')
+        other_token = Token.objects.create(user=other)
+        self.client.get(self.url)
+        token_cache.get_token(other_token.key)
+        generation = cache.get(token_cache.generation_key)
+        other.is_active = False
+        other.save()
+        self.client.post(reverse('create-user'), {
+            'username': 'new_user',
+            'email': 'new_user@example.com',
+            'password': 'testpassword123'
+        })
+        self.assertEqual(cache.get(token_cache.generation_key), generation)
+        self.assertIn(self.token.key, token_cache.entries)
+        self.assertNotIn(other_token.key, token_cache.entries)
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+
+class SignedTokenAuthenticationTests(APITestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(
+            username='test_user',
+            password='test-password'
+        )
+        self.staff = User.objects.create_user(
+            username='test_staff',
+            is_staff=True
+        )
+        self.question = Question.objects.create(
+            content='question 1',
+            date_published=timezone.now() - timedelta(days=1),
+            date_concluded=timezone.now() + timedelta(days=1)
+        )
+        Answer.objects.create(content='answer 1', question=self.question)
+
+    def use_access_token(self, user):
+        access = issue_access_token(user)['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_obtain_tokens(self):
+        """
+        'api-token-auth/' issues an access token along with the API
+        Token.
+        """
+        response = self.client.post('/api-token-auth/', {
+            'username': 'test_user',
+            'password': 'test-password'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['token'],
+                         Token.objects.get(user=self.user).key)
+        self.assertEqual(response.data['expires_in'], 900)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}'
+        )
+        response = self.client.get(reverse('reply-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user.id, self.user.id)
+
+    def test_no_auth_queries(self):
+        """
+        Read endpoints authenticate access tokens without touching the
+        User or Token tables.
+        """
+        self.use_access_token(self.staff)
+        for url in [reverse('question-list'),
+                    reverse('question-results', args=[self.question.id])]:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.wsgi_request.user.is_staff)
+            for query in context.captured_queries:
+                self.assertNotIn('FROM "auth_user"', query['sql'])
+                self.assertNotIn('FROM "authtoken_token"', query['sql'])
+
+    def test_deferred_fields(self):
+        """
+        Fields other than the id and staff flag are loaded on use.
+        """
+        self.use_access_token(self.user)
+        response = self.client.get(reverse('leaderboard'))
+        self.assertEqual(response.status_code, 200)
+        user = response.wsgi_request.user
+        with self.assertNumQueries(1):
+            self.assertEqual(user.username, 'test_user')
+
+    def test_invalid_token(self):
+        """
+        Tampered and expired access tokens are refused.
+        """
+        access = issue_access_token(self.user)['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}x')
+        response = self.client.get(reverse('reply-list'))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['detail'], 'Invalid token.')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        with override_settings(SIGNED_ACCESS_TOKENS={'MAX_AGE': -1}):
+            response = self.client.get(reverse('reply-list'))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['detail'], 'Token has expired.')
+
+    def test_revoked_token(self):
+        """
+        Changing a User's password revokes the access tokens issued to
+        them so far, but not later ones.
+        """
+        self.use_access_token(self.user)
+        self.user.set_password('new password')
+        self.user.save()
+        response = self.client.get(reverse('reply-list'))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['detail'], 'Token has been revoked.')
+        self.use_access_token(self.user)
+        response = self.client.get(reverse('reply-list'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_revocation_outlives_cache(self):
+        """
+        Revocations are stored in the database, so a revoked access
+        token stays refused when the cache loses them, as does a deleted
+        User's.
+        """
+        self.use_access_token(self.user)
+        self.user.is_active = False
+        self.user.save()
+        cache.clear()
+        response = self.client.get(reverse('reply-list'))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data['detail'], 'Token has been revoked.')
+        self.use_access_token(self.staff)
+        self.staff.delete()
+        cache.clear()
+        response = self.client.get(reverse('reply-list'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_refresh(self):
+        """
+        The API Token refreshes access tokens. Deleting it revokes them.
+        """
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        response = self.client.post(reverse('api-token-refresh'))
+        self.assertEqual(response.status_code, 200)
+        access = response.data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(
+            self.client.get(reverse('reply-list')).status_code, 200
+        )
+        token.delete()
+        self.assertEqual(
+            self.client.get(reverse('reply-list')).status_code, 403
+        )
+
+    def test_disabled(self):
+        """
+        With signed access tokens disabled, none are issued or accepted.
+        """
+        self.use_access_token(self.user)
+        with override_settings(SIGNED_ACCESS_TOKENS={'ENABLED': False}):
+            response = self.client.get(reverse('reply-list'))
+            self.assertEqual(response.status_code, 403)
+            token = Token.objects.create(user=self.user)
+            self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+            response = self.client.post(reverse('api-token-refresh'))
+            self.assertEqual(response.status_code, 404)
+            response = self.client.post('/api-token-auth/', {
+                'username': 'test_user',
+                'password': 'test-password'
+            })
+            self.assertEqual(set(response.data), {'token'})
@@ -0,0 +1,141 @@
+from datetime import timedelta
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_max_age
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from vp_app.models import Question, Answer
+
+
+now = timezone.now()
+
+
+class CacheControlTests(APITestCase):
+    def setUp(self) -> None:
+        self.concluded = Question.objects.create(
+            content='question 1',
+            date_published=now - timedelta(days=2),
+            date_concluded=now - timedelta(days=1)
+        )
+        Answer.objects.create(content='answer 1', question=self.concluded)
+        self.open = Question.objects.create(
+            content='question 2',
+            date_published=now - timedelta(days=1),
+            date_concluded=now + timedelta(seconds=30)
+        )
+        self.answer = Answer.objects.create(
+            content='answer 2',
+            question=self.open
+        )
+        self.user = User.objects.create_user(username='test_user')
+        self.staff = User.objects.create_user(
+            username='test_staff',
+            is_staff=True
+        )
+
+    def get_directives(self, response):
+        return {directive.strip()
+                for directive in response['Cache-Control'].split(',')}
+
+    def test_question_list(self):
+        """
+        Question lists and details may be kept by shared caches for a
+        short while, and are revalidated by browsers.
+        """
+        for url in [reverse('question-list'),
+                    reverse('question-detail', args=[self.open.id])]:
+            response = self.client.get(url)
+            self.assertEqual(self.get_directives(response),
+                             {'public', 'max-age=0', 's-maxage=60'})
+            response = self.client.get(
+                url,
+                HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            self.assertEqual(response.status_code, 304)
+            self.assertIn('s-maxage=60', response['Cache-Control'])
+
+    def test_browsable_api(self):
+        """
+        The browsable API is never cached by shared caches.
+        """
+        response = self.client.get(reverse('question-list'),
+                                   {'format': 'api'})
+        self.assertEqual(self.get_directives(response),
+                         {'private', 'no-cache'})
+
+    def test_concluded_results(self):
+        """
+        Frozen results are cached for five minutes, then revalidated,
+        since deleting a Reply can still change them.
+        """
+        url = reverse('question-results', args=[self.concluded.id])
+        response = self.client.get(url)
+        self.assertEqual(self.get_directives(response),
+                         {'public', 'max-age=300', 'must-revalidate'})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('max-age=300', response['Cache-Control'])
+
+    def test_open_results(self):
+        """
+        Before the Question concludes, its 404 is cached no longer than
+        until it concludes, and staff see uncached live results.
+        """
+        url = reverse('question-results', args=[self.open.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertLessEqual(get_max_age(response), 30)
+        self.assertGreater(get_max_age(response), 0)
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_directives(response),
+                         {'private', 'no-store'})
+
+    def test_user_data(self):
+        """
+        Replies and records are private. The reply list may be kept by
+        the browser and revalidated.
+        """
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            reverse('question-reply', args=[self.open.id]),
+            {'vote': self.answer.id, 'prediction': self.answer.id}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Cache-Control', response)
+        cases = [
+            (reverse('question-reply', args=[self.open.id]),
+             {'private', 'no-store'}),
+            (reverse('record'), {'private', 'no-store'}),
+            (reverse('reply-list'), {'private', 'no-cache'}),
+        ]
+        for url, directives in cases:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.get_directives(response), directives)
+
+    @override_settings(CACHE_CONTROL={
+        'OPEN_MAX_AGE': 5,
+        'CONCLUDED_MAX_AGE': 3600
+    })
+    def test_settings(self):
+        """
+        The max ages are set with the 'CACHE_CONTROL' setting.
+        """
+        response = self.client.get(reverse('question-list'))
+        self.assertIn('s-maxage=5', response['Cache-Control'])
+        response = self.client.get(
+            reverse('question-results', args=[self.concluded.id])
+        )
+        self.assertEqual(get_max_age(response), 3600)
+
+    @override_settings(CACHE_CONTROL={'ENABLED': False})
+    def test_disabled(self):
+        """
+        With the policy disabled, no Cache-Control is sent.
+        """
+        response = self.client.get(reverse('question-list'))
+        self.assertNotIn('Cache-Control', response)
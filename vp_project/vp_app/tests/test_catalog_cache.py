@@ -0,0 +1,134 @@
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from vp_app.catalogcache import GENERATION_KEY
+from vp_app.models import Question, Answer
+
+
+date = timezone.now()
+
+
+@override_settings(CATALOG_CACHE={'ENABLED': True})
+class CatalogCacheTests(APITestCase):
+    url = reverse('question-list')
+
+    def setUp(self) -> None:
+        self.question = Question.objects.create(
+            content='question 1',
+            date_published=date,
+            date_concluded=(date + timedelta(days=1))
+        )
+        self.answer = Answer.objects.create(
+            content='answer 1',
+            question=self.question
+        )
+
+    def test_cached_list(self):
+        """
+        The list is rendered once, and served without queries after.
+        """
+        response_1 = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response_2 = self.client.get(self.url)
+        self.assertEqual(response_1.content, response_2.content)
+        self.assertEqual(response_2.data['results'][0]['content'],
+                         'question 1')
+
+    def test_variants(self):
+        """
+        Each query string is cached separately.
+        """
+        self.client.get(self.url)
+        response = self.client.get(self.url, {'expand': 'answers'})
+        self.assertEqual(response.data['results'][0]['answers'], [
+            {'id': self.answer.id, 'content': 'answer 1'}
+        ])
+
+    def test_invalidation(self):
+        """
+        Saving or deleting a Question or an Answer invalidates every
+        cached response.
+        """
+        detail_url = reverse('question-detail', args=[self.question.id])
+        self.client.get(self.url)
+        self.client.get(detail_url)
+        self.answer.content = 'answer one'
+        self.answer.save()
+        response = self.client.get(self.url, {'expand': 'answers'})
+        self.assertEqual(
+            response.data['results'][0]['answers'][0]['content'],
+            'answer one'
+        )
+        Question.objects.create(content='question 2')
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 2)
+        self.question.delete()
+        self.assertEqual(self.client.get(detail_url).status_code, 404)
+
+    def test_evicted_generation(self):
+        """
+        A generation evicted from the cache is replaced by a new one, so
+        responses cached under an earlier generation are never served
+        again.
+        """
+        cache.delete(GENERATION_KEY)
+        self.client.get(self.url)
+        self.question.content = 'question one'
+        self.question.save()
+        cache.delete(GENERATION_KEY)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'][0]['content'],
+                         'question one')
+
+    def test_gzip(self):
+        """
+        Clients that accept gzip get the gzipped copy.
+        """
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(data['results'][0]['content'], 'question 1')
+
+    def test_browsable_api(self):
+        """
+        The browsable API is rendered for each request.
+        """
+        self.client.get(self.url, {'format': 'api'})
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'format': 'api'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_file_cache(self):
+        """
+        Any Django cache backend can hold the responses.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with override_settings(
+                CACHES={
+                    'default': {
+                        'BACKEND':
+                            'django.core.cache.backends.locmem.LocMemCache',
+                    },
+                    'catalog': {
+                        'BACKEND': 'django.core.cache.backends.filebased.'
+                                   'FileBasedCache',
+                        'LOCATION': directory.name,
+                    },
+                },
+                CATALOG_CACHE={'ENABLED': True, 'CACHE': 'catalog'}):
+            self.client.get(self.url)
+            with self.assertNumQueries(0):
+                response = self.client.get(self.url)
+            self.assertEqual(response.data['results'][0]['content'],
+                             'question 1')
+            self.answer.save()
+            with self.assertNumQueries(3):
+                self.client.get(self.url)
@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase, override_settings
+from vp_app.checks import check_shared_caches
+
+
+LOCAL = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+SHARED = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/tmp/vp_app_cache',
+    }
+}
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def get_errors(self):
+        return sorted(
+            (error.id, error.msg.split()[0])
+            for error in check_shared_caches(None)
+        )
+
+    @override_settings(CACHES=LOCAL)
+    def test_local_cache(self):
+        """
+        Local-memory caches are refused for state that processes share.
+        """
+        self.assertEqual(self.get_errors(), [
+            ('vp_app.E001', 'SIGNED_ACCESS_TOKENS'),
+            ('vp_app.E002', 'QUESTION_METADATA_CACHE'),
+            ('vp_app.E002', 'RESULTS_SINGLE_FLIGHT'),
+            ('vp_app.E002', 'TOKEN_AUTHENTICATION_CACHE'),
+        ])
+
+    @override_settings(CACHES=SHARED)
+    def test_shared_cache(self):
+        """
+        Shared cache backends pass.
+        """
+        self.assertEqual(self.get_errors(), [])
+
+    @override_settings(
+        CACHES=SHARED,
+        SIGNED_ACCESS_TOKENS={'ENABLED': True, 'CACHE': 'revocations'}
+    )
+    def test_missing_cache(self):
+        """
+        Caches named in the settings must be configured.
+        """
+        self.assertEqual(self.get_errors(), [
+            ('vp_app.E001', 'SIGNED_ACCESS_TOKENS'),
+        ])
+
+    @override_settings(CACHES=LOCAL, SIGNED_ACCESS_TOKENS={'ENABLED': False})
+    def test_disabled_access_tokens(self):
+        """
+        Revocations need no shared cache when access tokens are off.
+        """
+        self.assertNotIn('vp_app.E001',
+                         [error_id for error_id, _ in self.get_errors()])
@@ -0,0 +1,174 @@
+from datetime import timedelta
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from vp_app.conclusion import (
+    finalize_question,
+    finalize_questions,
+    rebuild_scores
+)
+from vp_app.leaderboard import rebuild_buckets
+from vp_app.models import Question, Answer, Reply, Score, ScoreBucket
+
+
+date = timezone.now() - timedelta(days=2)
+
+
+class FinalizeQuestionTests(APITestCase):
+
+    def setUp(self) -> None:
+        question = Question.objects.create(
+            content='question 1',
+            date_published=date,
+            date_concluded=(date + timedelta(days=1))
+        )
+        for number in range(1, 4):
+            Answer.objects.create(
+                content=f'answer {number}',
+                question=question
+            )
+
+        # Question 2 concludes in the future
+        Question.objects.create(
+            content='question 2',
+            date_published=date,
+            date_concluded=(date + timedelta(days=3))
+        )
+        for number in range(1, 5):
+            User.objects.create_user(username=f'test_user_{number}')
+
+    def reply(self, user_id, vote_id, prediction_id=None):
+        Reply.objects.create(
+            question=Question.objects.get(id=1),
+            user=User.objects.get(id=user_id),
+            vote=Answer.objects.get(id=vote_id),
+            prediction=Answer.objects.get(id=prediction_id or vote_id)
+        )
+
+    def get_scores(self):
+        return {
+            score.user_id: (score.total_replies, score.correct_predictions)
+            for score in Score.objects.all()
+        }
+
+    def test_winning_answer(self):
+        """
+        The Answer with the most votes wins.
+        """
+        self.reply(1, 1)
+        self.reply(2, 2)
+        self.reply(3, 2)
+        self.assertEqual(finalize_questions(), [Question.objects.get(id=1)])
+        self.assertEqual(Question.objects.get(id=1).winning_answer_id, 2)
+        self.assertIsNone(Question.objects.get(id=2).date_finalized)
+
+    def test_tie_goes_to_first_answer(self):
+        """
+        When Answers tie for the most votes, the first Answer wins.
+        """
+        self.reply(1, 3)
+        self.reply(2, 2)
+        self.reply(3, 3)
+        self.reply(4, 2)
+        finalize_questions()
+        self.assertEqual(Question.objects.get(id=1).winning_answer_id, 2)
+
+    def test_no_votes(self):
+        """
+        A Question without votes has no winning Answer.
+        """
+        finalize_questions()
+        question = Question.objects.get(id=1)
+        self.assertIsNotNone(question.date_finalized)
+        self.assertIsNone(question.winning_answer)
+
+    def test_finalize_once(self):
+        """
+        A Question is only finalized once.
+        """
+        question = Question.objects.get(id=1)
+        self.assertTrue(finalize_question(question))
+        self.assertFalse(finalize_question(Question.objects.get(id=1)))
+        self.assertEqual(finalize_questions(), [])
+
+    def test_scores(self):
+        """
+        Finalizing a Question adds its Replies to its Users' Scores,
+        exactly once.
+        """
+        self.reply(1, 1, 2)
+        self.reply(2, 2, 1)
+        self.reply(3, 2, 2)
+        Score.objects.create(user_id=3, total_replies=4, correct_predictions=1)
+        finalize_questions()
+        finalize_questions()
+        self.assertEqual(
+            self.get_scores(),
+            {1: (1, 1), 2: (1, 0), 3: (5, 2)}
+        )
+
+    def test_rebuild_scores(self):
+        """
+        Scores can be rebuilt from the Replies to finalized Questions.
+        """
+        self.reply(1, 1, 2)
+        self.reply(2, 2, 1)
+        finalize_questions()
+        expected = self.get_scores()
+        Score.objects.filter(user=1).update(total_replies=10)
+        rebuild_scores()
+        self.assertEqual(self.get_scores(), expected)
+
+    def test_reopened_question(self):
+        """
+        Moving the conclusion of a finalized Question into the future
+        takes its Replies back out of the Scores. Replies made while it
+        is open again are scored once it concludes again.
+        """
+        self.reply(1, 1, 2)
+        self.reply(2, 2, 2)
+        finalize_questions()
+        question = Question.objects.get(id=1)
+        question.date_concluded = timezone.now() + timedelta(days=1)
+        question.save()
+        question = Question.objects.get(id=1)
+        self.assertIsNone(question.date_finalized)
+        self.assertIsNone(question.winning_answer)
+        self.assertEqual(self.get_scores(), {})
+        self.assertEqual(finalize_questions(), [])
+
+        self.reply(3, 1, 1)
+        self.reply(4, 1, 1)
+        question.date_concluded = timezone.now() - timedelta(minutes=1)
+        question.save()
+        self.assertEqual(finalize_questions(), [question])
+        self.assertEqual(Question.objects.get(id=1).winning_answer_id, 1)
+        self.assertEqual(
+            self.get_scores(),
+            {1: (1, 0), 2: (1, 0), 3: (1, 1), 4: (1, 1)}
+        )
+        buckets = set(ScoreBucket.objects.filter(users__gt=0)
+                      .values_list('location', 'correct_predictions',
+                                   'users'))
+        rebuild_buckets()
+        self.assertEqual(
+            set(ScoreBucket.objects.values_list(
+                'location', 'correct_predictions', 'users'
+            )),
+            buckets
+        )
+
+    def test_stale_instance(self):
+        """
+        Saving a Question loaded before it was finalized keeps its
+        finalization.
+        """
+        self.reply(1, 1)
+        question = Question.objects.get(id=1)
+        finalize_questions()
+        question.content = 'question 1, edited'
+        question.save()
+        question = Question.objects.get(id=1)
+        self.assertIsNotNone(question.date_finalized)
+        self.assertEqual(question.winning_answer_id, 1)
+        self.assertEqual(self.get_scores(), {1: (1, 1)})
@@ -0,0 +1,142 @@
+from datetime import timedelta
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from vp_app.models import Question, Answer, Reply
+
+
+date = timezone.now() - timedelta(days=2)
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self) -> None:
+        self.question = Question.objects.create(
+            content='question 1',
+            date_published=date,
+            date_concluded=(date + timedelta(days=1))
+        )
+        self.answer = Answer.objects.create(
+            content='answer 1',
+            question=self.question
+        )
+        self.user = User.objects.create_user(username='test_user')
+
+    def assertNotModified(self, url, queries, **headers):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        return response
+
+    def test_question_list(self):
+        """
+        The question list is validated with a weak ETag, answered with a
+        304 after a single query.
+        """
+        url = reverse('question-list')
+        etag = self.client.get(url)['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        response = self.assertNotModified(url, 1, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response['ETag'], etag)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_question_list_changes(self):
+        """
+        Adding, changing or deleting a Question, or changing one of its
+        Answers, changes the question list's ETag.
+        """
+        url = reverse('question-list')
+        etags = [self.client.get(url)['ETag']]
+        question = Question.objects.create(content='question 2')
+        etags.append(self.client.get(url)['ETag'])
+        self.answer.content = 'answer one'
+        self.answer.save()
+        etags.append(self.client.get(url)['ETag'])
+        question.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(response.status_code, 200)
+        etags.append(response['ETag'])
+        self.assertEqual(len(set(etags)), 4)
+
+    def test_representations(self):
+        """
+        Each page and media type has its own ETag.
+        """
+        url = reverse('question-list')
+        etags = {
+            self.client.get(url)['ETag'],
+            self.client.get(url, {'expand': 'answers'})['ETag'],
+            self.client.get(url, {'format': 'api'})['ETag'],
+        }
+        self.assertEqual(len(etags), 3)
+
+    def test_question_detail(self):
+        """
+        Question details also send Last-Modified, which moves when an
+        Answer is added.
+        """
+        url = reverse('question-detail', args=[self.question.id])
+        response = self.client.get(url)
+        last_modified = response['Last-Modified']
+        self.assertNotModified(url, 1, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertNotModified(url, 1, HTTP_IF_MODIFIED_SINCE=last_modified)
+        Answer.objects.create(content='answer 2', question=self.question)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['answers']), 2)
+
+    @override_settings(CATALOG_CACHE={'ENABLED': True})
+    def test_catalog_cache(self):
+        """
+        With the catalog cache enabled, the validators are computed once
+        per catalog generation.
+        """
+        url = reverse('question-list')
+        etag = self.client.get(url)['ETag']
+        self.assertNotModified(url, 0, HTTP_IF_NONE_MATCH=etag)
+        self.answer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_missing_question(self):
+        """
+        Missing Questions are still a 404.
+        """
+        url = reverse('question-detail', args=[100])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 404)
+
+    def test_reply_list(self):
+        """
+        Each User's reply list has its own ETag, which changes with
+        their Replies.
+        """
+        url = reverse('reply-list')
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(url)['ETag']
+        self.assertNotModified(url, 1, HTTP_IF_NONE_MATCH=etag)
+        Reply.objects.create(
+            question=self.question,
+            user=self.user,
+            vote=self.answer,
+            prediction=self.answer
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_results(self):
+        """
+        Frozen results send their snapshot's ETag and creation date.
+        """
+        url = reverse('question-results', args=[self.question.id])
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        self.assertNotModified(
+            url,
+            1,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
@@ -0,0 +1,129 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Count
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase
+from rest_framework.test import APITestCase
+from users.models import Profile
+from vp_app.models import Question, Answer, Reply, Score
+from vp_app.tallies import rebuild_tallies
+
+
+class GenerateDatasetTests(APITestCase):
+
+    def generate(self, *args):
+        call_command(
+            'generate_dataset',
+            '--users', '30',
+            '--questions', '4',
+            '--answers', '3',
+            '--replies', '100',
+            '--concluded', '0.5',
+            *args,
+            stdout=StringIO()
+        )
+
+    def get_votes(self):
+        return list(Reply.objects.order_by('id').values_list(
+            'user', 'question', 'vote', 'prediction'
+        ))
+
+    def test_generate_dataset(self):
+        """
+        The requested numbers of rows are created, with one Reply per
+        User per Question, correct tallies and scores for the
+        concluded Questions.
+        """
+        self.generate()
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Profile.objects.count(), 30)
+        self.assertEqual(Question.objects.count(), 4)
+        self.assertEqual(Answer.objects.count(), 12)
+        self.assertEqual(Reply.objects.count(), 100)
+        self.assertFalse(
+            Reply.objects.values('user', 'question')
+            .annotate(count=Count('id'))
+            .filter(count__gt=1)
+            .exists()
+        )
+        self.assertEqual(rebuild_tallies(commit=False), [])
+        self.assertEqual(
+            Question.objects.filter(date_finalized__isnull=False).count(),
+            2
+        )
+        self.assertEqual(
+            sum(Score.objects.values_list('total_replies', flat=True)),
+            50
+        )
+
+    def test_deterministic(self):
+        """
+        The same seed generates the same dataset.
+        """
+        self.generate('--seed', '7')
+        votes = self.get_votes()
+        locations = list(Profile.objects.order_by('user')
+                         .values_list('location', flat=True))
+        Reply.objects.all().delete()
+        Question.objects.all().delete()
+        User.objects.all().delete()
+        self.generate('--seed', '7')
+        self.assertEqual(self.get_votes(), votes)
+        self.assertEqual(
+            list(Profile.objects.order_by('user')
+                 .values_list('location', flat=True)),
+            locations
+        )
+
+    def test_later_rows(self):
+        """
+        Rows created after the dataset are assigned new ids.
+        """
+        self.generate()
+        for model in [User, Question, Answer]:
+            last_id = model.objects.order_by('id').last().id
+            if model is Answer:
+                row = Answer.objects.create(
+                    content='answer',
+                    question=Question.objects.first()
+                )
+            else:
+                row = model.objects.create()
+            self.assertGreater(row.id, last_id)
+
+    def test_too_many_replies(self):
+        """
+        Users cannot reply more than once per Question.
+        """
+        with self.assertRaises(CommandError):
+            call_command(
+                'generate_dataset',
+                '--users', '2',
+                '--questions', '1',
+                '--replies', '3',
+                stdout=StringIO()
+            )
+
+
+class GenerateDatasetCommitTests(TransactionTestCase):
+
+    def test_invalidate_after_commit(self):
+        """
+        Cached catalog responses and metadata are invalidated again
+        once the dataset is committed, so that rows a request cached
+        during generation are not served.
+        """
+        calls = []
+        module = 'vp_app.management.commands.generate_dataset'
+        for name in ['bump_generation', 'question_cache']:
+            patcher = mock.patch(f'{module}.{name}')
+            stub = patcher.start()
+            self.addCleanup(patcher.stop)
+            stub.side_effect = stub.invalidate.side_effect = \
+                lambda *args: calls.append(connection.in_atomic_block)
+        call_command('generate_dataset', '--users', '3', '--questions', '2',
+                     stdout=StringIO())
+        self.assertEqual(calls, [True, True, False, False])
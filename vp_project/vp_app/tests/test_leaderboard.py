@@ -0,0 +1,155 @@
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from users.models import Profile
+from vp_app.conclusion import finalize_questions
+from vp_app.models import Question, Answer, Reply, ScoreBucket
+
+
+date = timezone.now() - timedelta(days=2)
+
+
+class LeaderboardTests(APITestCase):
+    url = reverse('leaderboard')
+    url_florida = reverse('location-leaderboard', args=['florida'])
+
+    def setUp(self) -> None:
+        users = []
+        for number, location in enumerate(
+                ['florida', 'florida', 'colorado', 'colorado'], 1):
+            user = User.objects.create_user(username=f'test_user_{number}')
+            Profile.objects.create(user=user, location=location)
+            users.append(user)
+
+        # In each Question, the first answer wins. Predictions are
+        # listed per User.
+        for number, predictions in enumerate([
+            [0, 0, 1, 0],
+            [0, 1, 1, 0],
+        ], 1):
+            question = Question.objects.create(
+                content=f'question {number}',
+                date_published=date,
+                date_concluded=(date + timedelta(days=1))
+            )
+            answers = [
+                Answer.objects.create(content='yes', question=question),
+                Answer.objects.create(content='no', question=question),
+            ]
+            for user, prediction in zip(users, predictions):
+                Reply.objects.create(
+                    question=question,
+                    user=user,
+                    vote=answers[0],
+                    prediction=answers[prediction]
+                )
+
+        # Scores are kept by the 'conclude_questions' job.
+        finalize_questions()
+
+    def get_leaders(self, response):
+        return [
+            (leader['rank'], leader['username'],
+             leader['correct_predictions'])
+            for leader in response.data['leaders']
+        ]
+
+    def test_national_leaderboard(self):
+        """
+        Users are ranked by correct predictions. Tied Users share a
+        rank.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['location'], None)
+        self.assertEqual(self.get_leaders(response), [
+            (1, 'test_user_1', 2),
+            (1, 'test_user_4', 2),
+            (3, 'test_user_2', 1),
+            (4, 'test_user_3', 0),
+        ])
+        self.assertIsNone(response.data['user'])
+
+    def test_limit(self):
+        """
+        The number of leaders can be limited.
+        """
+        response = self.client.get(self.url, {'limit': 3})
+        self.assertEqual(len(response.data['leaders']), 3)
+
+    def test_location_leaderboard(self):
+        """
+        Users can be ranked within a single location.
+        """
+        response = self.client.get(self.url_florida)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_leaders(response), [
+            (1, 'test_user_1', 2),
+            (2, 'test_user_2', 1),
+        ])
+
+    def test_invalid_location(self):
+        """
+        Leaderboards only exist for known locations.
+        """
+        response = self.client.get(
+            reverse('location-leaderboard', args=['atlantis'])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_user_rank(self):
+        """
+        Authenticated Users see their own rank, nationally and in their
+        own location.
+        """
+        self.client.force_authenticate(User.objects.get(id=2))
+        response = self.client.get(self.url, {'limit': 1})
+        self.assertEqual(response.data['user']['rank'], 3)
+        response = self.client.get(self.url_florida)
+        self.assertEqual(response.data['user']['rank'], 2)
+        response = self.client.get(
+            reverse('location-leaderboard', args=['colorado'])
+        )
+        self.assertIsNone(response.data['user'])
+
+    def test_rank_query_count(self):
+        """
+        Ranking a User does not depend on the number of Users.
+        """
+        self.client.force_authenticate(User.objects.get(id=2))
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    def test_relocation(self):
+        """
+        Users who change location move to the new location's
+        leaderboard.
+        """
+        self.client.get(self.url)
+        profile = Profile.objects.get(user=4)
+        profile.location = 'florida'
+        profile.save()
+        response = self.client.get(self.url_florida)
+        self.assertEqual(self.get_leaders(response), [
+            (1, 'test_user_1', 2),
+            (1, 'test_user_4', 2),
+            (3, 'test_user_2', 1),
+        ])
+        self.assertEqual(
+            ScoreBucket.objects.get(
+                location='colorado', correct_predictions=2
+            ).users,
+            0
+        )
+
+    def test_deleted_user(self):
+        """
+        Deleted Users are no longer counted when ranking.
+        """
+        self.client.get(self.url)
+        User.objects.get(id=1).delete()
+        self.client.force_authenticate(User.objects.get(id=2))
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['user']['rank'], 2)
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from vp_app.metrics import Histogram, reset_metrics
+from vp_app.models import Question, Answer
+
+
+date = timezone.now()
+
+
+class MetricsTests(APITestCase):
+    url = reverse('metrics')
+
+    def setUp(self) -> None:
+        question = Question.objects.create(
+            content='question 1',
+            date_published=date,
+            date_concluded=(date + timedelta(days=1))
+        )
+        Answer.objects.create(content='answer 1', question=question)
+        self.staff = User.objects.create_user(
+            username='test_staff',
+            is_staff=True
+        )
+        self.user = User.objects.create_user(username='test_user')
+        reset_metrics()
+
+    def get_metrics(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        return dict(
+            line.rsplit(' ', 1)
+            for line in response.content.decode().splitlines()
+            if not line.startswith('#')
+        )
+
+    def test_request_metrics(self):
+        """
+        Each request's wall time, queries, database and serializer time
+        and response size are recorded under its URL name.
+        """
+        response = self.client.get(reverse('question-list'))
+        self.client.get(reverse('question-list'))
+        samples = self.get_metrics()
+        labels = '{view="question-list",method="GET"}'
+        self.assertEqual(
+            samples[f'vp_request_duration_seconds_count{labels}'], '2'
+        )
+        self.assertEqual(samples[f'vp_request_queries_sum{labels}'], '6')
+        self.assertEqual(
+            samples['vp_request_queries_bucket'
+                    '{view="question-list",method="GET",le="2"}'], '0'
+        )
+        self.assertEqual(
+            samples['vp_request_queries_bucket'
+                    '{view="question-list",method="GET",le="3"}'], '2'
+        )
+        self.assertGreater(
+            float(samples[f'vp_request_db_duration_seconds_sum{labels}']),
+            0
+        )
+        self.assertGreater(float(samples[
+            f'vp_request_serializer_duration_seconds_sum{labels}'
+        ]), 0)
+        self.assertEqual(
+            samples[f'vp_response_bytes_sum{labels}'],
+            str(2 * len(response.content))
+        )
+
+    def test_staff_only(self):
+        """
+        Only staff may read the metrics.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(PERFORMANCE_METRICS={'SERVER_TIMING': True})
+    def test_server_timing(self):
+        """
+        The Server-Timing header can be turned on.
+        """
+        response = self.client.get(reverse('question-list'))
+        timings = [entry.split(';')[0]
+                   for entry in response['Server-Timing'].split(', ')]
+        self.assertEqual(timings, ['db', 'serializer', 'total'])
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
+
+    def test_no_server_timing(self):
+        """
+        The Server-Timing header is off by default outside DEBUG.
+        """
+        response = self.client.get(reverse('question-list'))
+        self.assertNotIn('Server-Timing', response)
+
+
+class HistogramTests(APITestCase):
+    def test_render(self):
+        """
+        Buckets are cumulative, and include a '+Inf' bucket.
+        """
+        histogram = Histogram('test_seconds', 'Test.', (0.1, 1))
+        for value in [0.05, 0.5, 0.5, 5]:
+            histogram.observe(('record',), value)
+        self.assertEqual(histogram.render(['view']), [
+            '# HELP test_seconds Test.',
+            '# TYPE test_seconds histogram',
+            'test_seconds_bucket{view="record",le="0.1"} 1',
+            'test_seconds_bucket{view="record",le="1"} 3',
+            'test_seconds_bucket{view="record",le="+Inf"} 4',
+            'test_seconds_sum{view="record"} 6.05',
+            'test_seconds_count{view="record"} 4',
+        ])
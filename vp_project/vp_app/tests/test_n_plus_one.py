@@ -0,0 +1,93 @@
+from datetime import timedelta
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, APITestCase
+from vp_app.middleware import NPlusOneError, NPlusOneMiddleware
+from vp_app.models import Question
+
+
+date = timezone.now()
+
+
+def load_questions(request):
+    """
+    A view that loads each Question separately.
+    """
+    for question_id in range(1, 8):
+        Question.objects.filter(id=question_id).first()
+    return HttpResponse()
+
+
+def load_questions_once(request):
+    list(Question.objects.filter(id__in=range(1, 8)))
+    return HttpResponse()
+
+
+class NPlusOneMiddlewareTests(APITestCase):
+    def setUp(self) -> None:
+        for number in range(1, 8):
+            Question.objects.create(
+                content=f'question {number}',
+                date_published=date,
+                date_concluded=(date + timedelta(days=1))
+            )
+        self.request = APIRequestFactory().get('/questions/')
+
+    def test_raises(self):
+        """
+        With 'RAISE' on, as in the test settings, a request that repeats
+        a query shape more than the threshold raises an error naming the
+        shape and the code that ran it.
+        """
+        middleware = NPlusOneMiddleware(load_questions)
+        with self.assertLogs('vp_app.middleware', 'WARNING'):
+            with self.assertRaises(NPlusOneError) as error:
+                middleware(self.request)
+        message = str(error.exception)
+        self.assertIn('ran 7 queries of the shape', message)
+        self.assertIn('WHERE "vp_app_question"."id" = ?', message)
+        self.assertIn('in load_questions', message)
+
+    def test_single_query(self):
+        """
+        Requests that do not repeat queries pass through.
+        """
+        middleware = NPlusOneMiddleware(load_questions_once)
+        response = middleware(self.request)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-N-Plus-One', response)
+
+    @override_settings(N_PLUS_ONE_DETECTION={
+        'ENABLED': True,
+        'THRESHOLD': 7,
+        'RAISE': True
+    })
+    def test_threshold(self):
+        """
+        A shape may run up to 'THRESHOLD' times.
+        """
+        middleware = NPlusOneMiddleware(load_questions)
+        response = middleware(self.request)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(DEBUG=True, N_PLUS_ONE_DETECTION={})
+    def test_debug_header(self):
+        """
+        By default, detection is on in DEBUG, and findings are logged and
+        listed in a response header.
+        """
+        middleware = NPlusOneMiddleware(load_questions)
+        with self.assertLogs('vp_app.middleware', 'WARNING') as logs:
+            response = middleware(self.request)
+        self.assertTrue(response['X-N-Plus-One'].startswith('7x SELECT'))
+        self.assertIn('in load_questions', logs.output[0])
+
+    @override_settings(N_PLUS_ONE_DETECTION={'ENABLED': False})
+    def test_disabled(self):
+        """
+        Detection can be turned off.
+        """
+        with self.assertRaises(MiddlewareNotUsed):
+            NPlusOneMiddleware(load_questions)
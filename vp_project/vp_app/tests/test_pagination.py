@@ -0,0 +1,65 @@
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from vp_app.models import Question, Answer
+
+
+date = timezone.now()
+
+
+class CursorPaginationTests(APITestCase):
+    url = reverse('answer-list')
+
+    def setUp(self) -> None:
+        question = Question.objects.create(
+            content='question 1',
+            date_published=date,
+            date_concluded=(date + timedelta(days=1))
+        )
+        for number in range(1, 6):
+            Answer.objects.create(
+                content=f'answer {number}',
+                question=question
+            )
+
+    def test_walk_pages(self):
+        """
+        Following the 'next' links visits every Answer once, in order,
+        without counting the table.
+        """
+        ids = []
+        url = self.url + '?page_size=2'
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(response.data['results']), 2)
+                ids += [answer['id'] for answer in response.data['results']]
+                url = response.data['next']
+        self.assertEqual(ids, [1, 2, 3, 4, 5])
+        self.assertEqual(len(queries), 3)
+        for query in queries:
+            self.assertNotIn('COUNT(', query['sql'])
+
+    def test_previous_page(self):
+        """
+        Pages link back to the previous page.
+        """
+        response = self.client.get(self.url, {'page_size': 2})
+        response = self.client.get(response.data['next'])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual(
+            [answer['id'] for answer in response.data['results']],
+            [1, 2]
+        )
+        self.assertIsNone(response.data['previous'])
+
+    def test_invalid_cursor(self):
+        """
+        Cursors that were not issued by the API are rejected.
+        """
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
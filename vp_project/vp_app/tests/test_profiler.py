@@ -0,0 +1,95 @@
+import threading
+from django.http import HttpResponse
+from django.urls import resolve, reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIRequestFactory, APITestCase
+from vp_app import profiler
+from vp_app.middleware import ProfilerMiddleware
+
+
+def busy_serializing(stop):
+    """
+    Stand in for a request thread doing work until 'stop' is set.
+    """
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class ProfilerTests(APITestCase):
+    url = reverse('profiler')
+
+    def setUp(self) -> None:
+        self.staff = User.objects.create_user(
+            username='test_staff',
+            is_staff=True
+        )
+        self.user = User.objects.create_user(username='test_user')
+
+    def test_collapsed_stacks(self):
+        """
+        Staff receive the sampled stacks of other request threads, in
+        the collapsed format, each starting with its view's URL name.
+        """
+        stop = threading.Event()
+        thread = threading.Thread(target=busy_serializing, args=[stop])
+        thread.start()
+        profiler.request_views[thread.ident] = 'record'
+        try:
+            self.client.force_authenticate(self.staff)
+            response = self.client.get(
+                self.url, {'seconds': 0.1, 'interval': 0.005}
+            )
+        finally:
+            stop.set()
+            thread.join()
+            profiler.request_views.pop(thread.ident, None)
+
+        self.assertEqual(response.status_code, 200)
+        lines = response.content.decode().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(stack.startswith('record;'))
+            self.assertGreater(int(count), 0)
+        self.assertTrue(any(
+            'test_profiler:busy_serializing' in line
+            for line in lines
+        ))
+
+    def test_staff_only(self):
+        """
+        Only staff may run the profiler.
+        """
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, {'seconds': 0})
+        self.assertEqual(response.status_code, 403)
+
+    def test_one_session(self):
+        """
+        Only one profiling session runs at a time.
+        """
+        self.client.force_authenticate(self.staff)
+        with profiler.session_lock:
+            response = self.client.get(self.url, {'seconds': 0})
+        self.assertEqual(response.status_code, 409)
+        response = self.client.get(self.url, {'seconds': 0})
+        self.assertEqual(response.status_code, 200)
+
+    def test_middleware(self):
+        """
+        The middleware records the view each request thread runs, once
+        its URL is resolved, and forgets the thread afterwards.
+        """
+        seen = []
+
+        def view(request):
+            seen.append(profiler.request_views[threading.get_ident()])
+            request.resolver_match = resolve(reverse('record'))
+            middleware.process_view(request, view, [], {})
+            seen.append(profiler.request_views[threading.get_ident()])
+            return HttpResponse()
+
+        middleware = ProfilerMiddleware(view)
+        middleware(APIRequestFactory().get(reverse('record')))
+        self.assertEqual(seen, ['unmatched', 'record'])
+        self.assertNotIn(threading.get_ident(), profiler.request_views)
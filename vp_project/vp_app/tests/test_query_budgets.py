@@ -0,0 +1,271 @@
+import inspect
+from datetime import timedelta
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient, APITestCase
+from rest_framework.views import APIView
+from users import views as users_views
+from users.models import Profile
+from vp_app import views as vp_app_views
+from vp_app.models import Question, Answer, Reply
+from vp_app.querylog import data_queries, repeated_shapes
+
+
+date = timezone.now()
+date_yesterday = date - timedelta(days=1)
+date_two_days_ago = date - timedelta(days=2)
+date_tomorrow = date + timedelta(days=1)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def get_views():
+    """
+    Get every API view defined in 'vp_app.views' and 'users.views',
+    mapped by name to the view class. Function-based views are mapped
+    to the class that '@api_view' wraps them in.
+    """
+    found = {}
+    for module in [vp_app_views, users_views]:
+        for name, view in vars(module).items():
+            if inspect.isclass(view) and issubclass(view, APIView) \
+                    and view.__module__ == module.__name__:
+                found[name] = view
+            elif inspect.isfunction(view) and hasattr(view, 'cls') \
+                    and view.__module__ == module.__name__:
+                found[name] = view.cls
+    return found
+
+
+class QueryBudgetTests(APITestCase):
+    """
+    Every view declares a 'query_budget': the most queries it may make
+    per request. Each request below is made against a small dataset and
+    again against a larger one. It must make the same number of queries
+    both times, and no more than its view's budget. Transaction
+    statements (savepoints) are not counted.
+    """
+    sizes = [2, 5]
+
+    def setUp(self) -> None:
+        self.questions = []
+        self.users = []
+        self.user = self.add_user('budget_user')
+        self.user.set_password('budget-password')
+        self.user.save()
+        self.staff = User.objects.create_user(
+            username='budget_staff',
+            is_staff=True
+        )
+        # A User who never replies, so that it can always create one.
+        self.new_user = self.add_user('budget_new_user')
+
+    def add_user(self, username, location='florida'):
+        user = User.objects.create_user(username=username)
+        Profile.objects.create(user=user, location=location)
+        return user
+
+    def grow(self, size):
+        """
+        Grow the dataset to 'size' Questions, alternating concluded and
+        open, each with 'size' Answers and a Reply from each of 'size'
+        Users spread over two locations.
+        """
+        while len(self.users) < size - 1:
+            number = len(self.users)
+            self.users.append(self.add_user(
+                f'budget_user_{number}',
+                ['florida', 'colorado'][number % 2]
+            ))
+        users = [self.user] + self.users
+        while len(self.questions) < size:
+            concluded = len(self.questions) % 2 == 0
+            self.questions.append(Question.objects.create(
+                content=f'question {len(self.questions)}',
+                date_published=date_two_days_ago,
+                date_concluded=date_yesterday if concluded
+                else date_tomorrow
+            ))
+        for question in self.questions:
+            answers = list(question.answers.order_by('id'))
+            for number in range(len(answers), size):
+                answers.append(Answer.objects.create(
+                    content=f'answer {number}',
+                    question=question
+                ))
+            replied = set(question.replies.values_list('user', flat=True))
+            for number, user in enumerate(users):
+                if user.id not in replied:
+                    Reply.objects.create(
+                        user=user,
+                        question=question,
+                        vote=answers[number % size],
+                        prediction=answers[(number + 1) % size]
+                    )
+
+    def get_requests(self):
+        """
+        Map each view's name to the requests made of it, as
+        '(method, url, user, data)' tuples.
+        """
+        concluded, open_question = self.questions[:2]
+        answer = open_question.answers.order_by('id').first()
+        reply = {'vote': answer.id, 'prediction': answer.id}
+        return {
+            'root_index': [
+                ('GET', reverse('root-index'), None, None),
+            ],
+            'QuestionList': [
+                ('GET', reverse('question-list'), None, None),
+                ('GET', reverse('question-list') + '?expand=answers',
+                 None, None),
+            ],
+            'QuestionDetail': [
+                ('GET', reverse('question-detail', args=[concluded.id]),
+                 None, None),
+            ],
+            'QuestionAnswers': [
+                ('GET', reverse('question-answers', args=[concluded.id]),
+                 None, None),
+            ],
+            'AnswerList': [
+                ('GET', reverse('answer-list'), None, None),
+            ],
+            'AnswerDetail': [
+                ('GET', reverse('answer-detail', args=[answer.id]),
+                 None, None),
+            ],
+            'QuestionReply': [
+                ('GET', reverse('question-reply', args=[open_question.id]),
+                 self.user, None),
+                ('POST', reverse('question-reply', args=[open_question.id]),
+                 self.new_user, reply),
+                ('PUT', reverse('question-reply', args=[open_question.id]),
+                 self.user, reply),
+                ('DELETE',
+                 reverse('question-reply', args=[open_question.id]),
+                 self.user, None),
+            ],
+            'ReplyList': [
+                ('GET', reverse('reply-list'), self.user, None),
+            ],
+            'QuestionResults': [
+                ('GET', reverse('question-results', args=[concluded.id]),
+                 None, None),
+                ('GET',
+                 reverse('question-results', args=[open_question.id]),
+                 self.staff, None),
+            ],
+            'UserRecord': [
+                ('GET', reverse('record'), self.user, None),
+            ],
+            'Leaderboard': [
+                ('GET', reverse('leaderboard'), self.user, None),
+                ('GET', reverse('location-leaderboard', args=['florida']),
+                 self.user, None),
+            ],
+            'Metrics': [
+                ('GET', reverse('metrics'), self.staff, None),
+            ],
+            'Profiler': [
+                ('GET', reverse('profiler') + '?seconds=0', self.staff,
+                 None),
+            ],
+            'UserCreate': [
+                ('POST', reverse('create-user'), None, {
+                    'username': 'budget_created',
+                    'email': 'budget_created@example.com',
+                    'password': 'testpassword123',
+                }),
+            ],
+            'ObtainTokens': [
+                ('POST', '/api-token-auth/', None, {
+                    'username': 'budget_user',
+                    'password': 'budget-password',
+                }),
+            ],
+            'RefreshAccessToken': [
+                ('POST', reverse('api-token-refresh'), self.user, None),
+            ],
+            'ProfileDetail': [
+                ('GET', reverse('profile'), self.user, None),
+                ('PUT', reverse('profile'), self.user,
+                 {'location': 'colorado'}),
+            ],
+        }
+
+    def count_queries(self, method, url, user, data):
+        """
+        Make a request and return the data queries it made. Safe
+        requests are made once beforehand, so that work done only on
+        the first request (such as freezing results) is not counted.
+        Other requests are rolled back afterwards.
+        """
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        request = getattr(client, method.lower())
+        if method in SAFE_METHODS:
+            request(url, data)
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                response = request(url, data, format='json')
+            transaction.set_rollback(True)
+        self.assertLess(response.status_code, 400, response.content)
+        return data_queries(queries.captured_queries)
+
+    def describe(self, queries):
+        return '\n'.join(
+            f'    {count}x {shape}'
+            for count, shape in repeated_shapes(queries)
+        ) or '    (none)'
+
+    def test_views_declare_budgets(self):
+        """
+        Every view declares a query budget and is requested below.
+        """
+        self.grow(self.sizes[0])
+        requests = self.get_requests()
+        for name, view in get_views().items():
+            with self.subTest(view=name):
+                self.assertIsInstance(
+                    getattr(view, 'query_budget', None), int,
+                    f'{name} does not declare a query_budget.'
+                )
+                self.assertIn(name, requests, f'{name} is not requested.')
+
+    def test_query_budgets(self):
+        """
+        No view makes more queries than its budget, or more queries as
+        the data grows.
+        """
+        views = get_views()
+        counts = {}
+        for size in self.sizes:
+            self.grow(size)
+            for name, requests in self.get_requests().items():
+                for method, url, user, data in requests:
+                    counts.setdefault((name, method, url), []).append(
+                        self.count_queries(method, url, user, data)
+                    )
+
+        for (name, method, url), (small, large) in counts.items():
+            budget = views[name].query_budget
+            with self.subTest(view=name, method=method, url=url):
+                self.assertEqual(
+                    len(small), len(large),
+                    f'{name} {method} {url} made {len(small)} queries '
+                    f'with {self.sizes[0]} of everything, and '
+                    f'{len(large)} with {self.sizes[1]}. Repeated '
+                    f'queries with {self.sizes[1]}:\n'
+                    f'{self.describe(large)}'
+                )
+                self.assertLessEqual(
+                    len(large), budget,
+                    f'{name} {method} {url} made {len(large)} queries, '
+                    f'over its budget of {budget}. Repeated queries:\n'
+                    f'{self.describe(large)}'
+                )
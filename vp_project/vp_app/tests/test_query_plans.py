@@ -0,0 +1,114 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from vp_app.models import Reply
+from vp_app.queryplans import sqlite_problems
+
+
+class SQLitePlanTests(APITestCase):
+    def test_full_scan(self):
+        """
+        Full scans of the Reply table are flagged, including scans of
+        a whole index. Scans of other tables are not.
+        """
+        _, problems = sqlite_problems([
+            'SCAN vp_app_reply',
+            'SCAN TABLE vp_app_reply USING COVERING INDEX some_index',
+            'SCAN vp_app_question',
+        ])
+        self.assertEqual(problems, [
+            'full scan of vp_app_reply',
+            'full scan of vp_app_reply',
+        ])
+
+    def test_covering_index(self):
+        """
+        Index searches on the Reply table are flagged unless the index
+        covers the query.
+        """
+        _, problems = sqlite_problems([
+            'SEARCH vp_app_reply USING INDEX reply_user (user_id=?)',
+            'SEARCH vp_app_reply USING COVERING INDEX reply_user '
+            '(user_id=?)',
+            'SEARCH vp_app_reply USING INTEGER PRIMARY KEY (rowid=?)',
+            'SEARCH vp_app_answer USING INDEX answer_question '
+            '(question_id=?)',
+        ])
+        self.assertEqual(problems, [
+            'reply_user does not cover the query on vp_app_reply',
+        ])
+
+    def test_temp_b_tree(self):
+        """
+        Temporary B-trees are flagged on any table.
+        """
+        _, problems = sqlite_problems([
+            'SCAN vp_app_question',
+            'USE TEMP B-TREE FOR ORDER BY',
+        ])
+        self.assertEqual(problems, ['temp b-tree for order by'])
+
+
+class AuditQueryPlansTests(APITestCase):
+    def setUp(self) -> None:
+        call_command(
+            'generate_dataset',
+            users=10,
+            questions=4,
+            seed=1,
+            stdout=StringIO()
+        )
+
+    def test_audit(self):
+        """
+        Every endpoint is requested and reported on, and nothing the
+        requests write is kept.
+        """
+        replies = list(Reply.objects.values_list(
+            'id', 'vote', 'prediction'
+        ).order_by('id'))
+        users = User.objects.count()
+        out = StringIO()
+        call_command('audit_query_plans', verbose_plans=True, stdout=out)
+        output = out.getvalue()
+        for heading in ['question-list: GET /questions/',
+                        'question-reply: PUT /questions/',
+                        'question-results: GET /questions/',
+                        'record: GET /record/',
+                        'api-token-auth/: POST /api-token-auth/',
+                        'create-user: POST /users/',
+                        'profile: GET /profile/']:
+            self.assertIn(heading, output)
+        self.assertIn('SEARCH vp_app_reply', output)
+        self.assertEqual(replies, list(Reply.objects.values_list(
+            'id', 'vote', 'prediction'
+        ).order_by('id')))
+        self.assertEqual(User.objects.count(), users)
+
+    def test_endpoint(self):
+        """
+        The audit can be limited to some endpoints.
+        """
+        out = StringIO()
+        call_command('audit_query_plans', endpoints=['record'],
+                     verbose_plans=True, stdout=out)
+        self.assertIn('record: GET /record/', out.getvalue())
+        self.assertNotIn('profile: GET', out.getvalue())
+
+    def test_check(self):
+        """
+        With '--check', problems are an error.
+        """
+        with self.assertRaises(CommandError):
+            call_command('audit_query_plans', endpoints=['reply-list'],
+                         check=True, stdout=StringIO())
+
+    def test_empty_database(self):
+        """
+        The audit needs data to request.
+        """
+        Reply.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('audit_query_plans', stdout=StringIO())
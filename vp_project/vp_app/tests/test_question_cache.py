@@ -0,0 +1,151 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from vp_app.models import Question, Answer
+from vp_app.querylog import data_queries
+from vp_app.questioncache import QuestionMetadataCache, question_cache
+
+
+date = timezone.now()
+
+
+class QuestionMetadataCacheTests(APITestCase):
+    def setUp(self) -> None:
+        self.question = Question.objects.create(
+            content='question 1',
+            date_published=(date - timedelta(days=1)),
+            date_concluded=(date + timedelta(days=1))
+        )
+        self.answer_1 = Answer.objects.create(
+            content='answer 1',
+            question=self.question
+        )
+        Answer.objects.create(content='answer 2', question=self.question)
+        self.user = User.objects.create_user(username='test_user')
+
+    def test_metadata(self):
+        """
+        The metadata holds the Question's dates and its Answers, and is
+        read once.
+        """
+        cache = QuestionMetadataCache()
+        with self.assertNumQueries(1):
+            metadata = cache.get(self.question.id)
+            self.assertEqual(cache.get(self.question.id), metadata)
+        self.assertEqual(metadata.date_concluded, self.question.date_concluded)
+        self.assertEqual(metadata.answers, (
+            (self.answer_1.id, 'answer 1'),
+            (self.answer_1.id + 1, 'answer 2'),
+        ))
+
+    def test_missing_question(self):
+        """
+        Missing Questions are not cached.
+        """
+        cache = QuestionMetadataCache()
+        with self.assertNumQueries(4):
+            self.assertIsNone(cache.get(99))
+            self.assertIsNone(cache.get(99))
+
+    def test_invalidate_on_save(self):
+        """
+        Saving an Answer discards its Question's metadata.
+        """
+        question_cache.get(self.question.id)
+        self.answer_1.content = 'answer one'
+        self.answer_1.save()
+        with self.assertNumQueries(1):
+            metadata = question_cache.get(self.question.id)
+        self.assertEqual(metadata.answers[0][1], 'answer one')
+
+    def test_invalidate_other_process(self):
+        """
+        Invalidating an entry in one cache discards it from the others
+        sharing the Django cache, as another process's cache would be,
+        and leaves their other entries cached.
+        """
+        question_2 = Question.objects.create(content='question 2')
+        other = QuestionMetadataCache()
+        other.get(self.question.id)
+        other.get(question_2.id)
+        question_cache.invalidate(self.question.id)
+        with self.assertNumQueries(1):
+            other.get(self.question.id)
+        with self.assertNumQueries(0):
+            other.get(question_2.id)
+
+    def test_evicted_versions(self):
+        """
+        An invalidation whose version or generation was evicted from
+        the Django cache still reaches the other processes: a missing
+        one is replaced by a new one, which no cached entry matches.
+        """
+        other = QuestionMetadataCache()
+        other.get(self.question.id)
+        question_cache.invalidate(self.question.id)
+        cache.delete(question_cache.get_version_key(self.question.id))
+        with self.assertNumQueries(1):
+            other.get(self.question.id)
+        question_cache.invalidate()
+        cache.delete(question_cache.generation_key)
+        with self.assertNumQueries(1):
+            other.get(self.question.id)
+        with self.assertNumQueries(0):
+            other.get(self.question.id)
+
+    def test_ttl(self):
+        """
+        Entries expire after 'ttl' seconds.
+        """
+        cache = QuestionMetadataCache(ttl=0)
+        cache.get(self.question.id)
+        with self.assertNumQueries(1):
+            cache.get(self.question.id)
+
+    def test_lru(self):
+        """
+        The least recently used entry is dropped once the cache is full.
+        """
+        question_2 = Question.objects.create(content='question 2')
+        cache = QuestionMetadataCache(max_size=1)
+        cache.get(self.question.id)
+        cache.get(question_2.id)
+        self.assertEqual(list(cache.entries), [question_2.id])
+        with self.assertNumQueries(1):
+            cache.get(self.question.id)
+
+    def test_cached_reply(self):
+        """
+        With the Question cached, creating a Reply makes two
+        statements: the INSERT and the update of the tallies.
+        """
+        self.client.force_authenticate(self.user)
+        url = reverse('question-reply', args=[self.question.id])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, {
+                'vote': self.answer_1.id,
+                'prediction': self.answer_1.id
+            })
+        self.assertEqual(response.status_code, 201)
+        queries = [query['sql'] for query in data_queries(context)]
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(queries[0].startswith('INSERT INTO "vp_app_reply"'))
+
+    def test_missing_question_404(self):
+        """
+        Replies to, and results of, missing Questions are a 404, not an
+        error.
+        """
+        self.client.force_authenticate(self.user)
+        url = reverse('question-reply', args=[99])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.post(url, {'vote': 1, 'prediction': 1})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('question-results', args=[99]))
+        self.assertEqual(response.status_code, 404)
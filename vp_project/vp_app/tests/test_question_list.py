@@ -19,7 +19,7 @@ class QuestionListTests(APITestCase):
         """
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.data['results'], [])
 
     def test_get_questions(self):
         """
@@ -37,7 +37,7 @@ class QuestionListTests(APITestCase):
         )
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, [
+        self.assertEqual(response.data['results'], [
             {
                 'id': 1,
                 'content': 'question 1',
@@ -87,7 +87,7 @@ class QuestionListTests(APITestCase):
         )
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, [
+        self.assertEqual(response.data['results'], [
             {
                 'id': 1,
                 'content': 'question 1',
@@ -147,3 +147,48 @@ class QuestionListTests(APITestCase):
             'date_concluded': '2019-10-20T04:25:00Z',
         })
         self.assertEqual(response.status_code, 401)
+
+    def create_questions(self, count):
+        for number in range(count):
+            question = Question.objects.create(
+                content=f'question {number}',
+                date_published=date,
+                date_concluded=(date + timedelta(days=1))
+            )
+            Answer.objects.create(content='yes', question=question)
+            Answer.objects.create(content='no', question=question)
+
+    def test_expand_answers(self):
+        """
+        Answers can be embedded in each Question with
+        '?expand=answers'.
+        """
+        self.create_questions(1)
+        response = self.client.get(self.url, {'expand': 'answers'})
+        self.assertEqual(response.data['results'][0]['answers'], [
+            {
+                'id': 1,
+                'content': 'yes'
+            },
+            {
+                'id': 2,
+                'content': 'no'
+            }
+        ])
+
+    def test_query_count(self):
+        """
+        Listing Questions, with or without their Answers embedded,
+        takes three queries however many Questions there are: one for
+        the list's version (see 'ConditionalGetMixin'), and two for the
+        page.
+        """
+        self.create_questions(2)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+        self.create_questions(8)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'expand': 'answers'})
+        self.assertEqual(len(response.data['results']), 10)
@@ -3,6 +3,7 @@ from django.urls import reverse
 from django.utils import timezone
 from django.contrib.auth.models import User
 from rest_framework.test import APITestCase
+from vp_app.conclusion import finalize_questions
 from vp_app.models import Question, Answer, Reply
 
 
@@ -161,6 +162,9 @@ class RecordTests(APITestCase):
             prediction=answer_7
         )
 
+        # Scores are kept by the 'conclude_questions' job.
+        finalize_questions()
+
     def test_get_record(self):
         """
         Users can retrieve their own records.
@@ -175,6 +179,32 @@ class RecordTests(APITestCase):
             "correct_predictions": 2
         })
 
+    def test_record_query_count(self):
+        """
+        Records are read with a single query, whether or not the User
+        replied to many Questions.
+        """
+        self.client.force_authenticate(User.objects.get(id=1))
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['correct_predictions'], 2)
+
+    def test_deleted_reply(self):
+        """
+        Replies deleted after their Question concluded no longer count
+        towards the record.
+        """
+        user = User.objects.get(id=2)
+        self.client.force_authenticate(user)
+        self.client.get(self.url)
+        Reply.objects.get(user=user, question=2).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data, {
+            "id": 2,
+            "total_replies": 2,
+            "correct_predictions": 1
+        })
+
     def test_anonymous_get_record(self):
         """
         Anonymous users cannot retrieve records.
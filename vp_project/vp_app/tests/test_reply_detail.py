@@ -1,9 +1,12 @@
 from datetime import timedelta
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from django.contrib.auth.models import User
 from rest_framework.test import APITestCase
 from vp_app.models import Question, Answer, Reply
+from vp_app.querylog import data_queries
 
 
 date = timezone.now() - timedelta(days=1)
@@ -92,6 +95,48 @@ class ReplyDetailTests(APITestCase):
             'prediction': 2
         })
 
+    def test_create_reply_queries(self):
+        """
+        Creating a Reply reads the Question and its Answers once, then
+        inserts the Reply. The only other statement is the update of
+        the Answers' tallies.
+        """
+        user = User.objects.get(id=1)
+        self.client.force_authenticate(user=user)
+        data = {'vote': 1, 'prediction': 2}
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 201)
+        queries = [query['sql'] for query in data_queries(context)]
+        self.assertEqual(len(queries), 3)
+        self.assertTrue(queries[0].startswith('SELECT'))
+        self.assertIn('INNER JOIN "vp_app_question"', queries[0])
+        self.assertTrue(queries[1].startswith('INSERT INTO "vp_app_reply"'))
+        self.assertTrue(queries[2].startswith('UPDATE "vp_app_answertally"'))
+
+    def test_create_reply_invalid_answer(self):
+        """
+        Votes and predictions for another Question's Answers, or for
+        Answers that do not exist, are refused with the same messages
+        as before.
+        """
+        user = User.objects.get(id=1)
+        self.client.force_authenticate(user=user)
+        response = self.client.post(self.url, {'vote': 3, 'prediction': 1})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {
+            'non_field_errors': [
+                'Invalid vote. Choose one of the following: '
+                '[<Answer: answer 1>, <Answer: answer 2>].'
+            ]
+        })
+        response = self.client.post(self.url, {'vote': 1, 'prediction': 99})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {
+            'prediction': ['Invalid pk "99" - object does not exist.']
+        })
+        self.assertEqual(Reply.objects.count(), 0)
+
     def test_anonymous_reply(self):
         """
         Anonymous users cannot create new Replies.
@@ -119,6 +164,36 @@ class ReplyDetailTests(APITestCase):
         data = {'vote': 1, 'prediction': 1}
         response_2 = self.client.post(self.url, data)
         self.assertEqual(response_2.status_code, 400)
+        self.assertEqual(response_2.data, {
+            'non_field_errors': [
+                'Users may submit only one reply per question.'
+            ]
+        })
+        self.assertEqual(Reply.objects.count(), 1)
+        self.assertEqual(Answer.objects.get(id=1).tally.votes, 1)
+
+    def test_duplicate_reply_constraint(self):
+        """
+        The database refuses a second Reply from a User to a Question,
+        so concurrent requests cannot both create one.
+        """
+        user = User.objects.get(id=1)
+        question = Question.objects.get(id=1)
+        answer = Answer.objects.get(id=1)
+        Reply.objects.create(
+            user=user,
+            question=question,
+            vote=answer,
+            prediction=answer
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Reply.objects.create(
+                user=user,
+                question=question,
+                vote=answer,
+                prediction=answer
+            )
+        self.assertEqual(answer.tally.votes, 1)
 
     def test_multiple_users_replies(self):
         """
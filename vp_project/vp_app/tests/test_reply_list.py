@@ -71,7 +71,7 @@ class ReplyListTests(APITestCase):
         self.client.force_authenticate(user=user)
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, [
+        self.assertEqual(response.data['results'], [
             {
                 'id': 1,
                 'user': 1,
@@ -96,7 +96,7 @@ class ReplyListTests(APITestCase):
         self.client.force_authenticate(user=user)
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.data['results'], [])
 
     def test_anonymous_replies(self):
         """
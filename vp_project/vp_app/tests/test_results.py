@@ -5,6 +5,7 @@ from django.contrib.auth.models import User
 from rest_framework.test import APITestCase
 from users.models import Profile
 from vp_app.models import Question, Answer, Reply
+from vp_app.serializers import ResultsSerializer
 
 
 date = timezone.now() - timedelta(days=2)
@@ -228,3 +229,35 @@ class QuestionResultsTests(APITestCase):
             reverse('question-results', args=[3])
         )
         self.assertEqual(response.status_code, 200)
+
+    def test_results_query_count(self):
+        """
+        Results are built from a constant number of queries, no matter
+        how many Replies there are. Locations keep the order of their
+        first Reply.
+        """
+        question = Question.objects.get(id=1)
+        answers = [Answer.objects.get(id=1), Answer.objects.get(id=2)]
+        users = User.objects.order_by('-id')
+        for user in users[:2]:
+            Reply.objects.create(
+                question=question,
+                user=user,
+                vote=answers[0],
+                prediction=answers[1]
+            )
+        with self.assertNumQueries(2):
+            data = ResultsSerializer(question).data
+        self.assertEqual(list(data['locations']), ['colorado'])
+
+        for index, user in enumerate(users[2:]):
+            Reply.objects.create(
+                question=question,
+                user=user,
+                vote=answers[index % 2],
+                prediction=answers[0]
+            )
+        with self.assertNumQueries(2):
+            data = ResultsSerializer(question).data
+        self.assertEqual(data['total_votes'], 7)
+        self.assertEqual(list(data['locations']), ['colorado', 'florida'])
@@ -0,0 +1,191 @@
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from users.models import Profile
+from vp_app.models import Question, Answer, Reply, ResultsSnapshot
+
+
+date = timezone.now() - timedelta(days=2)
+
+
+class ResultsSnapshotTests(APITestCase):
+    url = reverse('question-results', args=[1])
+
+    def setUp(self) -> None:
+        question_1 = Question.objects.create(
+            content='question 1',
+            date_published=date,
+            date_concluded=(date + timedelta(days=1))
+        )
+        answer_1 = Answer.objects.create(
+            content='answer 1',
+            question=question_1
+        )
+        answer_2 = Answer.objects.create(
+            content='answer 2',
+            question=question_1
+        )
+
+        # Question 2 concludes in the future
+        question_2 = Question.objects.create(
+            content='question 2',
+            date_published=date,
+            date_concluded=(date + timedelta(days=3))
+        )
+        Answer.objects.create(
+            content='answer 3',
+            question=question_2
+        )
+
+        user = User.objects.create_user(username='test_user_1')
+        Profile.objects.create(user=user, location='florida')
+        Reply.objects.create(
+            question=question_1,
+            user=user,
+            vote=answer_1,
+            prediction=answer_2
+        )
+
+    def test_results_are_frozen(self):
+        """
+        The first request after conclusion freezes the results, and
+        later requests are served from the snapshot with one query.
+        """
+        response_1 = self.client.get(self.url)
+        self.assertEqual(response_1.status_code, 200)
+        self.assertEqual(ResultsSnapshot.objects.count(), 1)
+        with self.assertNumQueries(1):
+            response_2 = self.client.get(self.url)
+        self.assertEqual(response_2.status_code, 200)
+        self.assertEqual(response_2.content, response_1.content)
+        self.assertEqual(response_2['ETag'], response_1['ETag'])
+        self.assertEqual(json.loads(response_2.content), {
+            'id': 1,
+            'total_votes': 1,
+            'results': [
+                {
+                    'answer': 1,
+                    'votes': 1,
+                    'predictions': 0
+                },
+                {
+                    'answer': 2,
+                    'votes': 0,
+                    'predictions': 1
+                }
+            ],
+            'locations': {
+                'florida': {
+                    'votes': [
+                        {
+                            'answer': 1,
+                            'count': 1
+                        },
+                        {
+                            'answer': 2,
+                            'count': 0
+                        }
+                    ],
+                    'total_count': 1
+                }
+            }
+        })
+
+    def test_not_modified(self):
+        """
+        A request with a matching ETag gets an empty 304 response.
+        """
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_gzip(self):
+        """
+        Clients that accept gzip receive the stored gzipped results.
+        """
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_etag_per_representation(self):
+        """
+        The plain JSON, the gzipped JSON and the browsable API have
+        different ETags, and each only validates its own representation.
+        """
+        plain = self.client.get(self.url)['ETag']
+        gzipped = self.client.get(self.url,
+                                  HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        api = self.client.get(self.url, {'format': 'api'})['ETag']
+        self.assertEqual(gzipped, plain[:-1] + '-gzip"')
+        self.assertTrue(api.startswith('W/'))
+        self.assertEqual(len({plain, gzipped, api}), 3)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=plain,
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=gzipped,
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 304)
+
+    def test_staff_results_before_conclusion(self):
+        """
+        Staff users see live results before a Question concludes, and
+        no snapshot is stored.
+        """
+        user = User.objects.get(id=1)
+        user.is_staff = True
+        self.client.force_authenticate(user)
+        response = self.client.get(reverse('question-results', args=[2]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ResultsSnapshot.objects.exists())
+
+    def test_question_change_discards_snapshot(self):
+        """
+        Editing a Question discards its frozen results.
+        """
+        self.client.get(self.url)
+        question = Question.objects.get(id=1)
+        question.content = 'question 1, edited'
+        question.save()
+        self.assertFalse(ResultsSnapshot.objects.exists())
+
+    def test_reply_deletion_discards_snapshot(self):
+        """
+        Deleting a Reply after the Question concludes discards its
+        frozen results, which are then frozen again without it.
+        """
+        self.client.get(self.url)
+        self.client.force_authenticate(User.objects.get(id=1))
+        response = self.client.delete(
+            reverse('question-reply', args=[1])
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(ResultsSnapshot.objects.exists())
+        self.client.force_authenticate(None)
+        response = self.client.get(self.url)
+        self.assertEqual(json.loads(response.content)['total_votes'], 0)
+
+    def test_conclude_questions(self):
+        """
+        The 'conclude_questions' command freezes the results of every
+        concluded Question, and only once.
+        """
+        out = StringIO()
+        call_command('conclude_questions', stdout=out)
+        self.assertIn('Concluded 1 questions.', out.getvalue())
+        self.assertEqual(
+            list(ResultsSnapshot.objects.values_list('question', flat=True)),
+            [1]
+        )
+        out = StringIO()
+        call_command('conclude_questions', stdout=out)
+        self.assertIn('Concluded 0 questions.', out.getvalue())
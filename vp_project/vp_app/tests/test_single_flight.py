@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from vp_app.conclusion import get_stale_key, results_flight
+from vp_app.models import Question, Answer, ResultsSnapshot
+from vp_app.singleflight import SingleFlight
+
+
+class SingleFlightTests(SimpleTestCase):
+    lock_key = 'vp_app:single-flight:test:1'
+
+    def setUp(self) -> None:
+        self.flight = SingleFlight('test', wait_timeout=5, poll_interval=0.01)
+        self.store = {}
+        self.computed = 0
+        cache.delete(self.lock_key)
+        self.addCleanup(cache.delete, self.lock_key)
+
+    def lookup(self):
+        return self.store.get(1)
+
+    def compute(self):
+        self.computed += 1
+        time.sleep(0.1)
+        self.store[1] = f'value {self.computed}'
+        return self.store[1]
+
+    def run_threads(self, count, compute=None, **kwargs):
+        compute = compute or self.compute
+        barrier = threading.Barrier(count)
+        results = [None] * count
+
+        def target(index):
+            barrier.wait()
+            try:
+                results[index] = self.flight.run(
+                    1, self.lookup, compute, **kwargs
+                )
+            except Exception as error:
+                results[index] = error
+
+        threads = [threading.Thread(target=target, args=[index])
+                   for index in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_one_computation(self):
+        """
+        Threads that miss at once wait for a single computation.
+        """
+        results = self.run_threads(16)
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(results, ['value 1'] * 16)
+        self.assertEqual(self.flight.flights, {})
+        self.assertIsNone(cache.get(self.lock_key))
+
+    def test_other_process(self):
+        """
+        While another process holds the lock, threads wait for it to be
+        released and look the value up instead of computing it.
+        """
+        cache.add(self.lock_key, 'other')
+
+        def finish():
+            self.store[1] = 'other value'
+            cache.delete(self.lock_key)
+
+        threading.Timer(0.1, finish).start()
+        self.assertEqual(self.run_threads(4), ['other value'] * 4)
+        self.assertEqual(self.computed, 0)
+
+    def test_lock_timeout(self):
+        """
+        Threads stop waiting for a lock that is never released.
+        """
+        cache.add(self.lock_key, 'other')
+        self.flight.wait_timeout = 0.05
+        self.assertEqual(self.flight.run(1, self.lookup, self.compute),
+                         'value 1')
+        self.assertEqual(cache.get(self.lock_key), 'other')
+
+    def test_stale(self):
+        """
+        With 'stale', threads that would wait are served a stale value,
+        and only the computing thread waits.
+        """
+        results = self.run_threads(8, stale=lambda: 'stale')
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(results.count('value 1'), 1)
+        self.assertEqual(results.count('stale'), 7)
+        cache.add(self.lock_key, 'other')
+        self.store.clear()
+        self.assertEqual(
+            self.flight.run(1, self.lookup, self.compute, lambda: 'stale'),
+            'stale'
+        )
+
+    def test_error(self):
+        """
+        An error in the computation is raised in every waiting thread,
+        and the next request computes again.
+        """
+        def compute():
+            time.sleep(0.1)
+            raise ValueError('failed')
+
+        for result in self.run_threads(4, compute):
+            self.assertIsInstance(result, ValueError)
+        self.assertEqual(self.flight.run(1, self.lookup, self.compute),
+                         'value 1')
+
+
+@override_settings(RESULTS_SINGLE_FLIGHT={'STALE_WHILE_REVALIDATE': True})
+class StaleResultsTests(APITestCase):
+    def setUp(self) -> None:
+        date = timezone.now() - timedelta(days=2)
+        self.question = Question.objects.create(
+            content='question 1',
+            date_published=date,
+            date_concluded=(date + timedelta(days=1))
+        )
+        self.answer = Answer.objects.create(
+            content='answer 1',
+            question=self.question
+        )
+        self.url = reverse('question-results', args=[self.question.id])
+        self.lock_key = f'vp_app:single-flight:results:{self.question.id}'
+        self.addCleanup(cache.delete, self.lock_key)
+        self.addCleanup(cache.delete, get_stale_key(self.question.id))
+
+    def test_stale_results(self):
+        """
+        While another worker freezes edited results again, the previous
+        results are served, and cached only briefly.
+        """
+        response_1 = self.client.get(self.url)
+        Answer.objects.create(content='answer 2', question=self.question)
+        self.assertFalse(ResultsSnapshot.objects.exists())
+        cache.add(self.lock_key, 'other')
+        response_2 = self.client.get(self.url)
+        self.assertEqual(response_2.content, response_1.content)
+        self.assertIn('s-maxage', response_2['Cache-Control'])
+        cache.delete(self.lock_key)
+        response_3 = self.client.get(self.url)
+        self.assertEqual(len(json.loads(response_3.content)['results']), 2)
+        self.assertIn('must-revalidate', response_3['Cache-Control'])
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'locks': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'locks',
+            },
+        },
+        RESULTS_SINGLE_FLIGHT={'CACHE': 'locks', 'WAIT_TIMEOUT': 2}
+    )
+    def test_settings(self):
+        """
+        The results are frozen under a lock configured by the current
+        'RESULTS_SINGLE_FLIGHT' setting.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(results_flight.cache_alias, 'locks')
+        self.assertEqual(results_flight.wait_timeout, 2)
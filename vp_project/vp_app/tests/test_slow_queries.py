@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from vp_app import slowlog
+from vp_app.models import Question, Answer
+
+
+date = timezone.now()
+
+
+class SlowQueryLogTests(APITestCase):
+    def setUp(self) -> None:
+        question = Question.objects.create(
+            content='question 1',
+            date_published=date,
+            date_concluded=(date + timedelta(days=1))
+        )
+        Answer.objects.create(content='answer 1', question=question)
+        self.user = User.objects.create_user(username='test_user')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'slow_queries.log')
+        self.addCleanup(self.close_handler)
+
+    def close_handler(self):
+        handler = slowlog.handlers.pop(self.path, None)
+        if handler is not None:
+            handler.close()
+
+    def read_log(self):
+        with open(self.path) as log:
+            return [json.loads(line) for line in log]
+
+    def test_log_slow_queries(self):
+        """
+        Statements over the threshold are logged as JSON lines, with
+        their shape, parameter count, view and application stack.
+        """
+        with override_settings(SLOW_QUERY_LOG={
+                'THRESHOLD_MS': 0, 'PATH': self.path}):
+            self.client.get(reverse('question-list'))
+        entries = self.read_log()
+        self.assertEqual(len(entries), 3)
+        self.assertIn('MAX("vp_app_question"."date_modified")',
+                      entries[0]['sql'])
+        entry = entries[1]
+        self.assertEqual(entry['view'], 'question-list')
+        self.assertEqual(entry['method'], 'GET')
+        self.assertTrue(entry['sql'].startswith(
+            'SELECT "vp_app_question"."id"'
+        ))
+        self.assertEqual(entry['params'], 0)
+        self.assertGreaterEqual(entry['duration_ms'], 0)
+        self.assertEqual(entries[2]['view'], 'question-list')
+        self.assertIn('"vp_app_answer"', entries[2]['sql'])
+        self.assertIn('IN (...)', entries[2]['sql'])
+        self.assertEqual(entries[2]['params'], 1)
+
+    def test_stack(self):
+        """
+        The stack is limited to the 'vp_app' and 'users' apps.
+        """
+        self.client.force_authenticate(self.user)
+        with override_settings(SLOW_QUERY_LOG={
+                'THRESHOLD_MS': 0, 'PATH': self.path}):
+            self.client.get(reverse('record'))
+        stacks = [entry['stack'] for entry in self.read_log()]
+        self.assertTrue(any(
+            frame.startswith(os.path.join('vp_app', 'views.py'))
+            for stack in stacks for frame in stack
+        ))
+        for stack in stacks:
+            for frame in stack:
+                self.assertTrue(frame.startswith(('vp_app', 'users')))
+                self.assertNotIn('middleware.py', frame)
+
+    def test_threshold(self):
+        """
+        Fast statements are not logged.
+        """
+        with override_settings(SLOW_QUERY_LOG={
+                'THRESHOLD_MS': 10000, 'PATH': self.path}):
+            self.client.get(reverse('question-list'))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_rotation(self):
+        """
+        The log is rotated once it grows past 'MAX_BYTES', and rotated
+        files are read oldest first.
+        """
+        with override_settings(SLOW_QUERY_LOG={
+                'THRESHOLD_MS': 0, 'PATH': self.path,
+                'MAX_BYTES': 2000, 'BACKUP_COUNT': 3}):
+            for _ in range(3):
+                self.client.get(reverse('question-list'))
+        self.assertTrue(os.path.exists(f'{self.path}.1'))
+        entries = list(slowlog.read_entries(self.path))
+        self.assertEqual(len(entries), 9)
+        times = [entry['time'] for entry in entries]
+        self.assertEqual(times, sorted(times))
+
+    def test_report(self):
+        """
+        The report ranks statements by total time.
+        """
+        handler = slowlog.get_handler(self.path, 10000, 1)
+        for sql, duration in [('SELECT 1', 150), ('SELECT 2', 120),
+                              ('SELECT 2', 120), ('SELECT 3', 200)]:
+            slowlog.write_entry(handler, {
+                'time': date.isoformat(),
+                'duration_ms': duration,
+                'sql': sql,
+                'params': 0,
+                'view': 'record',
+                'method': 'GET',
+                'stack': ['vp_app/views.py:1 in get'],
+            })
+        out = StringIO()
+        call_command('slow_query_report', log=self.path, limit=2,
+                     stdout=out)
+        output = out.getvalue()
+        self.assertIn('4 slow queries of 3 shapes', output)
+        self.assertIn('1. 240.0 ms total (41%), 2 runs', output)
+        self.assertIn('2. 200.0 ms total', output)
+        self.assertNotIn('SELECT 1', output)
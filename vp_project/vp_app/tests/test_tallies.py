@@ -0,0 +1,113 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from vp_app.models import Question, Answer, Reply, AnswerTally
+
+
+date = timezone.now() - timedelta(days=1)
+
+
+class AnswerTallyTests(APITestCase):
+    url = reverse('question-reply', args=[1])
+
+    def setUp(self) -> None:
+        question = Question.objects.create(
+            content='question 1',
+            date_published=date,
+            date_concluded=(date + timedelta(days=2))
+        )
+        Answer.objects.create(
+            content='answer 1',
+            question=question
+        )
+        Answer.objects.create(
+            content='answer 2',
+            question=question
+        )
+        User.objects.create_user(username='test_user_1')
+        User.objects.create_user(username='test_user_2')
+
+    def get_tallies(self):
+        return {
+            tally.answer_id: (tally.votes, tally.predictions)
+            for tally in AnswerTally.objects.all()
+        }
+
+    def test_new_answers_have_tallies(self):
+        """
+        Every new Answer starts with an empty tally.
+        """
+        self.assertEqual(self.get_tallies(), {1: (0, 0), 2: (0, 0)})
+
+    def test_create_reply(self):
+        """
+        Creating a Reply counts its vote and prediction.
+        """
+        self.client.force_authenticate(User.objects.get(id=1))
+        self.client.post(self.url, {'vote': 1, 'prediction': 2})
+        self.client.force_authenticate(User.objects.get(id=2))
+        self.client.post(self.url, {'vote': 1, 'prediction': 1})
+        self.assertEqual(self.get_tallies(), {1: (2, 1), 2: (0, 1)})
+
+    def test_update_reply(self):
+        """
+        Changing a Reply moves its counts to the new vote and
+        prediction.
+        """
+        self.client.force_authenticate(User.objects.get(id=1))
+        self.client.post(self.url, {'vote': 1, 'prediction': 2})
+        self.client.patch(self.url, {'vote': 2})
+        self.assertEqual(self.get_tallies(), {1: (0, 0), 2: (1, 1)})
+        self.client.put(self.url, {'vote': 1, 'prediction': 1})
+        self.assertEqual(self.get_tallies(), {1: (1, 1), 2: (0, 0)})
+
+    def test_delete_reply(self):
+        """
+        Deleting a Reply removes its counts.
+        """
+        self.client.force_authenticate(User.objects.get(id=1))
+        self.client.post(self.url, {'vote': 1, 'prediction': 2})
+        self.client.delete(self.url)
+        self.assertEqual(self.get_tallies(), {1: (0, 0), 2: (0, 0)})
+
+    def test_delete_user(self):
+        """
+        Replies deleted along with their User are no longer counted.
+        """
+        user = User.objects.get(id=1)
+        Reply.objects.create(
+            question=Question.objects.get(id=1),
+            user=user,
+            vote=Answer.objects.get(id=1),
+            prediction=Answer.objects.get(id=2)
+        )
+        user.delete()
+        self.assertEqual(self.get_tallies(), {1: (0, 0), 2: (0, 0)})
+
+    def test_rebuild_tallies(self):
+        """
+        The 'rebuild_tallies' command reports and corrects tallies that
+        disagree with the Replies.
+        """
+        Reply.objects.create(
+            question=Question.objects.get(id=1),
+            user=User.objects.get(id=1),
+            vote=Answer.objects.get(id=1),
+            prediction=Answer.objects.get(id=2)
+        )
+        AnswerTally.objects.filter(answer=1).update(votes=5)
+        AnswerTally.objects.filter(answer=2).delete()
+        with self.assertRaises(CommandError):
+            call_command('rebuild_tallies', '--check', stdout=StringIO())
+        self.assertEqual(self.get_tallies(), {1: (5, 0)})
+
+        out = StringIO()
+        call_command('rebuild_tallies', stdout=out)
+        self.assertIn('Corrected 2 tallies.', out.getvalue())
+        self.assertEqual(self.get_tallies(), {1: (1, 0), 2: (0, 1)})
+        call_command('rebuild_tallies', '--check', stdout=StringIO())
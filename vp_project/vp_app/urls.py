@@ -52,4 +52,24 @@ urlpatterns = [
         vp_app_views.UserRecord.as_view(),
         name='record'
     ),
+    path(
+        'leaderboard/',
+        vp_app_views.Leaderboard.as_view(),
+        name='leaderboard'
+    ),
+    path(
+        'leaderboard/<str:location>/',
+        vp_app_views.Leaderboard.as_view(),
+        name='location-leaderboard'
+    ),
+    path(
+        'metrics/',
+        vp_app_views.Metrics.as_view(),
+        name='metrics'
+    ),
+    path(
+        'profiler/',
+        vp_app_views.Profiler.as_view(),
+        name='profiler'
+    ),
 ]
@@ -1,3 +1,5 @@
+from django.db.models import Count, Max, Prefetch
+from django.http import HttpResponse
 from django.utils import timezone
 from rest_framework import (
     generics,
@@ -10,17 +12,46 @@ from rest_framework import (
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
-from .models import Question, Answer, Reply
+from users.models import states
+from .models import Question, Answer, Reply, Score
+from .authentication import (
+    CachingTokenAuthentication,
+    SignedTokenAuthentication
+)
 from .serializers import (
     QuestionSerializer,
     AnswerSerializer,
     ReplySerializer,
     ResultsSerializer,
-    RecordSerializer
+    RecordSerializer,
+    LeaderSerializer
 )
 from .permissions import IsStaffOrReadOnly
+from .cachecontrol import (
+    CacheControlMixin,
+    apply_policy,
+    concluded_policy,
+    pending_policy,
+    private_policy,
+    shared_policy
+)
+from .catalogcache import CatalogCacheMixin
+from .conditional import (
+    ConditionalGetMixin,
+    conditional_response,
+    make_etag
+)
+from .conclusion import get_results_snapshot
+from .leaderboard import get_leaders, get_rank
+from .metrics import render_metrics
+from .profiler import ProfilerBusy, render_collapsed, sample_requests
+from .pagination import IdCursorPagination
+from .querylog import query_budget
+from .questioncache import get_question_metadata
+from .responses import PrerenderedResponse, get_stored_etag
 
 
+@query_budget(0)
 @api_view(['GET'])
 def root_index(request, format=None):
     return Response({
@@ -36,27 +67,77 @@ def root_index(request, format=None):
     })
 
 
-class QuestionList(generics.ListCreateAPIView):
+class QuestionList(CacheControlMixin,
+                   ConditionalGetMixin,
+                   CatalogCacheMixin,
+                   generics.ListCreateAPIView):
+    query_budget = 3
     permission_classes = [IsStaffOrReadOnly, ]
     authentication_classes = [
-        authentication.TokenAuthentication,
+        CachingTokenAuthentication,
         authentication.SessionAuthentication,
+        SignedTokenAuthentication,
     ]
     serializer_class = QuestionSerializer
-    queryset = Question.objects.all()
+    pagination_class = IdCursorPagination
+    queryset = Question.objects.prefetch_related(
+        Prefetch('answers', queryset=Answer.objects.order_by('id'))
+    )
 
+    def get_version(self):
+        """
+        The list changes whenever a Question is added, deleted, or
+        modified (which includes its Answers). No Last-Modified is sent,
+        since a deletion does not advance any modification date.
+        """
+        version = Question.objects.aggregate(
+            count=Count('id'),
+            modified=Max('date_modified')
+        )
+        return version['count'], version['modified']
 
-class QuestionDetail(generics.RetrieveUpdateDestroyAPIView):
+    def get_validators(self, request, *args, **kwargs):
+        version = self.get_catalog_version(request, self.get_version)
+        return make_etag(request, *version), None
+
+    def get_cache_policy(self, request, response):
+        return shared_policy()
+
+
+class QuestionDetail(CacheControlMixin,
+                     ConditionalGetMixin,
+                     CatalogCacheMixin,
+                     generics.RetrieveUpdateDestroyAPIView):
+    query_budget = 3
     permission_classes = [IsStaffOrReadOnly, ]
     serializer_class = QuestionSerializer
-    queryset = Question.objects.all()
+    queryset = Question.objects.prefetch_related(
+        Prefetch('answers', queryset=Answer.objects.order_by('id'))
+    )
+
+    def get_version(self):
+        return Question.objects \
+            .filter(pk=self.kwargs['pk']) \
+            .values_list('date_modified', flat=True) \
+            .first()
+
+    def get_validators(self, request, *args, **kwargs):
+        modified = self.get_catalog_version(request, self.get_version)
+        if modified is None:
+            return None, None
+        return make_etag(request, modified), modified
+
+    def get_cache_policy(self, request, response):
+        return shared_policy()
 
 
 class QuestionAnswers(generics.ListCreateAPIView):
+    query_budget = 1
     permission_classes = [IsStaffOrReadOnly, ]
     authentication_classes = [
-        authentication.TokenAuthentication,
-        authentication.SessionAuthentication
+        CachingTokenAuthentication,
+        authentication.SessionAuthentication,
+        SignedTokenAuthentication,
     ]
     serializer_class = AnswerSerializer
 
@@ -70,29 +151,36 @@ class QuestionAnswers(generics.ListCreateAPIView):
 
 
 class AnswerList(generics.ListAPIView):
+    query_budget = 1
     serializer_class = AnswerSerializer
+    pagination_class = IdCursorPagination
     queryset = Answer.objects.all()
 
 
 class AnswerDetail(generics.RetrieveUpdateDestroyAPIView):
+    query_budget = 1
     permission_classes = [IsStaffOrReadOnly, ]
     authentication_classes = [
-        authentication.TokenAuthentication,
-        authentication.SessionAuthentication
+        CachingTokenAuthentication,
+        authentication.SessionAuthentication,
+        SignedTokenAuthentication,
     ]
     serializer_class = AnswerSerializer
     queryset = Answer.objects.all()
 
 
-class QuestionReply(mixins.CreateModelMixin,
+class QuestionReply(CacheControlMixin,
+                    mixins.CreateModelMixin,
                     mixins.RetrieveModelMixin,
                     mixins.UpdateModelMixin,
                     mixins.DestroyModelMixin,
                     generics.GenericAPIView):
+    query_budget = 5
     permission_classes = [permissions.IsAuthenticated, ]
     authentication_classes = [
-        authentication.TokenAuthentication,
+        CachingTokenAuthentication,
         authentication.SessionAuthentication,
+        SignedTokenAuthentication,
     ]
     serializer_class = ReplySerializer
     lookup_field = 'question_id'
@@ -105,13 +193,16 @@ class QuestionReply(mixins.CreateModelMixin,
         question_id = self.kwargs['question_id']
         return Reply.objects.filter(question=question_id, user=user)
 
+    def get_cache_policy(self, request, response):
+        return private_policy()
+
     def get(self, request, *args, **kwargs):
         """
         If the current date/time is after the Question was published,
         perform 'get()' as normal. Otherwise, return a 404. Staff users
         are always permitted.
         """
-        question = Question.objects.get(id=self.kwargs['question_id'])
+        question = get_question_metadata(self.kwargs['question_id'])
         if question.date_published <= timezone.now() \
                 or request.user.is_staff:
             return self.retrieve(request, *args, **kwargs)
@@ -131,53 +222,205 @@ class QuestionReply(mixins.CreateModelMixin,
 
     def perform_create(self, serializer):
         """
-        Relate Users and Questions to Replies.
+        Relate Users and Questions to Replies. The Question was looked
+        up when the Reply was validated.
         """
         serializer.save(
             user=self.request.user,
-            question=Question.objects.get(id=self.kwargs['question_id'])
+            question_id=serializer.get_question().id
         )
 
 
-class ReplyList(generics.ListAPIView):
+class ReplyList(CacheControlMixin,
+                ConditionalGetMixin,
+                generics.ListAPIView):
+    query_budget = 2
     serializer_class = ReplySerializer
     authentication_classes = [
         authentication.SessionAuthentication,
-        authentication.TokenAuthentication
+        CachingTokenAuthentication,
+        SignedTokenAuthentication,
     ]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         return Reply.objects.filter(user=self.request.user).all()
 
+    def get_validators(self, request, *args, **kwargs):
+        version = self.get_queryset().aggregate(
+            count=Count('id'),
+            modified=Max('date_modified')
+        )
+        return make_etag(request, *version.values()), None
+
+    def get_cache_policy(self, request, response):
+        return private_policy(revalidate=True)
+
 
 class QuestionResults(generics.RetrieveAPIView):
+    query_budget = 4
     serializer_class = ResultsSerializer
     queryset = Question.objects.all()
 
     def retrieve(self, request, *args, **kwargs):
         """
         If the current date/time is after the Question was concluded,
-        perform 'retrieve()' as normal. Otherwise, return a 404. Staff
-        users are always permitted.
+        serve its frozen results, freezing them first if necessary.
+        Otherwise, return a 404. Staff users are always permitted, and
+        see live results before the Question concludes. Whether the
+        Question has concluded is read from the metadata cache (see
+        'questioncache.py'). Frozen results may be cached by anyone;
+        the 404 only until the Question concludes.
         """
-        question = Question.objects.get(id=self.kwargs['pk'])
-        if question.date_concluded <= timezone.now() \
-                or request.user.is_staff:
-            return super().retrieve(request, *args, **kwargs)
-        return Response(status=status.HTTP_404_NOT_FOUND)
+        question = get_question_metadata(self.kwargs['pk'])
+        if question.date_concluded > timezone.now():
+            if request.user.is_staff:
+                return apply_policy(
+                    request,
+                    Response(self.get_serializer(self.get_object()).data),
+                    private_policy()
+                )
+            return apply_policy(
+                request,
+                Response(status=status.HTTP_404_NOT_FOUND),
+                pending_policy(question.date_concluded)
+            )
+
+        snapshot = get_results_snapshot(question.id, self.get_object)
+        response = conditional_response(
+            request,
+            get_stored_etag(request, snapshot.etag, snapshot.content_gzip),
+            snapshot.date_created,
+            PrerenderedResponse(snapshot.content, snapshot.content_gzip)
+        )
+        if getattr(snapshot, 'stale', False):
+            return apply_policy(request, response, shared_policy())
+        return apply_policy(request, response, concluded_policy())
 
 
-class UserRecord(views.APIView):
+class UserRecord(CacheControlMixin, views.APIView):
+    query_budget = 1
     authentication_classes = [
         authentication.SessionAuthentication,
-        authentication.TokenAuthentication
+        CachingTokenAuthentication,
+        SignedTokenAuthentication,
     ]
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, format=None):
+        """
+        Read the User's Score, kept up to date by 'conclude_questions'.
+        """
         user = request.user
         serializer = RecordSerializer(user)
         return Response(serializer.data)
 
+    def get_cache_policy(self, request, response):
+        return private_policy()
 
+
+class Leaderboard(views.APIView):
+    query_budget = 3
+    authentication_classes = [
+        authentication.SessionAuthentication,
+        CachingTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    default_limit = 10
+    max_limit = 100
+
+    def get(self, request, location=None, format=None):
+        """
+        List the Users with the most correct predictions, nationally or
+        in one location, along with the current User's own rank. The
+        number of leaders is set with '?limit=' (at most 100).
+        """
+        if location is not None and location not in dict(states):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        try:
+            limit = int(request.query_params.get('limit',
+                                                 self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+
+        leaders = get_leaders(location, limit)
+        user_score = None
+        if request.user.is_authenticated:
+            user_score = Score.objects.filter(user=request.user).first()
+            if user_score is not None and location is not None \
+                    and user_score.location != location:
+                user_score = None
+        if user_score is not None:
+            user_score.user = request.user
+            user_score.rank = get_rank(user_score, location)
+            user_score = LeaderSerializer(user_score).data
+
+        return Response({
+            'location': location,
+            'leaders': LeaderSerializer(leaders, many=True).data,
+            'user': user_score
+        })
+
+
+class Metrics(views.APIView):
+    query_budget = 0
+    authentication_classes = [
+        authentication.SessionAuthentication,
+        CachingTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, format=None):
+        """
+        Serve this process's request metrics (see 'metrics.py') in the
+        Prometheus text exposition format.
+        """
+        return HttpResponse(
+            render_metrics(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+
+class Profiler(views.APIView):
+    query_budget = 0
+    authentication_classes = [
+        authentication.SessionAuthentication,
+        CachingTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [permissions.IsAdminUser]
+    default_seconds = 10
+    max_seconds = 60
+
+    def get(self, request, format=None):
+        """
+        Sample the stacks of the requests this process handles for
+        '?seconds=' seconds (at most 60), every '?interval=' seconds,
+        and return them as collapsed stacks for flame graph tools. Each
+        stack starts with the URL name of its view. Only one session
+        runs at a time; others get a 409.
+        """
+        try:
+            seconds = float(request.query_params.get(
+                'seconds', self.default_seconds
+            ))
+            interval = float(request.query_params.get('interval', 0.005))
+        except ValueError:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        seconds = max(0, min(seconds, self.max_seconds))
+        interval = max(0.001, min(interval, 1))
+
+        try:
+            samples = sample_requests(seconds, interval)
+        except ProfilerBusy:
+            return Response(
+                {'detail': 'A profiling session is already running.'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return HttpResponse(
+            render_collapsed(samples),
+            content_type='text/plain; charset=utf-8'
+        )
@@ -45,7 +45,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'vp_app.middleware.PerformanceMetricsMiddleware',
+    'vp_app.middleware.ProfilerMiddleware',
+    'vp_app.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'vp_app.middleware.NPlusOneMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -127,5 +131,162 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 
+# REST Framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    # Page size for the list views that set a 'pagination_class'.
+    'PAGE_SIZE': 100,
+    # Views that list their own authentication classes also accept
+    # signed access tokens.
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+        'vp_app.authentication.SignedTokenAuthentication',
+    ],
+}
+
+# Pagination is enabled per view, not through a default pagination
+# class.
+SILENCED_SYSTEM_CHECKS = ['rest_framework.W001']
+
+
+# Caches. The default cache holds state that every process serving the
+# API must share (see 'vp_app/checks.py'): reads of access token
+# revocations, the versions that invalidate process-local caches, and
+# locks. Files are shared by the processes of one host; set
+# 'CACHE_BACKEND' and 'CACHE_LOCATION' to use e.g. Memcached when
+# several hosts serve it, or for locks that hold across processes.
+# Evicting any of that state costs reloads, never stale data.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.environ.get(
+            'CACHE_LOCATION',
+            os.path.join(BASE_DIR, 'cache')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+
+# N+1 query detection (see 'vp_app/middleware.py'). Requests that run
+# the same SQL statement, up to its values, more than 'THRESHOLD' times
+# are reported, and with 'RAISE' on (as in the test settings) fail
+# with NPlusOneError.
+N_PLUS_ONE_DETECTION = {
+    'ENABLED': DEBUG,
+    'THRESHOLD': 5,
+    'RAISE': False,
+}
+
+
+# Per-request performance metrics (see 'vp_app/middleware.py'), served
+# to staff in Prometheus text format at 'metrics/'. 'SERVER_TIMING'
+# adds a Server-Timing header with each request's timings, and is on
+# when DEBUG is on unless set.
+PERFORMANCE_METRICS = {
+    'ENABLED': True,
+}
+
+
+# Slow query log (see 'vp_app/middleware.py'). Statements that take
+# longer than 'THRESHOLD_MS' are written to 'PATH' as JSON lines, and
+# the file is rotated once it reaches 'MAX_BYTES'. Summarize it with
+# 'manage.py slow_query_report'.
+SLOW_QUERY_LOG = {
+    'ENABLED': True,
+    'THRESHOLD_MS': 100,
+    'PATH': os.path.join(BASE_DIR, 'slow_queries.log'),
+    'MAX_BYTES': 10 * 1024 * 1024,
+    'BACKUP_COUNT': 5,
+}
+
+
+# Process-local cache of the Question dates and Answers used by the
+# reply and results views (see 'vp_app/questioncache.py'). Entries
+# expire after 'TTL' seconds. Other processes learn of edits through
+# versions kept in the 'CACHE' cache, which must be shared between
+# processes (e.g. Memcached or Redis) when more than one serves the API.
+QUESTION_METADATA_CACHE = {
+    'MAX_SIZE': 1024,
+    'TTL': 60,
+    'CACHE': 'default',
+}
+
+
+# Process-local cache of API tokens and their users, used by
+# 'CachingTokenAuthentication' (see 'vp_app/authentication.py') so that
+# token requests do not query for the token. Entries are discarded when
+# a token is deleted or its user is saved, and expire after 'TTL'
+# seconds. As above, 'CACHE' must be shared between processes.
+TOKEN_AUTHENTICATION_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 300,
+    'CACHE': 'default',
+}
+
+
+# Signed access tokens (see 'vp_app/authentication.py'), issued by
+# 'api-token-auth/' and 'api-token-refresh/' and sent as
+# 'Authorization: Bearer <token>'. They carry the user's id and staff
+# flag under an HMAC of SECRET_KEY and expire after 'MAX_AGE' seconds.
+# Revocations are stored in the database, and reads of them are cached
+# for 'MAX_AGE' seconds in the 'CACHE' cache, which must be shared
+# between processes.
+SIGNED_ACCESS_TOKENS = {
+    'ENABLED': True,
+    'MAX_AGE': 900,
+    'CACHE': 'default',
+}
+
+
+# Cache of the rendered 'questions/' and 'questions/<id>/' responses
+# (see 'vp_app/catalogcache.py'), invalidated whenever a Question or an
+# Answer changes. Responses are kept in the 'CACHE' cache for at most
+# 'TIMEOUT' seconds.
+CATALOG_CACHE = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'TIMEOUT': 3600,
+}
+
+
+# Cache-Control policy (see 'vp_app/cachecontrol.py'). Question lists
+# and details may be kept by shared caches (a reverse proxy or CDN) for
+# 'OPEN_MAX_AGE' seconds. Frozen results may be kept by anyone for
+# 'CONCLUDED_MAX_AGE' seconds and are then revalidated, so a deleted
+# Reply or a staff edit to a concluded Question takes that long to
+# reach clients. Replies and records are private.
+CACHE_CONTROL = {
+    'ENABLED': True,
+    'OPEN_MAX_AGE': 60,
+    'CONCLUDED_MAX_AGE': 300,
+}
+
+
+# Single-flight freezing of results (see 'vp_app/singleflight.py'). When
+# many requests find a concluded Question's results unfrozen at once,
+# one request per process freezes them and the others wait for it. A
+# lock in the 'CACHE' cache, which must be shared between processes,
+# keeps other processes waiting for up to 'WAIT_TIMEOUT' seconds; it
+# expires after 'LOCK_TIMEOUT'. With 'STALE_WHILE_REVALIDATE', results
+# discarded by a staff edit are kept for 'STALE_TTL' seconds and served
+# instead of waiting while they are frozen again.
+RESULTS_SINGLE_FLIGHT = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'LOCK_TIMEOUT': 30,
+    'WAIT_TIMEOUT': 10,
+    'STALE_WHILE_REVALIDATE': False,
+    'STALE_TTL': 300,
+}
+
+
 # CORS Configuration
 CORS_ORIGIN_ALLOW_ALL = True
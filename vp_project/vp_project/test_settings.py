@@ -0,0 +1,22 @@
+from .settings import *  # noqa: F401, F403
+
+
+# Tests run in a single process, which may keep everything in memory.
+# The file cache would also carry state from one test to the next.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+SILENCED_SYSTEM_CHECKS = SILENCED_SYSTEM_CHECKS + [  # noqa: F405
+    'vp_app.E001',
+    'vp_app.E002',
+]
+
+# A test that runs N+1 queries fails. Cached catalog responses would
+# outlive the rolled-back rows they describe, so the catalog cache is
+# only on in its own tests.
+N_PLUS_ONE_DETECTION = dict(  # noqa: F405
+    N_PLUS_ONE_DETECTION, ENABLED=True, RAISE=True  # noqa: F405
+)
+CATALOG_CACHE = dict(CATALOG_CACHE, ENABLED=False)  # noqa: F405